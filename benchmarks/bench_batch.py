@@ -0,0 +1,55 @@
+# benchmarks/bench_batch.py
+# Jalankan dari root repo: python -m benchmarks.bench_batch [jumlah_baris]
+#
+# Membandingkan alur lama (list of dict -> pd.DataFrame di setiap loader)
+# dengan ProductBatch yang dibuat sekali dan dipakai bersama oleh loader.
+
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from benchmarks.synthetic import generate_raw_products
+from utils.batch import as_dataframe
+from utils.transform import transform_product_data, transform_product_batch
+
+DEFAULT_ROWS = 200_000
+# Loader yang membangun DataFrame: CSV, Google Sheets, PostgreSQL, display_sample
+LOADER_CONVERSIONS = 4
+
+def measure(label, run):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = run()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<14}: {elapsed:.2f}s, peak {peak / 2**20:,.1f} MiB")
+    return result
+
+def records_flow(raw_data):
+    records = transform_product_data(raw_data)
+    for _ in range(LOADER_CONVERSIONS):
+        pd.DataFrame(records)
+    return records
+
+def batch_flow(raw_data):
+    batch = transform_product_batch(raw_data)
+    for _ in range(LOADER_CONVERSIONS):
+        as_dataframe(batch)
+    return batch
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    raw_data = generate_raw_products(rows)
+
+    print(f"Transform + {LOADER_CONVERSIONS} konversi loader untuk {rows:,} baris mentah:")
+    records = measure("list of dict", lambda: records_flow(raw_data))
+    batch = measure("ProductBatch", lambda: batch_flow(raw_data))
+    assert batch.to_records() == records, "Isi ProductBatch berbeda dengan list of dict"
+
+    records_bytes = int(pd.DataFrame(records).memory_usage(deep=True, index=False).sum())
+    print(f"Footprint kolom: DataFrame dari list of dict {records_bytes / 2**20:,.1f} MiB, "
+          f"ProductBatch {batch.memory_usage() / 2**20:,.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+# benchmarks/bench_columnar.py
+# Jalankan dari root repo: python -m benchmarks.bench_columnar [jumlah_baris]
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+import pandas as pd
+from benchmarks.synthetic import generate_raw_products
+from utils.transform import transform_product_data
+from utils.load import save_to_csv, save_to_columnar
+from utils.columnar import read_columnar
+
+DEFAULT_ROWS = 500_000
+
+def timed(func):
+    start = time.perf_counter()
+    with redirect_stdout(StringIO()):
+        result = func()
+    return result, time.perf_counter() - start
+
+def size_of(path):
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names)
+    return os.path.getsize(path)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    data = transform_product_data(generate_raw_products(rows))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        csv_path = os.path.join(tmp_dir, "products.csv")
+        sinks = [
+            ("CSV", csv_path,
+             lambda: save_to_csv(data, csv_path),
+             lambda: pd.read_csv(csv_path, parse_dates=["Timestamp"])),
+        ]
+        for file_format, partitioned in (("parquet", False), ("arrow", False), ("parquet", True)):
+            label = f"{file_format}{' (partisi)' if partitioned else ''}"
+            path = os.path.join(tmp_dir, f"products_{label.replace(' ', '_')}")
+            sinks.append((
+                label, path,
+                lambda path=path, file_format=file_format, partitioned=partitioned:
+                    save_to_columnar(data, path, file_format, partitioned),
+                lambda path=path, file_format=file_format: read_columnar(path, file_format),
+            ))
+
+        print(f"{len(data):,} baris produk:")
+        print(f"  {'format':18} {'ukuran':>10} {'tulis':>8} {'baca':>8}")
+        for label, path, write, read in sinks:
+            _, write_time = timed(write)
+            df, read_time = timed(read)
+            assert len(df) == len(data)
+            print(f"  {label:18} {size_of(path) / 1024 / 1024:8.2f}MB {write_time:7.2f}s {read_time:7.2f}s")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+# benchmarks/bench_fused.py
+# Jalankan dari root repo: python -m benchmarks.bench_fused [jumlah_halaman]
+#
+# Membandingkan alur dua tahap (extract_page_products -> list of dict mentah
+# -> transform_product_batch) dengan mode fused (extract_page_rows ->
+# rows_to_batch) pada halaman sintetis: throughput card per detik, peak
+# memori tracemalloc dan ukuran data perantara yang ditahan sampai transform.
+
+import sys
+import time
+import tracemalloc
+import pandas as pd
+from benchmarks.synthetic import CARDS_PER_PAGE, render_page
+from utils.extract import extract_page_products, extract_page_rows
+from utils.transform import rows_to_batch, transform_product_batch
+
+DEFAULT_PAGES = 500
+REPEAT = 3
+
+def two_pass(pages):
+    raw_data = [product for html in pages for product in extract_page_products(html)]
+    return raw_data, transform_product_batch(raw_data)
+
+def fused(pages):
+    rows = [row for html in pages for row in extract_page_rows(html)]
+    return rows, rows_to_batch(rows)
+
+def deep_size(items):
+    """Perkiraan byte yang ditahan list data perantara (kontainer + isi)."""
+    total = sys.getsizeof(items)
+    for item in items:
+        total += sys.getsizeof(item)
+        values = item.values() if isinstance(item, dict) else item
+        total += sum(sys.getsizeof(value) for value in values)
+    return total
+
+def measure(label, run, pages, cards):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        run(pages)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    tracemalloc.start()
+    intermediate, batch = run(pages)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<9}: {best:.2f}s ({cards / best:,.0f} cards/s), peak {peak / 2**20:,.1f} MiB, "
+          f"intermediate {len(intermediate):,} items / {deep_size(intermediate) / 2**20:,.1f} MiB")
+    return batch
+
+def main():
+    page_count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PAGES
+    pages = [render_page(n, total_pages=page_count).encode() for n in range(1, page_count + 1)]
+    cards = page_count * CARDS_PER_PAGE
+
+    print(f"Extract + transform {page_count:,} halaman ({cards:,} card), best of {REPEAT}:")
+    expected = measure("two-pass", two_pass, pages, cards)
+    actual = measure("fused", fused, pages, cards)
+    # Timestamp berbeda (per card vs per halaman); kolom lain harus identik
+    pd.testing.assert_frame_equal(expected.df.drop(columns="Timestamp"), actual.df.drop(columns="Timestamp"))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+# benchmarks/bench_history.py
+# Jalankan dari root repo: python -m benchmarks.bench_history [jumlah_produk] [jumlah_run]
+# Set BENCH_DB_URL ke PostgreSQL lokal; jika kosong dipakai SQLite sementara.
+#
+# Membandingkan "perubahan harga sejak run terakhir" dari snapshot CSV per run
+# (baca dua CSV terakhir lalu merge) dengan query ke tabel latest HistoryStore.
+
+import os
+import random
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+import pandas as pd
+from benchmarks.synthetic import generate_raw_products
+from utils.history import PRODUCT_KEY, HistoryStore
+from utils.load import get_engine, save_to_csv
+from utils.transform import transform_product_batch
+
+DEFAULT_PRODUCTS = 20_000
+DEFAULT_RUNS = 20
+CHANGED_FRACTION = 0.05
+REPEAT = 5
+
+def next_run(df, rng):
+    """Salinan df dengan harga CHANGED_FRACTION produk berubah."""
+    df = df.copy()
+    changed = rng.sample(range(len(df)), int(len(df) * CHANGED_FRACTION))
+    df.loc[df.index[changed], "Price"] = (df["Price"].iloc[changed] * 1.1).round(2).to_numpy()
+    return df
+
+def snapshot_changes(previous_csv, current_csv):
+    """Cara lama: baca dua snapshot CSV penuh lalu bandingkan harga per (Title, Size)."""
+    previous = pd.read_csv(previous_csv).drop_duplicates(subset=PRODUCT_KEY)
+    current = pd.read_csv(current_csv).drop_duplicates(subset=PRODUCT_KEY)
+    merged = current.merge(previous, on=PRODUCT_KEY, suffixes=("", "_previous"))
+    return merged[merged["Price"] != merged["Price_previous"]]
+
+def best_of(func):
+    best = None
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+def main():
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_PRODUCTS
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_RUNS
+    rng = random.Random(42)
+    df = transform_product_batch(generate_raw_products(products)).df.copy()
+    df["Size"] = df["Size"].astype(object)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = os.getenv('BENCH_DB_URL') or f"sqlite:///{os.path.join(tmp_dir, 'history.db')}"
+        store = HistoryStore(db_url, prefix="bench")
+        snapshots = []
+        record_time = 0.0
+        with redirect_stdout(StringIO()):
+            for run in range(runs):
+                df = df if run == 0 else next_run(df, rng)
+                start = time.perf_counter()
+                store.record_run(df)
+                record_time += time.perf_counter() - start
+                snapshots.append(os.path.join(tmp_dir, f"run_{run}.csv"))
+                save_to_csv(df, snapshots[-1])
+
+        csv_time, expected = best_of(lambda: snapshot_changes(snapshots[-2], snapshots[-1]))
+        query_time, changes = best_of(store.price_changes)
+        aggregate_time, aggregates = best_of(store.run_aggregates)
+        get_engine(db_url).dispose()
+
+    assert len(changes) == len(expected)
+    print(f"{runs} run x {len(df):,} produk di {db_url.split(':')[0]} "
+          f"(record_run rata-rata {record_time / runs:.2f}s/run), best of {REPEAT}:")
+    print(f"  perubahan harga dari 2 snapshot CSV : {csv_time * 1000:8.1f} ms ({len(expected):,} produk)")
+    print(f"  perubahan harga dari tabel latest   : {query_time * 1000:8.1f} ms")
+    print(f"  agregat Gender x Size run terakhir  : {aggregate_time * 1000:8.1f} ms ({len(aggregates)} grup)")
+
+if __name__ == '__main__':
+    main()
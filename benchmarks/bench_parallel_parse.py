@@ -0,0 +1,57 @@
+# benchmarks/bench_parallel_parse.py
+# Jalankan dari root repo: python -m benchmarks.bench_parallel_parse
+
+import os
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+from concurrent.futures import ProcessPoolExecutor
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.extract import extract_page_products, scrape_all_pages
+
+NUM_PAGES = 200
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    return sorted({1, 2, 4, cpus})
+
+def bench_parse_scaling(pages):
+    """Skalabilitas parsing murni terhadap jumlah proses worker."""
+    start = time.perf_counter()
+    baseline = [extract_page_products(html) for html in pages]
+    serial_time = time.perf_counter() - start
+    cards = sum(len(products) for products in baseline)
+    print(f"Parsing {len(pages)} halaman ({cards} cards):")
+    print(f"  serial (1 proses)  : {cards / serial_time:8.0f} cards/s")
+
+    for workers in worker_counts():
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(extract_page_products, pages, chunksize=4))
+            elapsed = time.perf_counter() - start
+        assert [p['title'] for page in results for p in page] == [p['title'] for page in baseline for p in page]
+        print(f"  {workers:2d} proses worker   : {cards / elapsed:8.0f} cards/s ({serial_time / elapsed:.2f}x)")
+
+def bench_crawl(parse_workers):
+    """Crawl penuh terhadap server lokal dengan fetch paralel."""
+    with LocalFashionServer(lambda n: render_page(n, total_pages=NUM_PAGES), latency=0.005) as server:
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            products = scrape_all_pages(server.url, max_pages=NUM_PAGES, concurrency=8, parse_workers=parse_workers)
+        return products, time.perf_counter() - start
+
+def main():
+    pages = [render_page(n, total_pages=NUM_PAGES).encode() for n in range(1, NUM_PAGES + 1)]
+    bench_parse_scaling(pages)
+
+    print(f"\nCrawl {NUM_PAGES} halaman (8 thread I/O, latency 5ms):")
+    expected, elapsed = bench_crawl(None)
+    print(f"  parsing di thread utama : {elapsed:.3f}s")
+    for workers in worker_counts():
+        products, elapsed = bench_crawl(workers)
+        assert [p['title'] for p in products] == [p['title'] for p in expected]
+        print(f"  parse_workers={workers:<2d}        : {elapsed:.3f}s (urutan identik)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_parser.py
+# Jalankan dari root repo: python -m benchmarks.bench_parser
+
+import time
+from bs4 import BeautifulSoup
+from bs4.builder import ParserRejectedMarkup
+from bs4.exceptions import FeatureNotFound
+from benchmarks.synthetic import render_page
+from utils.extract import (
+    extract_raw_product_data,
+    extract_raw_product_data_single_pass,
+    find_product_cards,
+)
+
+NUM_PAGES = 50
+
+def strip_timestamp(products):
+    return [{k: v for k, v in p.items() if k != 'extracted_at'} for p in products]
+
+def parse_legacy(pages):
+    products = []
+    for html in pages:
+        soup = BeautifulSoup(html, "html.parser")
+        for card in soup.find_all('div', class_='collection-card'):
+            products.append(extract_raw_product_data(card))
+    return products
+
+def parse_single_pass(pages, parser):
+    products = []
+    for html in pages:
+        for card in find_product_cards(html, parser):
+            products.append(extract_raw_product_data_single_pass(card))
+    return products
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def main():
+    pages = [render_page(n, total_pages=NUM_PAGES).encode() for n in range(1, NUM_PAGES + 1)]
+
+    legacy, legacy_time = timed(parse_legacy, pages)
+    expected = strip_timestamp(legacy)
+    cards = len(legacy)
+    print(f"{cards} cards dari {NUM_PAGES} halaman sintetis")
+    print(f"  legacy (html.parser, find x12)    : {cards / legacy_time:8.0f} cards/s")
+
+    for parser in ("html.parser", "lxml"):
+        try:
+            result, elapsed = timed(parse_single_pass, pages, parser)
+        except (FeatureNotFound, ParserRejectedMarkup):
+            print(f"  single-pass ({parser}) dilewati: backend tidak terpasang")
+            continue
+        assert strip_timestamp(result) == expected, f"Output single-pass ({parser}) berbeda dengan legacy"
+        print(f"  single-pass + strainer ({parser:11}): {cards / elapsed:8.0f} cards/s "
+              f"({legacy_time / elapsed:.2f}x, output identik)")
+
+    bench_card_walk(pages)
+
+def bench_card_walk(pages):
+    """Membandingkan biaya ekstraksi per card saja (tanpa biaya parsing HTML)."""
+    cards = []
+    for html in pages:
+        cards.extend(BeautifulSoup(html, "html.parser").find_all('div', class_='collection-card'))
+    _, legacy_time = timed(lambda: [extract_raw_product_data(c) for c in cards])
+    _, single_time = timed(lambda: [extract_raw_product_data_single_pass(c) for c in cards])
+    print("Ekstraksi card saja (tanpa parsing HTML):")
+    print(f"  extract_raw_product_data             : {len(cards) / legacy_time:8.0f} cards/s")
+    print(f"  extract_raw_product_data_single_pass : {len(cards) / single_time:8.0f} cards/s "
+          f"({legacy_time / single_time:.2f}x)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_postgres_load.py
+# Jalankan dari root repo: python -m benchmarks.bench_postgres_load [jumlah_baris]
+# Set BENCH_DB_URL ke PostgreSQL lokal; jika kosong dipakai SQLite sementara.
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+from io import StringIO
+import pandas as pd
+from sqlalchemy import create_engine
+from benchmarks.synthetic import generate_raw_products
+from utils.transform import transform_product_data
+from utils.load import load_to_postgres, get_engine
+
+DEFAULT_ROWS = 100_000
+RUNS = 3
+
+def legacy_load(data, db_url, table_name):
+    """Versi awal: engine baru setiap pemanggilan dan df.to_sql(if_exists='replace')."""
+    df = pd.DataFrame(data)
+    engine = create_engine(db_url)
+    df.to_sql(table_name, engine, index=False, if_exists='replace')
+    engine.dispose()
+
+def best_of(func):
+    times = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        with redirect_stdout(StringIO()):
+            func()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    data = transform_product_data(generate_raw_products(rows))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_url = os.getenv('BENCH_DB_URL') or f"sqlite:///{os.path.join(tmp_dir, 'bench.db')}"
+        legacy_time = best_of(lambda: legacy_load(data, db_url, 'products_legacy'))
+        bulk_time = best_of(lambda: load_to_postgres(data, db_url, table_name='products_bulk'))
+        loaded = pd.read_sql("SELECT COUNT(*) AS n FROM products_bulk", get_engine(db_url))["n"][0]
+        get_engine(db_url).dispose()
+
+    assert loaded == len(data)
+    print(f"Load {len(data):,} baris ke {db_url.split(':')[0]} (best of {RUNS}):")
+    print(f"  to_sql replace (engine baru) : {legacy_time:.2f}s ({len(data) / legacy_time:,.0f} rows/s)")
+    print(f"  bulk staging + swap          : {bulk_time:.2f}s ({len(data) / bulk_time:,.0f} rows/s)")
+    print(f"  speedup                      : {legacy_time / bulk_time:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+# benchmarks/bench_session.py
+# Jalankan dari root repo: python -m benchmarks.bench_session
+
+import time
+from benchmarks.server import LocalFashionServer
+from utils.extract import fetching_content, create_session
+
+NUM_REQUESTS = 500
+
+def bench_new_session_per_request(url):
+    start = time.perf_counter()
+    for _ in range(NUM_REQUESTS):
+        fetching_content(url)
+    return time.perf_counter() - start
+
+def bench_shared_session(url):
+    session = create_session()
+    start = time.perf_counter()
+    for _ in range(NUM_REQUESTS):
+        fetching_content(url, session)
+    elapsed = time.perf_counter() - start
+    session.close()
+    return elapsed
+
+def main():
+    with LocalFashionServer() as server:
+        # Pemanasan
+        fetching_content(server.url)
+        new_session = bench_new_session_per_request(server.url)
+        shared = bench_shared_session(server.url)
+
+    print(f"{NUM_REQUESTS} requests ke server lokal:")
+    print(f"  session baru per request : {new_session:.3f}s ({NUM_REQUESTS / new_session:.0f} req/s)")
+    print(f"  session bersama (pool)   : {shared:.3f}s ({NUM_REQUESTS / shared:.0f} req/s)")
+    print(f"  speedup                  : {new_session / shared:.2f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+# benchmarks/bench_transform.py
+# Jalankan dari root repo: python -m benchmarks.bench_transform [jumlah_baris]
+
+import sys
+import time
+from benchmarks.synthetic import generate_raw_products
+from utils.transform import transform_product_data, transform_product_data_rowwise
+
+DEFAULT_ROWS = 1_000_000
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_ROWS
+    raw_data = generate_raw_products(rows)
+
+    start = time.perf_counter()
+    rowwise = transform_product_data_rowwise(raw_data)
+    rowwise_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = transform_product_data(raw_data)
+    vectorized_time = time.perf_counter() - start
+
+    assert vectorized == rowwise, "Output vectorized berbeda dengan versi per-baris"
+    print(f"Transform {rows:,} baris mentah -> {len(vectorized):,} baris bersih (output identik):")
+    print(f"  per-baris  : {rowwise_time:.2f}s ({rows / rowwise_time:,.0f} rows/s)")
+    print(f"  vectorized : {vectorized_time:.2f}s ({rows / vectorized_time:,.0f} rows/s)")
+    print(f"  speedup    : {rowwise_time / vectorized_time:.2f}x")
+
+if __name__ == '__main__':
+    main()
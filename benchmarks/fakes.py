@@ -0,0 +1,41 @@
+# benchmarks/fakes.py
+
+import time
+
+class LatencySheetsService:
+    """Pengganti Sheets API v4 untuk benchmark: hanya menghitung sel, dengan latensi per request.
+
+    Cukup untuk SheetsWriter (batchUpdate / batchClear / execute) tanpa
+    menyimpan isi grid, sehingga yang terukur adalah biaya sisi klien
+    ditambah latency detik untuk setiap round-trip.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self.cells = 0
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def _request(self, result):
+        service = self
+
+        class Request:
+            def execute(self):
+                service.requests += 1
+                if service.latency:
+                    time.sleep(service.latency)
+                return result
+        return Request()
+
+    def batchUpdate(self, spreadsheetId, body):
+        cells = sum(len(row) for item in body['data'] for row in item['values'])
+        self.cells += cells
+        return self._request({'totalUpdatedCells': cells})
+
+    def batchClear(self, spreadsheetId, body):
+        return self._request({})
@@ -0,0 +1,84 @@
+# benchmarks/server.py
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_PAGE = """
+<html><body>
+<div class="collection-card">
+    <h3 class="product-title">Benchmark Product</h3>
+    <span class="price">$100.00</span>
+    <p>Rating: ⭐ 4.5 / 5</p>
+    <p>3 Colors</p>
+    <p>Size: M</p>
+    <p>Gender: Unisex</p>
+</div>
+</body></html>
+"""
+
+class LocalFashionServer:
+    """Server HTTP lokal pengganti fashion-studio untuk benchmark.
+
+    render_page(page_number) mengembalikan HTML (str), None untuk 404, atau
+    tuple (status, headers) untuk respons error tanpa body (misalnya 429
+    dengan Retry-After).
+    latency menambahkan jeda (detik) pada setiap respons.
+    """
+
+    def __init__(self, render_page=None, latency=0.0):
+        self.render_page = render_page or (lambda page_number: DEFAULT_PAGE)
+        self.latency = latency
+        self.request_count = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def _make_handler(self):
+        owner = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with owner._lock:
+                    owner.request_count += 1
+                if owner.latency:
+                    time.sleep(owner.latency)
+                path = self.path.rstrip("/")
+                page_number = int(path.rsplit("page", 1)[-1]) if "/page" in path else 1
+                html = owner.render_page(page_number)
+                if html is None or isinstance(html, tuple):
+                    status, headers = html or (404, {})
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                body = html.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
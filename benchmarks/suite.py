@@ -0,0 +1,221 @@
+# benchmarks/suite.py
+# Jalankan dari root repo:
+#   python -m benchmarks.suite --scale small                  # bandingkan dengan baseline
+#   python -m benchmarks.suite --scale small --save-baseline  # simpan hasil sebagai baseline baru
+#
+# Mengukur setiap tahap ETL (fetch, crawl, parse, transform dan setiap sink)
+# pada data sintetis dari benchmarks.synthetic dan server lokal pengganti
+# fashion-studio, lalu membandingkan hasilnya dengan baseline tersimpan.
+# Exit code 1 jika ada benchmark yang lebih lambat dari toleransi.
+
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import redirect_stdout
+from io import StringIO
+from benchmarks.fakes import LatencySheetsService
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import CARDS_PER_PAGE, render_page
+from utils.extract import build_page_url, create_session, extract_page_products, fetching_content, scrape_all_pages
+from utils.transform import transform_product_batch
+from utils.load import save_to_csv, save_to_columnar, load_to_gsheet, load_to_postgres, get_engine
+
+# Jumlah produk per skala; 20 card per halaman sehingga small = 50 halaman
+SCALES = {
+    "small": 1_000,
+    "medium": 20_000,
+    "large": 100_000,
+}
+BASELINE_DIR = os.path.join(os.path.dirname(__file__), "baselines")
+DEFAULT_TOLERANCE = 0.25
+# Selisih di bawah ini dianggap noise, berapa pun persentasenya
+MIN_REGRESSION_SECONDS = 0.05
+FETCH_CONCURRENCY = 8
+
+class SuiteContext:
+    """Data bersama untuk semua benchmark pada satu skala."""
+
+    def __init__(self, products, latency, work_dir):
+        self.pages = max(1, products // CARDS_PER_PAGE)
+        self.latency = latency
+        self.work_dir = work_dir
+        # Halaman dirender sekali agar server tidak ikut bersaing GIL saat diukur
+        self.html = {n: render_page(n, total_pages=self.pages) for n in range(1, self.pages + 1)}
+        self.raw_products = [p for n in sorted(self.html) for p in extract_page_products(self.html[n].encode())]
+        self.batch = transform_product_batch(self.raw_products)
+
+    def render(self, page_number):
+        return self.html.get(page_number)
+
+def bench_fetch(context, server):
+    session = create_session(pool_size=FETCH_CONCURRENCY)
+    urls = [build_page_url(server.url, n) for n in context.html]
+    with ThreadPoolExecutor(max_workers=FETCH_CONCURRENCY) as pool:
+        bodies = list(pool.map(lambda url: fetching_content(url, session), urls))
+    session.close()
+    assert all(bodies)
+    return len(urls), "pages"
+
+def bench_crawl(context, server):
+    products = scrape_all_pages(server.url, max_pages=context.pages, concurrency=FETCH_CONCURRENCY)
+    assert len(products) == len(context.raw_products)
+    return context.pages, "pages"
+
+def bench_parse(context, server):
+    count = sum(len(extract_page_products(html.encode())) for html in context.html.values())
+    return count, "cards"
+
+def bench_transform(context, server):
+    assert len(transform_product_batch(context.raw_products)) == len(context.batch)
+    return len(context.raw_products), "rows"
+
+def bench_sink_csv(context, server):
+    assert save_to_csv(context.batch, os.path.join(context.work_dir, "products.csv"))
+    return len(context.batch), "rows"
+
+def bench_sink_columnar(context, server):
+    assert save_to_columnar(context.batch, os.path.join(context.work_dir, "products.parquet"))
+    return len(context.batch), "rows"
+
+def bench_sink_postgres(context, server):
+    db_url = os.getenv('BENCH_DB_URL') or f"sqlite:///{os.path.join(context.work_dir, 'bench.db')}"
+    assert load_to_postgres(context.batch, db_url, table_name='products_bench')
+    return len(context.batch), "rows"
+
+def bench_sink_gsheet(context, server):
+    # Sheets API diganti fake dengan latensi per request yang sama seperti server lokal
+    service = LatencySheetsService(latency=context.latency)
+    assert load_to_gsheet(context.batch, service=service, spreadsheet_id='benchmark', range_name='Sheet1!A2')
+    return len(context.batch), "rows"
+
+BENCHMARKS = {
+    "fetch": bench_fetch,
+    "crawl": bench_crawl,
+    "parse": bench_parse,
+    "transform": bench_transform,
+    "sink_csv": bench_sink_csv,
+    "sink_columnar": bench_sink_columnar,
+    "sink_postgres": bench_sink_postgres,
+    "sink_gsheet": bench_sink_gsheet,
+}
+
+def _columnar_available():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+def run_suite(products, repeat=3, latency=0.005, only=None):
+    """Menjalankan benchmark (best of repeat) dan mengembalikan dict hasil per nama."""
+    names = [name for name in BENCHMARKS if not only or name in only]
+    if "sink_columnar" in names and not _columnar_available():
+        print("pyarrow is not installed, skipping sink_columnar")
+        names.remove("sink_columnar")
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        context = SuiteContext(products, latency, work_dir)
+        with LocalFashionServer(context.render, latency=latency) as server:
+            for name in names:
+                best = None
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    with redirect_stdout(StringIO()):
+                        items, unit = BENCHMARKS[name](context, server)
+                    elapsed = time.perf_counter() - start
+                    best = elapsed if best is None else min(best, elapsed)
+                results[name] = {"seconds": best, "items": items, "unit": unit, "per_second": items / best}
+                print(f"  {name:<14} {best:8.3f}s  {items / best:12,.0f} {unit}/s")
+        # Tutup koneksi SQLite sebelum direktori sementara dihapus
+        sqlite_path = os.path.join(work_dir, 'bench.db')
+        if os.path.exists(sqlite_path):
+            get_engine(f"sqlite:///{sqlite_path}").dispose()
+    return results
+
+def environment():
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+def baseline_path(scale):
+    return os.path.join(BASELINE_DIR, f"{scale}.json")
+
+def load_baseline(path):
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as file:
+        return json.load(file)
+
+def save_baseline(path, results, settings):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump({"environment": environment(), "settings": settings, "results": results}, file, indent=2)
+        file.write("\n")
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Daftar (nama, detik baseline, detik sekarang) untuk benchmark yang melambat melebihi toleransi."""
+    regressions = []
+    for name, result in results.items():
+        previous = baseline["results"].get(name)
+        if previous is None:
+            continue
+        limit = previous["seconds"] * (1 + tolerance)
+        if result["seconds"] > limit and result["seconds"] - previous["seconds"] > MIN_REGRESSION_SECONDS:
+            regressions.append((name, previous["seconds"], result["seconds"]))
+    return regressions
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark suite ETL fashion-studio")
+    parser.add_argument('--scale', choices=SCALES, default='small')
+    parser.add_argument('--products', type=int, default=None, help="Jumlah produk, menggantikan --scale")
+    parser.add_argument('--repeat', type=int, default=3, help="Ambil waktu terbaik dari N pengulangan")
+    parser.add_argument('--latency', type=float, default=0.005, help="Latensi per request server lokal (detik)")
+    parser.add_argument('--only', default=None, help=f"Daftar benchmark dipisah koma: {','.join(BENCHMARKS)}")
+    parser.add_argument('--baseline', default=None, help="File baseline (default benchmarks/baselines/<scale>.json)")
+    parser.add_argument('--save-baseline', action='store_true', help="Simpan hasil run ini sebagai baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help="Perlambatan relatif yang masih diterima, contoh 0.25 = 25%%")
+    return parser.parse_args(argv)
+
+def main(argv=None):
+    args = parse_args(argv)
+    products = args.products or SCALES[args.scale]
+    only = set(args.only.split(",")) if args.only else None
+    settings = {"products": products, "repeat": args.repeat, "latency": args.latency}
+    path = args.baseline or baseline_path(args.scale)
+
+    print(f"Benchmark suite: {products:,} produk ({products // CARDS_PER_PAGE:,} halaman), "
+          f"latensi {args.latency * 1000:.0f}ms, best of {args.repeat}")
+    results = run_suite(products, args.repeat, args.latency, only)
+
+    if args.save_baseline:
+        save_baseline(path, results, settings)
+        print(f"Baseline saved to {path}")
+        return 0
+
+    baseline = load_baseline(path)
+    if baseline is None:
+        print(f"No baseline at {path}; run with --save-baseline to create one")
+        return 0
+    if baseline.get("settings") != settings:
+        print(f"Warning: baseline settings {baseline.get('settings')} differ from this run {settings}")
+    if baseline.get("environment") != environment():
+        print(f"Warning: baseline was recorded on {baseline.get('environment')}")
+
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for name, before, after in regressions:
+        print(f"REGRESSION {name}: {before:.3f}s -> {after:.3f}s (+{(after / before - 1) * 100:.0f}%)")
+    if not regressions:
+        print(f"No regressions against {path} (tolerance {args.tolerance:.0%})")
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,101 @@
+# benchmarks/synthetic.py
+
+import random
+
+PRODUCT_TYPES = ["T-shirt", "Hoodie", "Pants", "Outerwear", "Jacket", "Crewneck"]
+SIZES = ["S", "M", "L", "XL", "XXL"]
+GENDERS = ["Men", "Women", "Unisex"]
+CARDS_PER_PAGE = 20
+
+def render_card(index, rng):
+    """Membuat satu collection-card dengan markup seperti fashion-studio."""
+    roll = rng.random()
+    if roll < 0.03:
+        # Produk tidak dikenal tanpa harga
+        title = "Unknown Product"
+        price = '<p class="price">Price Unavailable</p>'
+        rating = "Rating: ⭐ Invalid Rating / 5"
+    else:
+        title = f"{PRODUCT_TYPES[index % len(PRODUCT_TYPES)]} {index}"
+        price = f'<div class="price-container"><span class="price">${rng.uniform(10, 500):.2f}</span></div>'
+        if roll < 0.06:
+            rating = "Rating: Not Rated"
+        elif roll < 0.08:
+            rating = "Rating: ⭐ Invalid Rating / 5"
+        else:
+            rating = f"Rating: ⭐ {rng.uniform(1, 5):.1f} / 5"
+
+    details = [
+        f'<p style="font-size: 14px; color: #777;">{rating}</p>',
+        f'<p style="font-size: 14px; color: #777;">{rng.randint(1, 8)} Colors</p>',
+        f'<p style="font-size: 14px; color: #777;">Size: {SIZES[index % len(SIZES)]}</p>',
+        f'<p style="font-size: 14px; color: #777;">Gender: {GENDERS[index % len(GENDERS)]}</p>',
+    ]
+    if rng.random() < 0.02:
+        # Field yang hilang
+        details.pop(rng.randrange(len(details)))
+
+    return (
+        '<div class="collection-card">'
+        '<div style="position: relative;">'
+        f'<img src="https://picsum.photos/280/350?random={index}" class="collection-image" alt="{title}">'
+        '</div>'
+        '<div class="product-details">'
+        f'<h3 class="product-title">{title}</h3>'
+        f'{price}'
+        f'{"".join(details)}'
+        '</div>'
+        '</div>'
+    )
+
+def render_page(page_number, total_pages=50, cards_per_page=CARDS_PER_PAGE, seed=42):
+    """Membuat satu halaman katalog lengkap dengan navigasi dan pagination."""
+    if page_number < 1 or page_number > total_pages:
+        return None
+    rng = random.Random(seed * 100003 + page_number)
+    start = (page_number - 1) * cards_per_page + 1
+    cards = "".join(render_card(i, rng) for i in range(start, start + cards_per_page))
+    next_class = "page-item next disabled" if page_number == total_pages else "page-item next"
+    return (
+        "<!DOCTYPE html><html><head><title>Fashion Studio</title></head><body>"
+        '<nav class="navbar"><a href="/">Home</a><a href="/products">Products</a></nav>'
+        '<div class="collection-grid" id="collectionList">'
+        f"{cards}"
+        "</div>"
+        '<ul class="pagination">'
+        f'<li class="page-item previous"><a class="page-link" href="/page{page_number - 1}">Previous</a></li>'
+        f'<li class="page-item current"><span class="page-link">{page_number}</span></li>'
+        f'<li class="{next_class}"><a class="page-link" href="/page{page_number + 1}">Next</a></li>'
+        "</ul>"
+        "<footer><p>© Fashion Studio</p></footer>"
+        "</body></html>"
+    )
+
+def generate_raw_products(count, seed=42):
+    """Membuat list dict mentah seperti keluaran extract_raw_product_data."""
+    rng = random.Random(seed)
+    timestamp = "2025-06-04T09:51:20.057908"
+    products = []
+    for index in range(1, count + 1):
+        roll = rng.random()
+        if roll < 0.03:
+            rating = "Rating: ⭐ Invalid Rating / 5"
+        elif roll < 0.06:
+            rating = "Rating: Not Rated"
+        else:
+            rating = f"Rating: ⭐ {rng.uniform(1, 5):.1f} / 5"
+        product = {
+            "title": f"{PRODUCT_TYPES[index % len(PRODUCT_TYPES)]} {index}",
+            "price": f"${rng.uniform(10, 500):,.2f}",
+            "rating_text": rating,
+            "colors_text": f"{rng.randint(1, 8)} Colors",
+            "size_text": f"Size: {SIZES[index % len(SIZES)]}",
+            "gender_text": f"Gender: {GENDERS[index % len(GENDERS)]}",
+            "extracted_at": timestamp,
+            "timestamp": timestamp,
+        }
+        if roll > 0.98:
+            # Produk tanpa harga
+            del product["price"]
+        products.append(product)
+    return products
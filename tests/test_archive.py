@@ -0,0 +1,111 @@
+import threading
+from datetime import datetime
+from unittest.mock import patch
+from utils.archive import PageArchive, INDEX_ENTRY
+from utils.extract import scrape_all_pages, replay_all_pages
+
+def page_html(page_number, run=1):
+    return f"""
+<div class="collection-card">
+    <h3 class="product-title">Product {page_number} run {run}</h3>
+    <span class="price">$10.00</span>
+    <p>Rating: ⭐ 4.0 / 5</p>
+</div>
+""".encode()
+
+def strip_timestamps(products):
+    return [{k: v for k, v in p.items() if k not in ('extracted_at', 'timestamp')} for p in products]
+
+def test_archive_stores_runs_and_reads_latest(tmp_path):
+    path = str(tmp_path / "crawl.archive")
+    archive = PageArchive(path)
+    archive.open_run()
+    for page in (2, 1):
+        archive.append(page, page_html(page))
+    archive.close()
+
+    archive = PageArchive(path)
+    archive.open_run()
+    archive.append(1, page_html(1, run=2))
+    archive.close()
+
+    reader = PageArchive(path)
+    assert reader.runs() == [1, 2]
+    assert list(reader.iter_pages(run_id=1)) == [(1, page_html(1)), (2, page_html(2))]
+    assert list(reader.iter_pages()) == [(1, page_html(1, run=2))]
+    reader.close()
+
+def test_archive_ignores_truncated_index_entry(tmp_path):
+    path = str(tmp_path / "crawl.archive")
+    archive = PageArchive(path)
+    archive.append(1, page_html(1))
+    archive.close()
+    with open(f"{path}.idx", "ab") as f:
+        f.write(b"\x00" * (INDEX_ENTRY.size - 3))
+
+    assert list(PageArchive(path).iter_pages()) == [(1, page_html(1))]
+
+def test_open_run_drops_truncated_index_entry(tmp_path):
+    path = str(tmp_path / "crawl.archive")
+    archive = PageArchive(path)
+    archive.append(1, page_html(1))
+    archive.close()
+    with open(f"{path}.idx", "ab") as f:
+        f.write(b"\x01" * 5)  # crash saat menulis entri
+
+    archive = PageArchive(path)
+    assert archive.open_run() == 2
+    archive.append(1, page_html(1, run=2))
+    archive.close()
+
+    reader = PageArchive(path)
+    assert reader.runs() == [1, 2]
+    assert list(reader.iter_pages()) == [(1, page_html(1, run=2))]
+
+def test_concurrent_first_appends_open_one_run(tmp_path):
+    path = str(tmp_path / "crawl.archive")
+    archive = PageArchive(path)
+    barrier = threading.Barrier(8)
+
+    def append(page):
+        barrier.wait()
+        archive.append(page, page_html(page))
+    threads = [threading.Thread(target=append, args=(page,)) for page in range(1, 9)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    archive.close()
+
+    reader = PageArchive(path)
+    assert reader.runs() == [1]
+    assert [page for page, _ in reader.iter_pages()] == list(range(1, 9))
+
+@patch('utils.extract.fetching_content')
+def test_replay_matches_live_crawl(mock_fetch, tmp_path):
+    mock_fetch.side_effect = lambda url, session=None: page_html(int(url.rsplit('page', 1)[-1]) if '/page' in url else 1)
+    archive = PageArchive(str(tmp_path / "crawl.archive"))
+    live = scrape_all_pages("http://test.com", delay=0, max_pages=4, archive=archive)
+    archive.close()
+    mock_fetch.reset_mock()
+
+    replayed = replay_all_pages(PageArchive(str(tmp_path / "crawl.archive")))
+    replayed_parallel = replay_all_pages(PageArchive(str(tmp_path / "crawl.archive")), parse_workers=2)
+
+    assert not mock_fetch.called
+    assert strip_timestamps(replayed) == strip_timestamps(live)
+    assert strip_timestamps(replayed_parallel) == strip_timestamps(live)
+
+def test_replay_uses_stored_fetch_time(tmp_path):
+    path = str(tmp_path / "crawl.archive")
+    fetched_at = datetime(2025, 6, 4, 9, 51, 20).timestamp()
+    archive = PageArchive(path)
+    with patch('utils.archive.time.time', return_value=fetched_at):
+        archive.append(1, page_html(1))
+    archive.close()
+
+    expected = datetime.fromtimestamp(fetched_at).isoformat()
+    replayed = replay_all_pages(PageArchive(path))
+    assert [(p['timestamp'], p['extracted_at']) for p in replayed] == [(expected, expected)]
+    rows = replay_all_pages(PageArchive(path), fused=True)
+    assert [row[-1] for row in rows] == [expected]
@@ -0,0 +1,52 @@
+# tests/test_benchmark_suite.py
+
+import os
+from benchmarks.suite import run_suite, compare_to_baseline, save_baseline, load_baseline, main
+from benchmarks.synthetic import render_page
+from utils.extract import extract_page_products
+
+def test_synthetic_pages_cover_edge_cases():
+    products = [p for n in range(1, 51) for p in extract_page_products(render_page(n).encode())]
+    ratings = {p.get('rating_text', '') for p in products}
+    assert any('Not Rated' in rating for rating in ratings)
+    assert any('Invalid Rating' in rating for rating in ratings)
+    assert any(p['title'] == 'Unknown Product' and 'price' not in p for p in products)  # Price Unavailable
+    assert any('price' in p and len(p) < 8 for p in products)  # card dengan field detail yang hilang
+
+def test_run_suite_small_scale():
+    results = run_suite(60, repeat=1, latency=0, only={'fetch', 'parse', 'transform', 'sink_csv'})
+    assert set(results) == {'fetch', 'parse', 'transform', 'sink_csv'}
+    assert results['fetch']['items'] == 3
+    assert all(result['seconds'] > 0 for result in results.values())
+
+def test_compare_to_baseline_flags_only_real_slowdowns():
+    baseline = {'results': {'parse': {'seconds': 1.0}, 'transform': {'seconds': 0.01}}}
+    results = {'parse': {'seconds': 1.5}, 'transform': {'seconds': 0.03}, 'crawl': {'seconds': 9.0}}
+    # transform 3x lebih lambat tetapi selisihnya di bawah batas noise; crawl belum punya baseline
+    assert compare_to_baseline(results, baseline, tolerance=0.25) == [('parse', 1.0, 1.5)]
+    assert compare_to_baseline(results, baseline, tolerance=0.6) == []
+
+def test_main_saves_and_checks_baseline(tmp_path, capsys, monkeypatch):
+    path = str(tmp_path / 'baseline.json')
+    argv = ['--products', '40', '--repeat', '1', '--latency', '0', '--only', 'parse', '--baseline', path]
+    assert main(argv + ['--save-baseline']) == 0
+    assert load_baseline(path)['settings'] == {'products': 40, 'repeat': 1, 'latency': 0.0}
+
+    baseline = load_baseline(path)
+    baseline['results']['parse']['seconds'] = 100.0
+    save_baseline(path, baseline['results'], baseline['settings'])
+    assert main(argv) == 0
+    assert 'No regressions' in capsys.readouterr().out
+
+    baseline['results']['parse']['seconds'] = 1e-9
+    save_baseline(path, baseline['results'], baseline['settings'])
+    monkeypatch.setattr('benchmarks.suite.MIN_REGRESSION_SECONDS', 0)
+    assert main(argv) == 1
+    assert 'REGRESSION parse' in capsys.readouterr().out
+
+def test_gsheet_benchmark_does_not_touch_environment(monkeypatch):
+    monkeypatch.delenv('SPREADSHEET_ID', raising=False)
+    monkeypatch.delenv('RANGE_NAME', raising=False)
+    results = run_suite(20, repeat=1, latency=0, only={'sink_gsheet'})
+    assert set(results) == {'sink_gsheet'}
+    assert 'SPREADSHEET_ID' not in os.environ and 'RANGE_NAME' not in os.environ
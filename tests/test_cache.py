@@ -0,0 +1,118 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from utils.archive import PageArchive
+from utils.cache import PageCache
+from utils.extract import create_session, scrape_all_pages
+
+def page_html(page_number, version=1):
+    return f"""
+<div class="collection-card">
+    <h3 class="product-title">Product {page_number} v{version}</h3>
+    <span class="price">$10.00</span>
+    <p>Rating: ⭐ 4.0 / 5</p>
+</div>
+"""
+
+@pytest.fixture
+def etag_server():
+    """Server lokal dengan ETag per halaman; use_etag=False menonaktifkan validator."""
+    state = {"version": 1, "use_etag": True, "requests": 0, "not_modified": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            state["requests"] += 1
+            page = int(self.path.rsplit("page", 1)[-1]) if "/page" in self.path else 1
+            etag = f'"p{page}-v{state["version"]}"'
+            if state["use_etag"] and self.headers.get("If-None-Match") == etag:
+                state["not_modified"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            body = page_html(page, state["version"]).encode()
+            self.send_response(200)
+            if state["use_etag"]:
+                self.send_header("ETag", etag)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", state
+    server.shutdown()
+    server.server_close()
+
+def titles(products):
+    return [p["title"] for p in products]
+
+def test_cache_revalidates_with_etag(etag_server, tmp_path):
+    url, state = etag_server
+    cache = PageCache(str(tmp_path / "cache.db"))
+
+    first = scrape_all_pages(url, delay=0, max_pages=3, cache=cache)
+    second = scrape_all_pages(url, delay=0, max_pages=3, cache=cache)
+
+    assert titles(second) == titles(first) == ["Product 1 v1", "Product 2 v1", "Product 3 v1"]
+    assert state["not_modified"] == 3
+    report = cache.report()
+    assert report["misses"] == 3
+    assert report["revalidated"] == 3
+    assert report["hit_ratio"] == 0.5
+    # Produk dari cache diberi waktu fetch run ini, bukan waktu run pertama
+    assert all(p["timestamp"] > first[-1]["timestamp"] for p in second)
+    assert all(p["extracted_at"] == p["timestamp"] for p in second)
+
+def test_cache_detects_changed_pages(etag_server, tmp_path):
+    url, state = etag_server
+    cache = PageCache(str(tmp_path / "cache.db"))
+    scrape_all_pages(url, delay=0, max_pages=2, cache=cache)
+
+    state["version"] = 2
+    result = scrape_all_pages(url, delay=0, max_pages=2, concurrency=2, cache=cache)
+
+    assert titles(result) == ["Product 1 v2", "Product 2 v2"]
+    assert cache.report()["misses"] == 4
+
+def test_cache_skips_parse_for_unchanged_body_without_validators(etag_server, tmp_path):
+    url, state = etag_server
+    state["use_etag"] = False
+    cache = PageCache(str(tmp_path / "cache.db"))
+    session = create_session()
+
+    content, products = cache.fetch(url, session)
+    assert content and products is None
+    cache.store(url, [{"title": "cached"}])
+
+    content, products = cache.fetch(url, session)
+    assert content is None
+    assert products == [{"title": "cached"}]
+    assert cache.report()["unchanged"] == 1
+
+def test_cache_evicts_least_recently_used(etag_server, tmp_path):
+    url, _ = etag_server
+    cache = PageCache(str(tmp_path / "cache.db"), max_bytes=300)
+    scrape_all_pages(url, delay=0, max_pages=3, cache=cache)
+
+    report = cache.report()
+    assert report["evictions"] >= 1
+    assert report["size_bytes"] <= 300
+
+def test_cache_hits_are_archived(etag_server, tmp_path):
+    url, state = etag_server
+    cache = PageCache(str(tmp_path / "cache.db"))
+    path = str(tmp_path / "crawl.archive")
+    for _ in range(2):
+        archive = PageArchive(path)
+        scrape_all_pages(url, delay=0, max_pages=3, cache=cache, archive=archive)
+        archive.close()
+    assert state["not_modified"] == 3
+
+    reader = PageArchive(path)
+    assert reader.runs() == [1, 2]
+    assert list(reader.iter_pages()) == [(page, page_html(page).encode()) for page in (1, 2, 3)]
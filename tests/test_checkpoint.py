@@ -0,0 +1,93 @@
+# tests/test_checkpoint.py
+
+from unittest.mock import patch
+from utils.checkpoint import CrawlCheckpoint
+from utils.extract import iter_product_pages, scrape_all_pages
+
+BASE_URL = "http://test.com"
+
+def page_html(page_number):
+    return f"""
+<div class="collection-card">
+    <h3 class="product-title">Product {page_number}</h3>
+    <span class="price">$10.00</span>
+    <p>Rating: ⭐ 4.0 / 5</p>
+</div>
+""".encode()
+
+def page_of(url):
+    return int(url.rsplit('page', 1)[-1]) if '/page' in url else 1
+
+def fetched_pages(mock_fetch):
+    return [page_of(call.args[0]) for call in mock_fetch.call_args_list]
+
+@patch('utils.extract.fetching_content')
+def test_resume_after_crash_skips_completed_pages(mock_fetch, tmp_path):
+    mock_fetch.side_effect = lambda url, session=None: page_html(page_of(url))
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'crawl.db'))
+
+    pages = iter_product_pages(BASE_URL, delay=0, max_pages=5, checkpoint=checkpoint)
+    assert [next(pages)[0] for _ in range(3)] == [1, 2, 3]
+    pages.close()  # crawl terhenti setelah halaman 3
+    checkpoint.close()
+
+    mock_fetch.reset_mock()
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'crawl.db'))
+    result = scrape_all_pages(BASE_URL, delay=0, max_pages=5, checkpoint=checkpoint)
+
+    assert [p['title'] for p in result] == [f"Product {i}" for i in range(1, 6)]
+    assert fetched_pages(mock_fetch) == [4, 5]
+
+    # Crawl sudah selesai, run berikutnya dimulai dari awal
+    mock_fetch.reset_mock()
+    scrape_all_pages(BASE_URL, delay=0, max_pages=5, checkpoint=checkpoint)
+    assert fetched_pages(mock_fetch) == [1, 2, 3, 4, 5]
+
+@patch('utils.extract.fetching_content')
+def test_failed_pages_are_retried_at_end_and_recorded(mock_fetch, tmp_path):
+    attempts = {}
+
+    def flaky(url, session=None):
+        page = page_of(url)
+        attempts[page] = attempts.get(page, 0) + 1
+        if page == 2 and attempts[page] == 1:
+            return None  # gagal sekali lalu berhasil
+        if page == 4:
+            return None  # selalu gagal
+        return page_html(page)
+
+    mock_fetch.side_effect = flaky
+    checkpoint = CrawlCheckpoint(str(tmp_path / 'crawl.db'))
+    pages = list(iter_product_pages(BASE_URL, delay=0, max_pages=5, concurrency=2, checkpoint=checkpoint))
+
+    assert [page for page, _ in pages] == [1, 3, 5, 2, 4]
+    assert pages[-1] == (4, None)
+    assert checkpoint.failed_pages(BASE_URL) == [(4, 2)]
+
+    # Crawl belum selesai karena halaman 4 gagal: run berikutnya hanya mengambil halaman 4
+    mock_fetch.reset_mock()
+    mock_fetch.side_effect = lambda url, session=None: page_html(page_of(url))
+    result = scrape_all_pages(BASE_URL, delay=0, max_pages=5, checkpoint=checkpoint)
+    assert [p['title'] for p in result] == [f"Product {i}" for i in range(1, 6)]
+    assert fetched_pages(mock_fetch) == [4]
+    assert checkpoint.failed_pages(BASE_URL) == []
+
+@patch('utils.extract.fetching_content')
+def test_scrape_keeps_page_order_after_retry(mock_fetch):
+    attempts = {}
+
+    def flaky(url, session=None):
+        page = page_of(url)
+        attempts[page] = attempts.get(page, 0) + 1
+        return None if page == 2 and attempts[page] == 1 else page_html(page)
+
+    mock_fetch.side_effect = flaky
+    result = scrape_all_pages(BASE_URL, delay=0, max_pages=4)
+    assert [p['title'] for p in result] == [f"Product {i}" for i in range(1, 5)]
+
+@patch('utils.extract.fetching_content')
+def test_retry_failed_zero_keeps_single_pass(mock_fetch):
+    mock_fetch.return_value = None
+    pages = list(iter_product_pages(BASE_URL, delay=0, max_pages=2, retry_failed=0))
+    assert pages == [(1, None), (2, None)]
+    assert mock_fetch.call_count == 2
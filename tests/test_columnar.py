@@ -0,0 +1,59 @@
+import pytest
+import pandas as pd
+
+pytest.importorskip("pyarrow")
+
+from utils.columnar import ColumnarSink, read_columnar, product_schema
+from utils.load import save_to_columnar
+from utils.batch import ProductBatch
+
+def make_products(day, count=3, offset=0):
+    return [
+        {'Title': f'Product {offset + i}', 'Price': 10.0 + i, 'Rating': 4.5, 'Colors': 3,
+         'Size': 'M' if i % 2 else 'L', 'Gender': 'Men', 'Timestamp': f'2025-06-{day:02d}T09:51:20.057908'}
+        for i in range(count)
+    ]
+
+def test_save_to_columnar_parquet_schema(tmp_path):
+    path = str(tmp_path / 'products.parquet')
+    assert save_to_columnar(make_products(4), path) is True
+
+    df = read_columnar(path)
+    assert len(df) == 3
+    assert str(df['Price'].dtype) == 'float64'
+    assert str(df['Colors'].dtype) == 'int64'
+    assert isinstance(df['Size'].dtype, pd.CategoricalDtype)
+    assert pd.api.types.is_datetime64_any_dtype(df['Timestamp'])
+
+@pytest.mark.parametrize('file_format', ['parquet', 'arrow'])
+def test_columnar_sink_writes_batches_incrementally(tmp_path, file_format):
+    path = str(tmp_path / f'products.{file_format}')
+    with ColumnarSink(path, file_format) as sink:
+        sink.write_batch(make_products(4))
+        sink.write_batch(make_products(4, offset=3))
+    assert sink.rows_written == 6
+    assert read_columnar(path, file_format)['Title'].tolist() == [f'Product {i}' for i in range(6)]
+
+def test_columnar_sink_partitions_by_extraction_date(tmp_path):
+    path = tmp_path / 'dataset'
+    with ColumnarSink(str(path), partition_by_date=True) as sink:
+        sink.write_batch(make_products(4) + make_products(5, offset=3))
+        sink.write_batch(make_products(5, offset=6))
+
+    assert sorted(p.name for p in path.iterdir()) == ['extraction_date=2025-06-04', 'extraction_date=2025-06-05']
+    assert len(list((path / 'extraction_date=2025-06-05').iterdir())) == 2
+    df = read_columnar(str(path))
+    assert len(df) == 9
+    assert set(df.columns) == set(product_schema().names) | {'extraction_date'}
+
+def test_columnar_sink_rejects_unknown_format(tmp_path):
+    with pytest.raises(ValueError):
+        ColumnarSink(str(tmp_path / 'x'), 'orc')
+
+def test_columnar_sink_accepts_product_batch(tmp_path):
+    batch = ProductBatch.from_records(make_products(4) + make_products(5, offset=3))
+    with ColumnarSink(str(tmp_path / 'dataset'), partition_by_date=True) as sink:
+        sink.write_batch(batch)
+    assert len(read_columnar(str(tmp_path / 'dataset'))) == 6
+    # Timestamp batch tetap string; konversi dilakukan pada salinan
+    assert batch.df['Timestamp'].tolist()[0] == '2025-06-04T09:51:20.057908'
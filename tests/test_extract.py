@@ -1,13 +1,27 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 import pytest
 from unittest.mock import patch, MagicMock
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from utils.extract import (
     fetching_content,
     extract_raw_product_data,
     scrape_all_pages,
-    get_current_timestamp
+    get_current_timestamp,
+    RateLimiter,
+    create_session,
+    extract_raw_product_data_single_pass,
+    extract_page_products,
+    find_product_cards,
+    iter_product_pages,
+    iter_raw_product_batches,
+    extract_page_rows,
+    PARSE_START_METHOD
 )
 from bs4 import BeautifulSoup
+from utils.transform import rows_to_batch, transform_product_batch
 
 SAMPLE_HTML = """
 <div class="collection-card">
@@ -35,6 +49,14 @@ class TestExtract:
             
             result = fetching_content("http://test.com")
             assert result == b"<html>test</html>"
+            # Session yang dibuat sendiri ditutup lagi agar connection pool tidak bocor
+            mock_session.return_value.close.assert_called_once()
+
+    def test_fetching_content_keeps_caller_session_open(self):
+        session = MagicMock()
+        session.get.return_value.content = b"<html>test</html>"
+        assert fetching_content("http://test.com", session=session) == b"<html>test</html>"
+        session.close.assert_not_called()
 
     def test_extract_raw_product_data_with_timestamp(self):
         soup = BeautifulSoup(SAMPLE_HTML, 'html.parser')
@@ -52,4 +74,228 @@ class TestExtract:
         assert len(result) > 0
         for product in result:
             assert 'extracted_at' in product
-            datetime.fromisoformat(product['extracted_at'])
\ No newline at end of file
+            datetime.fromisoformat(product['extracted_at'])
+
+def make_page_html(page_number):
+    return f"""
+<div class="collection-card">
+    <h3 class="product-title">Product {page_number}</h3>
+    <span class="price">$10.00</span>
+    <p>Rating: ⭐ 4.0 / 5</p>
+</div>
+"""
+
+class TestConcurrentScrape:
+    @patch('utils.extract.fetching_content')
+    def test_scrape_all_pages_concurrent_keeps_page_order(self, mock_fetch):
+        def fake_fetch(url, session=None):
+            page = int(url.rsplit('page', 1)[-1]) if '/page' in url else 1
+            return make_page_html(page).encode()
+        mock_fetch.side_effect = fake_fetch
+
+        result = scrape_all_pages("http://test.com", max_pages=6, concurrency=4)
+
+        assert [p['title'] for p in result] == [f"Product {i}" for i in range(1, 7)]
+
+    @patch('utils.extract.fetching_content')
+    def test_scrape_all_pages_concurrent_skips_failed_pages(self, mock_fetch):
+        mock_fetch.side_effect = lambda url, session=None: None if url.endswith('page2') else SAMPLE_HTML.encode()
+
+        result = scrape_all_pages("http://test.com", max_pages=3, concurrency=2)
+
+        assert len(result) == 2
+
+    @patch('utils.extract.fetching_content')
+    def test_scrape_all_pages_process_pool_keeps_page_order(self, mock_fetch):
+        def fake_fetch(url, session=None):
+            page = int(url.rsplit('page', 1)[-1]) if '/page' in url else 1
+            return make_page_html(page).encode()
+        mock_fetch.side_effect = fake_fetch
+
+        result = scrape_all_pages("http://test.com", max_pages=8, concurrency=4, parse_workers=2)
+
+        assert [p['title'] for p in result] == [f"Product {i}" for i in range(1, 9)]
+        assert all('timestamp' in p for p in result)
+
+    @patch('utils.extract.fetching_content')
+    def test_process_pool_is_not_forked_from_io_threads(self, mock_fetch):
+        mock_fetch.return_value = make_page_html(1).encode()
+        contexts = []
+
+        def recording_pool(*args, **kwargs):
+            contexts.append(kwargs.get('mp_context'))
+            return ProcessPoolExecutor(*args, **kwargs)
+
+        with patch('utils.extract.ProcessPoolExecutor', side_effect=recording_pool):
+            result = scrape_all_pages("http://test.com", max_pages=2, concurrency=2, parse_workers=1)
+
+        assert len(result) == 2
+        assert [context.get_start_method() for context in contexts] == [PARSE_START_METHOD]
+        assert PARSE_START_METHOD != 'fork'
+
+    @patch('utils.extract.fetching_content')
+    def test_iter_product_pages_yields_each_page_in_order(self, mock_fetch):
+        def fake_fetch(url, session=None):
+            if url.endswith('page3'):
+                return None
+            page = int(url.rsplit('page', 1)[-1]) if '/page' in url else 1
+            return make_page_html(page).encode()
+        mock_fetch.side_effect = fake_fetch
+
+        pages = list(iter_product_pages("http://test.com", max_pages=5, concurrency=2))
+
+        # Halaman gagal diambil ulang di akhir crawl, baru dihasilkan None jika tetap gagal
+        assert [page_number for page_number, _ in pages] == [1, 2, 4, 5, 3]
+        assert pages[-1][1] is None
+        assert pages[2][1][0]['title'] == "Product 4"
+        assert [call.args[0] for call in mock_fetch.call_args_list].count("http://test.com/page3") == 2
+
+    @patch('utils.extract.fetching_content')
+    def test_iter_raw_product_batches_groups_pages(self, mock_fetch):
+        mock_fetch.side_effect = lambda url, session=None: SAMPLE_HTML.encode()
+
+        batches = list(iter_raw_product_batches("http://test.com", pages_per_batch=2, max_pages=5, delay=0))
+
+        assert [len(batch) for batch in batches] == [2, 2, 1]
+
+    @patch('utils.extract.fetching_content')
+    def test_scrape_all_pages_fused_matches_two_pass(self, mock_fetch):
+        def fake_fetch(url, session=None):
+            page = int(url.rsplit('page', 1)[-1]) if '/page' in url else 1
+            return make_page_html(page).encode()
+        mock_fetch.side_effect = fake_fetch
+
+        rows = scrape_all_pages("http://test.com", max_pages=6, concurrency=3, fused=True)
+        raw_data = scrape_all_pages("http://test.com", max_pages=6, concurrency=3)
+
+        assert all(isinstance(row, tuple) for row in rows)
+        fused = rows_to_batch(rows).df.drop(columns="Timestamp")
+        expected = transform_product_batch(raw_data).df.drop(columns="Timestamp")
+        assert fused.equals(expected)
+
+    def test_rate_limiter_spaces_requests(self):
+        limiter = RateLimiter(requests_per_second=50)
+        start = time.monotonic()
+        for _ in range(5):
+            limiter.wait()
+        # 5 request dengan interval 20ms -> minimal 80ms
+        assert time.monotonic() - start >= 0.075
+
+    def test_rate_limiter_disabled(self):
+        limiter = RateLimiter()
+        start = time.monotonic()
+        for _ in range(100):
+            limiter.wait()
+        assert time.monotonic() - start < 0.05
+
+
+@pytest.fixture
+def flaky_server():
+    """Server lokal yang membalas 503 + Retry-After pada request pertama."""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            hits.append(self.path)
+            if len(hits) == 1:
+                self.send_response(503)
+                self.send_header("Retry-After", "0")
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            body = SAMPLE_HTML.encode()
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", hits
+    server.shutdown()
+    server.server_close()
+
+class TestSession:
+    def test_create_session_configures_pool_and_retry(self):
+        session = create_session(pool_size=7, max_retries=4)
+        adapter = session.get_adapter("https://example.com")
+        assert adapter._pool_maxsize == 7
+        assert adapter.max_retries.total == 4
+        assert adapter.max_retries.respect_retry_after_header
+        assert 429 in adapter.max_retries.status_forcelist
+        assert "gzip" in session.headers["Accept-Encoding"]
+
+    def test_fetching_content_retries_on_503(self, flaky_server):
+        url, hits = flaky_server
+        session = create_session(backoff_factor=0)
+        result = fetching_content(url, session)
+        assert result == SAMPLE_HTML.encode()
+        assert len(hits) == 2
+
+    def test_scrape_all_pages_shares_one_session(self, flaky_server):
+        url, hits = flaky_server
+        session = create_session(backoff_factor=0)
+        with patch('utils.extract.fetching_content', wraps=fetching_content) as spy:
+            scrape_all_pages(url, delay=0, max_pages=3, session=session)
+        assert all(call.args[1] is session for call in spy.call_args_list)
+
+
+TRICKY_PAGE = """
+<html><body>
+<nav><p>Rating our shop</p></nav>
+<div class="collection-card">
+    <div class="product-details">
+        <h3 class="product-title">Unknown Product</h3>
+        <p class="price">Price Unavailable</p>
+        <p>Rating: ⭐ Invalid Rating / 5</p>
+        <p>Note: <b>5 Colors</b> available</p>
+        <p><span>Size: XL</span></p>
+        <p>Gender: Men</p>
+        <p>Gender: Women</p>
+    </div>
+</div>
+<div class="collection-card">
+    <h3 class="product-title">Hoodie 2</h3>
+    <div class="price-container"><span class="price">$1,250.50</span></div>
+    <p>Rating: Not Rated</p>
+</div>
+</body></html>
+"""
+
+def strip_timestamps(products):
+    return [{k: v for k, v in p.items() if k not in ('extracted_at', 'timestamp')} for p in products]
+
+class TestSinglePassParser:
+    def test_single_pass_matches_legacy_parser(self):
+        soup = BeautifulSoup(TRICKY_PAGE, 'html.parser')
+        cards = soup.find_all('div', class_='collection-card')
+        legacy = [extract_raw_product_data(card) for card in cards]
+        single = [extract_raw_product_data_single_pass(card) for card in cards]
+        assert strip_timestamps(single) == strip_timestamps(legacy)
+        assert single[0]['gender_text'] == 'Gender: Men'
+        assert 'colors_text' not in single[0]
+        assert single[1]['price'] == '$1,250.50'
+
+    def test_find_product_cards_with_strainer(self):
+        cards = find_product_cards(TRICKY_PAGE.encode())
+        assert len(cards) == 2
+        assert all('Rating our shop' not in card.get_text() for card in cards)
+
+    def test_extract_page_products_modes_agree(self):
+        fast = extract_page_products(TRICKY_PAGE.encode())
+        legacy = extract_page_products(TRICKY_PAGE.encode(), single_pass=False)
+        assert strip_timestamps(fast) == strip_timestamps(legacy)
+        assert all('timestamp' in p for p in fast)
+
+    def test_extract_page_rows_uses_one_timestamp_per_page(self):
+        # Card TRICKY_PAGE dibuang transform; dua card SAMPLE_HTML tetap ada
+        html = (TRICKY_PAGE + SAMPLE_HTML + SAMPLE_HTML.replace("Test Product", "Other Product")).encode()
+        rows = extract_page_rows(html)
+        expected = transform_product_batch(extract_page_products(html))
+        assert [row[:6] for row in rows] == [tuple(p.values())[:6] for p in expected]
+        assert len(rows) == 2
+        assert len({row[6] for row in rows}) == 1
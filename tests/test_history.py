@@ -0,0 +1,81 @@
+# tests/test_history.py
+
+import pandas as pd
+from sqlalchemy import text
+from utils.history import HistoryStore, record_price_history
+from utils.sinks import create_sinks
+from utils.transform import OUTPUT_COLUMNS
+
+def product(title, price, size="M", gender="Men", rating=4.0, timestamp="2025-06-04T09:51:20"):
+    return {"Title": title, "Price": price, "Rating": rating, "Colors": 3, "Size": size, "Gender": gender,
+            "Timestamp": timestamp}
+
+RUN_1 = [product("Shirt", 10.0), product("Shirt", 12.0, size="L"), product("Hoodie", 50.0, gender="Women")]
+RUN_2 = [product("Shirt", 11.0, rating=4.5), product("Shirt", 12.0, size="L"), product("Jacket", 80.0)]
+
+def test_price_changes_since_last_run(tmp_path):
+    store = HistoryStore(f"sqlite:///{tmp_path / 'history.db'}")
+    first = store.record_run(RUN_1)
+    second = store.record_run(pd.DataFrame(RUN_2, columns=OUTPUT_COLUMNS))
+    assert store.latest_run_id() == second
+
+    changes = store.price_changes()
+    assert changes[["Title", "Size", "previous_price", "Price", "previous_rating", "Rating"]].values.tolist() == [
+        ["Shirt", "M", 10.0, 11.0, 4.0, 4.5]]
+    assert changes["change"].round(2).tolist() == [1.0]
+    assert changes["previous_run_id"].tolist() == [first]
+    assert store.price_changes(first).empty
+
+    # Riwayat append-only; latest tetap menyimpan produk yang tidak muncul di run terakhir
+    assert store.product_history("Shirt", "M")["Price"].tolist() == [10.0, 11.0]
+    with store.engine.connect() as connection:
+        latest = dict(connection.execute(text("SELECT Title, run_id FROM product_latest WHERE Size = 'M'"))
+                      .fetchall())
+    assert latest == {"Shirt": second, "Hoodie": first, "Jacket": second}
+
+def test_run_aggregates_by_gender_and_size(tmp_path):
+    store = HistoryStore(f"sqlite:///{tmp_path / 'history.db'}")
+    run_id = store.record_run(RUN_1 + [product("Pants", 20.0, rating=2.0)])
+    aggregates = store.run_aggregates(run_id)
+    assert aggregates[["Gender", "Size", "product_count", "avg_price", "min_price", "max_price", "avg_rating"]] \
+        .values.tolist() == [
+            ["Men", "L", 1, 12.0, 12.0, 12.0, 4.0],
+            ["Men", "M", 2, 15.0, 10.0, 20.0, 3.0],
+            ["Women", "M", 1, 50.0, 50.0, 50.0, 4.0],
+        ]
+
+def test_queries_use_indexes(tmp_path):
+    store = HistoryStore(f"sqlite:///{tmp_path / 'history.db'}")
+    store.record_run(RUN_1)
+    with store.engine.connect() as connection:
+        plans = {
+            query: " ".join(row[-1] for row in connection.execute(text(f"EXPLAIN QUERY PLAN {query}")))
+            for query in (
+                "SELECT * FROM product_latest WHERE run_id = 1",
+                "SELECT * FROM product_history WHERE Title = 'Shirt' AND Size = 'M'",
+                "SELECT * FROM product_history WHERE Timestamp > '2025-06-01'",
+            )
+        }
+    assert all("USING INDEX" in plan for plan in plans.values()), plans
+
+def test_record_price_history_reports_run(tmp_path):
+    db_url = f"sqlite:///{tmp_path / 'history.db'}"
+    assert record_price_history(RUN_1, db_url) == {"run_id": 1, "rows": 3, "price_changes": 0}
+    assert record_price_history(RUN_2, db_url)["price_changes"] == 1
+    assert record_price_history(RUN_1, "mysql+pymysql://localhost/db") is None
+
+def test_history_sink_streams_batches_into_one_run(tmp_path):
+    options = {"history_url": f"sqlite:///{tmp_path / 'history.db'}"}
+    sink, = create_sinks(["history"], options)
+    assert sink.load(RUN_1)["run_id"] == 1
+
+    sink, = create_sinks(["history"], options)
+    assert sink.write_batch(RUN_2[:1], first_batch=True) is True
+    # Baris kedua (Shirt, M) di batch berikutnya tidak menimpa baris pertama run ini
+    assert sink.write_batch(RUN_2[1:] + [product("Shirt", 99.0)], first_batch=False) is True
+    sink.close()
+
+    store = HistoryStore(options["history_url"])
+    assert store.latest_run_id() == 2
+    assert store.price_changes()["Price"].tolist() == [11.0]
+    assert store.run_aggregates()["product_count"].sum() == 4
@@ -0,0 +1,95 @@
+# tests/test_metrics.py
+
+import json
+import time
+import pytest
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.extract import scrape_all_pages
+from utils.metrics import RunMetrics, format_prometheus
+
+@pytest.fixture
+def server():
+    with LocalFashionServer(lambda page: render_page(page, total_pages=3, cards_per_page=4)) as running:
+        yield running
+
+def test_stage_records_wall_time_and_excludes_nested_stages():
+    metrics = RunMetrics()
+    with metrics.stage("transform"):
+        time.sleep(0.05)
+        with metrics.stage("extract"):
+            time.sleep(0.1)
+    stages = metrics.report()["stages"]
+    assert stages["extract"]["wall_seconds"] >= 0.1
+    assert 0.05 <= stages["transform"]["wall_seconds"] < 0.1
+
+def test_timed_iter_accumulates_per_item():
+    metrics = RunMetrics()
+    assert list(metrics.timed_iter("extract", iter([1, 2, 3]))) == [1, 2, 3]
+    assert metrics.report()["stages"]["extract"]["calls"] == 4
+
+def test_scrape_records_pages_cards_status_and_bytes(server):
+    metrics = RunMetrics()
+    with metrics.stage("extract"):
+        products = scrape_all_pages(server.url, delay=0, max_pages=4, metrics=metrics)
+    report = metrics.report()
+    assert report["counters"]["pages"] == 3
+    assert report["counters"]["pages_failed"] == 1
+    assert report["counters"]["cards"] == len(products)
+    assert report["counters"]["bytes_fetched"] > 0
+    assert report["http_status"]["200"] == 3
+    assert report["http_status"]["404"] == 2  # halaman gagal diambil ulang sekali di akhir
+    assert report["counters"]["pages_retried"] == 1
+    assert report["stages"]["parse"]["calls"] == 3
+    assert report["rates"]["pages_per_second"] > 0
+
+def test_scrape_concurrent_records_parse_time(server):
+    metrics = RunMetrics()
+    scrape_all_pages(server.url, max_pages=3, concurrency=3, metrics=metrics)
+    assert metrics.report()["stages"]["parse"]["calls"] == 3
+
+def test_write_json_and_prometheus(tmp_path):
+    metrics = RunMetrics()
+    metrics.add_time("load", 1.5, 0.5)
+    metrics.increment("rows_transformed", 10)
+    metrics.record_sinks([{'sink': 'csv', 'status': 'ok', 'seconds': 0.2, 'error': None}])
+    metrics.write_json(tmp_path / "run.json")
+    metrics.write_prometheus(str(tmp_path / "etl.prom"))
+
+    report = json.loads((tmp_path / "run.json").read_text())
+    assert report["sinks"]["csv"] == {"seconds": 0.2, "runs": 1, "statuses": {"ok": 1}}
+    text = (tmp_path / "etl.prom").read_text()
+    assert 'etl_stage_wall_seconds{stage="load"} 1.5' in text
+    assert 'etl_items{kind="rows_transformed"} 10.0' in text
+    assert 'etl_sink_loads{sink="csv",status="ok"} 1.0' in text
+    assert "# TYPE etl_peak_memory_bytes gauge" in text
+
+def test_format_prometheus_escapes_labels():
+    report = RunMetrics().report()
+    report["sinks"] = {'a"b': {"seconds": 1.0, "runs": 1, "statuses": {}}}
+    assert 'sink="a\\"b"' in format_prometheus(report)
+
+def test_incomplete_sinks_are_reported():
+    metrics = RunMetrics()
+    metrics.record_sinks([{'sink': 'csv', 'status': 'ok', 'seconds': 0.1, 'error': None},
+                          {'sink': 'gsheet', 'status': 'timeout', 'seconds': 5.0, 'error': None}])
+    metrics.record_sinks([{'sink': 'csv', 'status': 'ok', 'seconds': 0.1, 'error': None},
+                          {'sink': 'gsheet', 'status': 'skipped', 'seconds': 0.0, 'error': None}])
+    assert metrics.incomplete_sinks() == {'gsheet': {'timeout': 1, 'skipped': 1}}
+    assert "INCOMPLETE sink    gsheet" in metrics.format_summary()
+    text = format_prometheus(metrics.report())
+    assert 'etl_sink_complete{sink="csv"} 1.0' in text
+    assert 'etl_sink_complete{sink="gsheet"} 0.0' in text
+
+def test_sink_delta_counts_are_reported():
+    metrics = RunMetrics()
+    delta = {'unchanged': 8, 'inserted': 1, 'updated': 2, 'deleted': 0}
+    metrics.record_sinks([{'sink': 'csv', 'status': 'ok', 'seconds': 0.1, 'error': None, 'value': delta},
+                          {'sink': 'gsheet', 'status': 'ok', 'seconds': 0.1, 'error': None, 'value': True}])
+    metrics.record_sinks([{'sink': 'csv', 'status': 'ok', 'seconds': 0.1, 'error': None,
+                           'value': dict(delta, inserted=3)}])
+    report = metrics.report()
+    assert report["sinks"]["csv"]["delta"] == {'unchanged': 16, 'inserted': 4, 'updated': 4, 'deleted': 0}
+    assert "delta" not in report["sinks"]["gsheet"]
+    assert "delta sink         csv unchanged=16, inserted=4, updated=4, deleted=0" in metrics.format_summary()
+    assert 'etl_sink_rows{sink="csv",kind="inserted"} 4.0' in format_prometheus(report)
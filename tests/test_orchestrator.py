@@ -0,0 +1,141 @@
+# tests/test_orchestrator.py
+
+import json
+import subprocess
+import sys
+import threading
+import time
+import main
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.orchestrator import LoadOrchestrator, format_load_summary
+from utils.sinks import SINKS, Sink
+
+def sleeper(seconds, value=True):
+    def load():
+        time.sleep(seconds)
+        return value
+    return load
+
+def statuses(results):
+    return {result['sink']: result['status'] for result in results}
+
+def test_sinks_run_concurrently():
+    with LoadOrchestrator() as orchestrator:
+        start = time.perf_counter()
+        results = orchestrator.run({'a': sleeper(0.3), 'b': sleeper(0.3), 'c': sleeper(0.3)})
+        elapsed = time.perf_counter() - start
+    assert statuses(results) == {'a': 'ok', 'b': 'ok', 'c': 'ok'}
+    assert elapsed < 0.8
+    assert all(result['seconds'] >= 0.3 for result in results)
+
+def test_failures_are_isolated():
+    def broken():
+        raise RuntimeError("boom")
+    with LoadOrchestrator() as orchestrator:
+        results = orchestrator.run({'csv': sleeper(0, True), 'gsheet': broken,
+                                    'postgres': sleeper(0, False), 'upsert': sleeper(0, None)})
+    assert statuses(results) == {'csv': 'ok', 'gsheet': 'failed', 'postgres': 'failed', 'upsert': 'failed'}
+    assert results[1]['error'] == 'boom'
+    assert [result['value'] for result in results] == [True, None, None, None]
+    # Urutan hasil mengikuti urutan sinks
+    assert [result['sink'] for result in results] == ['csv', 'gsheet', 'postgres', 'upsert']
+
+def test_timeout_and_skip_while_still_running():
+    release = threading.Event()
+    orchestrator = LoadOrchestrator(timeouts={'slow': 0.1})
+    try:
+        first = orchestrator.run({'fast': sleeper(0), 'slow': release.wait})
+        assert statuses(first) == {'fast': 'ok', 'slow': 'timeout'}
+        second = orchestrator.run({'fast': sleeper(0), 'slow': release.wait})
+        assert statuses(second) == {'fast': 'ok', 'slow': 'skipped'}
+        release.set()
+        time.sleep(0.05)
+        assert statuses(orchestrator.run({'slow': sleeper(0)})) == {'slow': 'ok'}
+    finally:
+        release.set()
+        orchestrator.close()
+
+def test_timed_out_sink_does_not_block_exit():
+    script = (
+        "import threading\n"
+        "from utils.orchestrator import LoadOrchestrator\n"
+        "orchestrator = LoadOrchestrator(default_timeout=0.2)\n"
+        "print(orchestrator.run({'hung': threading.Event().wait})[0]['status'])\n"
+        "print(sorted(orchestrator.abandoned()))\n"
+        "orchestrator.close(wait=True)\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30)
+    assert result.stdout.splitlines()[1:] == ["timeout", "['hung']"]
+    assert time.perf_counter() - start < 5
+
+def test_format_load_summary():
+    summary = format_load_summary([
+        {'sink': 'csv', 'status': 'ok', 'seconds': 0.5, 'error': None},
+        {'sink': 'gsheet', 'status': 'failed', 'seconds': 1.5, 'error': 'quota'},
+    ])
+    assert 'gsheet' in summary and '(quota)' in summary
+    assert '1/2 sinks succeeded' in summary
+    assert 'sequential total would be 2.00s' in summary
+
+class FlakySink(Sink):
+    """Sink uji yang gagal pada batch kedua mode streaming."""
+    batches = []
+
+    def write_batch(self, data, first_batch):
+        FlakySink.batches.append(len(data))
+        return len(FlakySink.batches) != 2
+
+def test_streaming_run_with_partial_sink_exits_non_zero(monkeypatch, tmp_path):
+    monkeypatch.setitem(SINKS, 'flaky', FlakySink)
+    monkeypatch.setattr(main, 'CSV_FILENAME', str(tmp_path / 'out.csv'))
+    monkeypatch.setitem(main.SCRAPE_OPTIONS, 'parse_workers', None)
+    FlakySink.batches = []
+    report_path = tmp_path / 'run.json'
+    site = lambda page_number: render_page(page_number, total_pages=3, cards_per_page=2)
+    with LocalFashionServer(site) as server:
+        monkeypatch.setattr(main, 'BASE_URL', server.url)
+        argv = ['--stream', '--pages-per-batch', '1', '--no-adaptive', '--metrics-json', str(report_path)]
+        assert main.main(argv + ['--sinks', 'csv']) == 0
+        assert main.main(argv + ['--sinks', 'csv,flaky']) == 1
+
+    assert FlakySink.batches == [2, 2, 2]
+    report = json.loads(report_path.read_text())
+    assert report["incomplete_sinks"] == {"flaky": {"failed": 1}}
+
+class HungSink(Sink):
+    """Sink uji yang tidak pernah selesai menulis."""
+    closed = False
+
+    def write_batch(self, data, first_batch):
+        threading.Event().wait()
+
+    def close(self):
+        HungSink.closed = True
+
+def test_streaming_run_abandons_hung_sink(monkeypatch, tmp_path):
+    monkeypatch.setitem(SINKS, 'hung', HungSink)
+    monkeypatch.setattr(main, 'CSV_FILENAME', str(tmp_path / 'out.csv'))
+    monkeypatch.setitem(main.SCRAPE_OPTIONS, 'parse_workers', None)
+    site = lambda page_number: render_page(page_number, total_pages=2, cards_per_page=2)
+    with LocalFashionServer(site) as server:
+        monkeypatch.setattr(main, 'BASE_URL', server.url)
+        argv = ['--stream', '--pages-per-batch', '1', '--no-adaptive', '--sink-timeout', '0.2',
+                '--sinks', 'csv,hung']
+        assert main.main(argv) == 1
+    assert not HungSink.closed
+
+def test_incremental_run_reports_sink_delta(monkeypatch, tmp_path):
+    monkeypatch.setattr(main, 'CSV_FILENAME', str(tmp_path / 'out.csv'))
+    monkeypatch.setitem(main.SCRAPE_OPTIONS, 'parse_workers', None)
+    report_path = tmp_path / 'run.json'
+    site = lambda page_number: render_page(page_number, total_pages=2, cards_per_page=3)
+    with LocalFashionServer(site) as server:
+        monkeypatch.setattr(main, 'BASE_URL', server.url)
+        argv = ['--incremental', '--sinks', 'csv', '--no-adaptive', '--metrics-json', str(report_path)]
+        assert main.main(argv) == 0
+        assert main.main(argv) == 0
+
+    delta = json.loads(report_path.read_text())["sinks"]["csv"]["delta"]
+    assert delta == {"unchanged": 6, "inserted": 0, "updated": 0, "deleted": 0}
@@ -0,0 +1,84 @@
+# tests/test_pagination.py
+
+import threading
+import time
+import pytest
+from benchmarks.server import DEFAULT_PAGE, LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.extract import (
+    SCHEDULER_RETRY_STATUSES, RateLimiter, create_session, discover_page_count, scrape_all_pages
+)
+from utils.scheduler import AdaptiveScheduler
+
+def catalogue(total_pages):
+    return lambda page_number: render_page(page_number, total_pages=total_pages, cards_per_page=2)
+
+def no_pagination_markup(total_pages):
+    # Tanpa li.next: akhir katalog hanya terlihat dari 404
+    return lambda page_number: DEFAULT_PAGE if 1 <= page_number <= total_pages else None
+
+@pytest.mark.parametrize('total_pages', [1, 2, 7, 13, 50])
+@pytest.mark.parametrize('make_site', [catalogue, no_pagination_markup])
+def test_discover_page_count(total_pages, make_site):
+    with LocalFashionServer(make_site(total_pages)) as server:
+        count, contents = discover_page_count(server.url, create_session(), max_pages=200)
+        assert count == total_pages
+        assert set(contents) <= set(range(1, total_pages + 1))
+        # Probe eksponensial + binary search: jauh lebih sedikit dari jumlah halaman
+        assert server.request_count <= 2 * total_pages.bit_length() + 2
+
+def test_discover_page_count_is_capped_by_max_pages():
+    with LocalFashionServer(catalogue(100)) as server:
+        assert discover_page_count(server.url, create_session(), max_pages=10)[0] == 10
+
+def test_discover_page_count_empty_catalogue():
+    with LocalFashionServer(lambda page_number: None) as server:
+        assert discover_page_count(server.url, create_session()) == (0, {})
+
+def test_discover_page_count_falls_back_on_server_error():
+    def broken(page_number):
+        if page_number > 1:
+            raise RuntimeError("boom")  # handler gagal, koneksi ditutup tanpa respons
+        return render_page(1, total_pages=20)
+    with LocalFashionServer(broken) as server:
+        count, _ = discover_page_count(server.url, create_session(max_retries=0))
+    assert count is None
+
+def test_scrape_with_discovery_requests_each_page_once():
+    with LocalFashionServer(catalogue(13)) as server:
+        products = scrape_all_pages(server.url, delay=0, max_pages=50, concurrency=3, discover_pages=True)
+        requests = server.request_count
+    assert len(products) == 13 * 2
+    # Semua halaman diambil tepat sekali (body hasil probe dipakai ulang) ditambah probe yang meleset
+    assert requests <= 13 + 2
+
+def test_discovery_probes_go_through_the_scheduler():
+    throttled = {2: 1}  # probe halaman 2 dibalas 429 sekali
+    lock = threading.Lock()
+
+    def site(page_number):
+        with lock:
+            if throttled.get(page_number):
+                throttled[page_number] -= 1
+                return 429, {"Retry-After": "0"}
+        return render_page(page_number, total_pages=13, cards_per_page=2)
+
+    scheduler = AdaptiveScheduler(rate=50, concurrency=2)
+    session = create_session(retry_statuses=SCHEDULER_RETRY_STATUSES, respect_retry_after=False)
+    scheduler.attach_session(session)
+    with LocalFashionServer(site) as server:
+        count, _ = discover_page_count(server.url, session, max_pages=50, scheduler=scheduler)
+    assert count == 13
+    assert scheduler.decisions[0]["reason"] == "status 429"
+
+def test_discovery_probes_share_the_page_rate_limit():
+    requests_per_second = 20
+    with LocalFashionServer(catalogue(13)) as server:
+        start = time.perf_counter()
+        products = scrape_all_pages(server.url, max_pages=50, concurrency=2, discover_pages=True,
+                                    requests_per_second=requests_per_second)
+        elapsed = time.perf_counter() - start
+        requests = server.request_count
+    assert len(products) == 13 * 2
+    # Probe dan fetch halaman berbagi satu RateLimiter: semua request dijadwalkan berjarak 1/rps
+    assert elapsed >= (requests - 1) / requests_per_second * 0.9
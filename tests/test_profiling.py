@@ -0,0 +1,73 @@
+# tests/test_profiling.py
+
+import pstats
+import tracemalloc
+from utils.metrics import RunMetrics
+from utils.orchestrator import LoadOrchestrator
+from utils.profiling import StageProfiler
+
+def build_rows(count):
+    return [{'Title': f'Product {i}', 'Price': float(i)} for i in range(count)]
+
+def test_stage_profiles_are_written(tmp_path):
+    profiler = StageProfiler(str(tmp_path))
+    metrics = RunMetrics(profiler)
+    with metrics.stage("transform"):
+        rows = build_rows(20_000)
+    assert len(rows) == 20_000
+    written = profiler.close()
+
+    assert sorted(path.rsplit('/', 1)[1] for path in written) == [
+        'transform.alloc.txt', 'transform.prof', 'transform.txt'
+    ]
+    stats = pstats.Stats(str(tmp_path / 'transform.prof'))
+    assert any(function == 'build_rows' for _, _, function in stats.stats)
+    assert 'test_profiling.py' in (tmp_path / 'transform.alloc.txt').read_text()
+    assert not tracemalloc.is_tracing()
+
+def extract_batches():
+    for _ in range(3):
+        yield build_rows(10)
+
+def count_rows(batches):
+    for batch in batches:
+        yield len(batch)
+
+def test_nested_stages_are_profiled_separately(tmp_path):
+    profiler = StageProfiler(str(tmp_path), trace_memory=False)
+    metrics = RunMetrics(profiler)
+    # Mode streaming: generator transform memanggil generator extract di dalamnya
+    batches = metrics.timed_iter("transform", count_rows(metrics.timed_iter("extract", extract_batches())))
+    assert list(batches) == [10, 10, 10]
+    profiler.close()
+
+    extract = {function for _, _, function in pstats.Stats(str(tmp_path / 'extract.prof')).stats}
+    transform = {function for _, _, function in pstats.Stats(str(tmp_path / 'transform.prof')).stats}
+    assert 'build_rows' in extract and 'build_rows' not in transform
+    assert 'count_rows' in transform
+    assert not (tmp_path / 'extract.alloc.txt').exists()
+
+def write_rows():
+    return len(build_rows(1_000))
+
+def test_each_sink_gets_its_own_profile(tmp_path):
+    profiler = StageProfiler(str(tmp_path), trace_memory=False)
+    metrics = RunMetrics(profiler)
+    orchestrator = LoadOrchestrator(sequential=True)
+    sinks = {'csv': profiler.wrap('load_csv', write_rows), 'broken': profiler.wrap('load_broken', lambda: None)}
+    with metrics.stage("load"):
+        results = orchestrator.run(sinks)
+    profiler.close()
+
+    assert [result['status'] for result in results] == ['ok', 'failed']
+    sink_functions = {function for _, _, function in pstats.Stats(str(tmp_path / 'load_csv.prof')).stats}
+    load_functions = {function for _, _, function in pstats.Stats(str(tmp_path / 'load.prof')).stats}
+    assert 'write_rows' in sink_functions and 'build_rows' in sink_functions
+    assert 'build_rows' not in load_functions
+
+def test_metrics_without_profiler_writes_nothing(tmp_path):
+    metrics = RunMetrics()
+    with metrics.stage("load"):
+        build_rows(10)
+    assert metrics.profiler is None
+    assert list(tmp_path.iterdir()) == []
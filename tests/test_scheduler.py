@@ -0,0 +1,133 @@
+# tests/test_scheduler.py
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.metrics import RunMetrics, format_prometheus
+from utils.scheduler import AdaptiveScheduler, parse_retry_after
+from utils.extract import scrape_all_pages
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+def make_scheduler(clock, **options):
+    return AdaptiveScheduler(clock=clock, sleep=clock.sleep, **options)
+
+def respond(scheduler, status, latency=0.1, headers=None):
+    scheduler.acquire()
+    if status is not None:
+        scheduler._remember_response(FakeResponse(status, headers))
+    return scheduler.release(latency)
+
+def test_parse_retry_after_seconds_and_http_date():
+    now = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(format_datetime(now + timedelta(seconds=30), usegmt=True), now=now) == 30.0
+    assert parse_retry_after(format_datetime(now - timedelta(seconds=30), usegmt=True), now=now) == 0.0
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+def test_concurrency_grows_additively_while_latency_is_under_target():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, rate=100, max_rate=200, concurrency=2, max_concurrency=4, target_latency=1.0)
+    for _ in range(2):
+        respond(scheduler, 200)
+    assert scheduler.concurrency == 3
+    for _ in range(3):
+        respond(scheduler, 200)
+    assert scheduler.concurrency == 4
+    for _ in range(20):
+        respond(scheduler, 200)
+    assert scheduler.concurrency == 4
+    # Latensi di atas target tidak menaikkan concurrency
+    scheduler = make_scheduler(clock, rate=100, concurrency=2, target_latency=1.0)
+    for _ in range(10):
+        respond(scheduler, 200, latency=2.0)
+    assert scheduler.concurrency == 2
+
+def test_throttling_halves_concurrency_and_rate_once_per_cooldown():
+    clock = FakeClock()
+    metrics = RunMetrics()
+    scheduler = make_scheduler(clock, rate=8, concurrency=8, target_latency=1.0, metrics=metrics)
+    assert respond(scheduler, 429) is True
+    assert (scheduler.concurrency, scheduler.rate) == (4, 4)
+    # Gelombang error yang sama tidak menurunkan berkali-kali
+    assert respond(scheduler, 503) is True
+    assert respond(scheduler, 500) is False
+    assert scheduler.concurrency == 4
+    clock.now += 1.0
+    respond(scheduler, None)  # error koneksi
+    assert (scheduler.concurrency, scheduler.rate) == (2, 2)
+    assert metrics.counters["scheduler_decrease"] == 2
+    assert metrics.gauges == {"scheduler_concurrency": 2, "scheduler_rate_per_second": 2}
+    assert [d["action"] for d in scheduler.decisions] == ["decrease", "decrease"]
+    assert 'etl_gauge{name="scheduler_concurrency"} 2.0' in format_prometheus(metrics.report())
+
+def test_retry_after_blocks_every_worker():
+    clock = FakeClock()
+    metrics = RunMetrics()
+    scheduler = make_scheduler(clock, rate=100, concurrency=4, metrics=metrics)
+    respond(scheduler, 429, headers={"Retry-After": "5"})
+    start = clock.now
+    scheduler.acquire()
+    assert clock.now - start >= 5
+    assert metrics.counters["scheduler_retry_after"] == 1
+
+def test_token_bucket_limits_request_rate():
+    clock = FakeClock()
+    scheduler = make_scheduler(clock, rate=2, concurrency=10, target_latency=100, rate_step=0)
+    for _ in range(5):
+        scheduler.acquire()
+    # Token awal 1, sisanya diisi 2 token/detik
+    assert clock.now == 2.0
+
+def test_concurrency_limit_blocks_until_release():
+    scheduler = AdaptiveScheduler(rate=1000, concurrency=1)
+    scheduler.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (scheduler.acquire(), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.1)
+    scheduler.release(0.01)
+    assert acquired.wait(1)
+    thread.join()
+
+def test_scrape_with_scheduler_retries_throttled_pages():
+    throttled = {3: 2, 5: 1}  # halaman -> jumlah balasan 429 sebelum berhasil
+    lock = threading.Lock()
+
+    def site(page_number):
+        with lock:
+            if throttled.get(page_number):
+                throttled[page_number] -= 1
+                return 429, {"Retry-After": "0"}
+        return render_page(page_number, total_pages=6, cards_per_page=2)
+
+    metrics = RunMetrics()
+    scheduler = AdaptiveScheduler(rate=50, concurrency=2, target_latency=1.0, metrics=metrics)
+    with LocalFashionServer(site) as server:
+        start = time.perf_counter()
+        products = scrape_all_pages(server.url, max_pages=6, metrics=metrics, scheduler=scheduler)
+        elapsed = time.perf_counter() - start
+    assert len(products) == 6 * 2
+    assert metrics.http_status[429] == 3
+    assert metrics.counters["scheduler_decrease"] >= 1
+    assert metrics.counters["pages_failed"] == 0
+    assert elapsed < 5
@@ -0,0 +1,183 @@
+import json
+import pytest
+import httplib2
+from googleapiclient.errors import HttpError
+from utils.sheets import SheetsWriter, split_range, changed_row_runs, column_letter, column_index
+from utils.load import load_to_gsheet
+from utils.sinks import create_sinks
+
+class FakeRequest:
+    def __init__(self, service, handler):
+        self.service = service
+        self.handler = handler
+
+    def execute(self):
+        if self.service.failures:
+            status = self.service.failures.pop(0)
+            raise HttpError(httplib2.Response({'status': status}), b'{"error": "quota"}')
+        return self.handler()
+
+class FakeSheetsService:
+    """Fake lokal Sheets API v4 (spreadsheets().values()) dengan grid di memori."""
+
+    def __init__(self, failures=None):
+        self.grid = {}
+        self.calls = []
+        self.failures = list(failures or [])
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def _write(self, range_name, values):
+        _, column, row = split_range(range_name)
+        start_column = column_index(column)
+        for r, row_values in enumerate(values):
+            for c, value in enumerate(row_values):
+                self.grid[(row + r, start_column + c)] = value
+        return sum(len(row_values) for row_values in values)
+
+    def batchUpdate(self, spreadsheetId, body):
+        self.calls.append(('batchUpdate', [item['range'] for item in body['data']]))
+        return FakeRequest(self, lambda: {
+            'totalUpdatedCells': sum(self._write(item['range'], item['values']) for item in body['data'])
+        })
+
+    def batchClear(self, spreadsheetId, body):
+        self.calls.append(('batchClear', body['ranges']))
+
+        def clear():
+            for range_name in body['ranges']:
+                start, end = range_name.split('!')[-1].split(':')
+                _, start_column, start_row = split_range(start)
+                _, end_column, end_row = split_range(end)
+                for row in range(start_row, end_row + 1):
+                    for column in range(column_index(start_column), column_index(end_column) + 1):
+                        self.grid.pop((row, column), None)
+            return {}
+        return FakeRequest(self, clear)
+
+    def append(self, spreadsheetId, range, valueInputOption, insertDataOption, body):
+        self.calls.append(('append', range))
+
+        def do_append():
+            next_row = max((row for row, _ in self.grid), default=0) + 1
+            cells = self._write(f"A{next_row}", body['values'])
+            return {'updates': {'updatedCells': cells}}
+        return FakeRequest(self, do_append)
+
+    def rows(self):
+        if not self.grid:
+            return []
+        last_row = max(row for row, _ in self.grid)
+        return [[self.grid[(row, column)] for column in sorted(c for r, c in self.grid if r == row)]
+                for row in range(1, last_row + 1)]
+
+VALUES = [[f"Product {i}", float(i), i % 5] for i in range(1, 26)]
+
+def test_split_range_and_columns():
+    assert split_range("Sheet1!B2:H") == ("Sheet1", "B", 2)
+    assert split_range("Sheet1") == ("Sheet1", "A", 1)
+    assert split_range("A1") == ("", "A", 1)
+    assert column_letter(27) == "AA"
+    assert column_index("AA") == 27
+
+def test_changed_row_runs():
+    assert changed_row_runs([[1], [2], [3]], [[1], [9], [3], [4]]) == [(1, 2), (3, 4)]
+
+def test_write_splits_into_sized_batch_updates():
+    service = FakeSheetsService()
+    writer = SheetsWriter(service, 'sheet-id', 'Sheet1!A1', rows_per_range=10, ranges_per_request=2)
+
+    assert writer.write(VALUES) == 75
+    assert service.rows() == VALUES
+    assert service.calls == [
+        ('batchUpdate', ['Sheet1!A1', 'Sheet1!A11']),
+        ('batchUpdate', ['Sheet1!A21']),
+    ]
+
+def test_write_retries_on_quota_errors():
+    service = FakeSheetsService(failures=[429, 503])
+    delays = []
+    writer = SheetsWriter(service, 'sheet-id', 'Sheet1!A1', sleep=delays.append)
+
+    writer.write(VALUES)
+
+    assert service.rows() == VALUES
+    assert writer.retries == 2
+    assert len(delays) == 2
+
+def test_write_gives_up_on_non_retryable_error():
+    service = FakeSheetsService(failures=[403])
+    writer = SheetsWriter(service, 'sheet-id', 'Sheet1!A1', sleep=lambda delay: None)
+    with pytest.raises(HttpError):
+        writer.write(VALUES)
+
+def test_write_only_changed_rows_with_snapshot(tmp_path):
+    service = FakeSheetsService()
+    snapshot = tmp_path / 'snapshot.json'
+    SheetsWriter(service, 'sheet-id', 'Sheet1!A1', snapshot_path=str(snapshot)).write(VALUES)
+    service.calls.clear()
+
+    changed = [list(row) for row in VALUES[:20]]
+    changed[4][1] = 99.0
+    writer = SheetsWriter(service, 'sheet-id', 'Sheet1!A1', snapshot_path=str(snapshot))
+    assert writer.write(changed) == 3
+
+    assert service.calls == [('batchUpdate', ['Sheet1!A5']), ('batchClear', ['Sheet1!A21:C25'])]
+    assert service.rows() == changed
+    assert json.loads(snapshot.read_text())['values'] == changed
+
+def test_full_write_refreshes_snapshot_and_append_removes_it(tmp_path):
+    service = FakeSheetsService()
+    snapshot = tmp_path / 'snapshot.json'
+    SheetsWriter(service, 'sheet-id', 'Sheet1!A1', snapshot_path=str(snapshot)).write(VALUES)
+
+    # Run biasa (bukan incremental) mengirim semua baris dan menyimpan isi sheet yang baru
+    changed = [list(row) for row in VALUES]
+    changed[4][1] = 99.0
+    writer = SheetsWriter(service, 'sheet-id', 'Sheet1!A1', snapshot_path=str(snapshot), diff=False)
+    assert writer.write(changed) == len(VALUES) * 3
+    assert json.loads(snapshot.read_text())['values'] == changed
+
+    writer.append(VALUES[:1])
+    assert not snapshot.exists()
+
+def test_failed_write_removes_stale_snapshot(tmp_path):
+    snapshot = tmp_path / 'snapshot.json'
+    SheetsWriter(FakeSheetsService(), 'sheet-id', 'Sheet1!A1', snapshot_path=str(snapshot)).write(VALUES)
+    writer = SheetsWriter(FakeSheetsService(failures=[403]), 'sheet-id', 'Sheet1!A1',
+                          snapshot_path=str(snapshot), sleep=lambda delay: None)
+    with pytest.raises(HttpError):
+        writer.write(VALUES[:3])
+    assert not snapshot.exists()
+
+def test_load_to_gsheet_with_fake_service(monkeypatch):
+    monkeypatch.setenv('SPREADSHEET_ID', 'sheet-id')
+    monkeypatch.setenv('RANGE_NAME', 'Sheet1!A2')
+    service = FakeSheetsService()
+    data = [{'Title': 'Product 1', 'Price': 100.0}, {'Title': 'Product 2', 'Price': 200.0}]
+
+    assert load_to_gsheet(data, service=service) is True
+    assert service.grid[(2, 1)] == 'Product 1'
+    assert load_to_gsheet(data, append=True, service=service) is True
+    assert service.grid[(4, 1)] == 'Product 1'
+
+def test_gsheet_sink_full_load_keeps_snapshot_current(monkeypatch, tmp_path):
+    monkeypatch.setenv('SPREADSHEET_ID', 'sheet-id')
+    monkeypatch.setenv('RANGE_NAME', 'Sheet1!A2')
+    service = FakeSheetsService()
+    snapshot = tmp_path / 'snapshot.json'
+    options = {'gsheet_snapshot': str(snapshot), 'gsheet_service': service, 'incremental': False}
+    data = [{'Title': 'Product 1', 'Price': 100.0}, {'Title': 'Product 2', 'Price': 200.0}]
+
+    [sink] = create_sinks(['gsheet'], options)
+    assert sink.load(data) is True
+    assert json.loads(snapshot.read_text())['values'] == [['Product 1', 100.0], ['Product 2', 200.0]]
+    # Mode streaming: batch pertama menulis penuh, batch berikutnya append dan membuang snapshot
+    assert sink.write_batch(data[:1], first_batch=True) is True
+    assert json.loads(snapshot.read_text())['values'] == [['Product 1', 100.0]]
+    assert sink.write_batch(data[1:], first_batch=False) is True
+    assert not snapshot.exists()
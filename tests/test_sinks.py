@@ -0,0 +1,70 @@
+# tests/test_sinks.py
+
+import os
+import subprocess
+import sys
+import pandas as pd
+import pytest
+from utils.sinks import SINKS, Sink, create_sinks, get_sink_class, register_sink
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ("googleapiclient", "google.oauth2", "httplib2", "sqlalchemy", "dotenv", "pyarrow.dataset")
+SAMPLE_DATA = [
+    {'Title': 'Product 1', 'Price': 100.0, 'Rating': 4.5},
+    {'Title': 'Product 2', 'Price': 200.0, 'Rating': 3.5},
+]
+
+def import_times(code):
+    """Menjalankan code dengan -X importtime; dict modul -> waktu kumulatif (mikrodetik)."""
+    completed = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=REPO_ROOT,
+                               capture_output=True, text=True, check=True)
+    times = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, module = line.split("|")
+        times[module.strip()] = int(cumulative)
+    return times
+
+def test_startup_does_not_import_heavy_sink_dependencies():
+    times = import_times("import main")
+    assert "main" in times
+    heavy = [module for module in times if module.startswith(HEAVY_MODULES)]
+    assert heavy == []
+
+def test_heavy_dependencies_load_only_when_sink_is_used():
+    times = import_times("from utils.sinks import create_sinks; create_sinks(['csv', 'gsheet'], {})")
+    assert not any(module.startswith(HEAVY_MODULES) for module in times)
+    # Client Google baru di-import saat service dibuat
+    times = import_times("import utils.load; from utils.load import create_sheets_service")
+    assert not any(module.startswith(HEAVY_MODULES) for module in times)
+
+def test_registry_has_builtin_sinks():
+    assert {'csv', 'gsheet', 'postgres', 'columnar'} <= set(SINKS)
+    with pytest.raises(ValueError, match="Unknown sink"):
+        get_sink_class('ftp')
+
+def test_csv_sink_load_and_streaming(tmp_path):
+    filename = tmp_path / "products.csv"
+    [sink] = create_sinks(['csv'], {'csv_filename': filename})
+    assert sink.name == 'csv'
+    assert sink.write_batch(SAMPLE_DATA[:1], first_batch=True) is True
+    assert sink.write_batch(SAMPLE_DATA[1:], first_batch=False) is True
+    assert pd.read_csv(filename)['Title'].tolist() == ['Product 1', 'Product 2']
+    assert sink.load(SAMPLE_DATA[:1]) is True
+    assert len(pd.read_csv(filename)) == 1
+
+def test_columnar_sink_needs_a_path():
+    with pytest.raises(ValueError, match="--columnar"):
+        create_sinks(['columnar'], {})
+
+def test_register_sink_by_import_path(monkeypatch, tmp_path):
+    monkeypatch.setitem(SINKS, 'csv_copy', None)
+    register_sink('csv_copy', 'utils.sinks:CsvSink')
+    assert SINKS['csv_copy'] == 'utils.sinks:CsvSink'
+    [sink] = create_sinks(['csv_copy'], {'csv_filename': tmp_path / "copy.csv"})
+    assert isinstance(sink, Sink)
+    assert sink.load(SAMPLE_DATA) is True
+    assert (tmp_path / "copy.csv").exists()
+    assert sink.name == 'csv_copy'
+    assert get_sink_class('csv').name == 'csv'
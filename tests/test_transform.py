@@ -1,5 +1,9 @@
 import pytest
-from utils.transform import transform_product_data
+from utils.transform import (
+    transform_product_data, transform_product_data_rowwise, transform_product_batch, transform_product_batches,
+    clean_product_row, rows_to_batch, transform_row_batches
+)
+from utils.batch import ProductBatch
 from datetime import datetime
 
 def test_transform_product_data_complete():
@@ -47,3 +51,77 @@ def test_transform_with_invalid_price():
     
     result = transform_product_data(raw_data)
     assert len(result) == 0  
+
+EDGE_CASE_DATA = [
+    {'title': 'Kept', 'price': '$1,250.50', 'rating_text': 'Rating: ⭐ 4.8 / 5', 'colors_text': '3 Colors',
+     'size_text': 'Size: M', 'gender_text': 'Gender: Men', 'timestamp': '2025-06-04T09:51:20'},
+    {'title': 'Kept', 'price': '$1,250.50', 'rating_text': 'Rating: ⭐ 3.0 / 5', 'colors_text': '5 Colors',
+     'size_text': 'Size: M', 'gender_text': 'Gender: Women', 'timestamp': '2025-06-04T09:51:21'},
+    {'title': 'Kept', 'price': '$1,250.50', 'rating_text': 'Rating: ⭐ 3.0 / 5', 'colors_text': '5 Colors',
+     'size_text': 'Size: L', 'timestamp': '2025-06-04T09:51:22'},
+    {'title': 'Not Rated', 'price': '$10.00', 'rating_text': 'Rating: Not Rated', 'colors_text': '3 Colors'},
+    {'title': 'Invalid', 'price': '$10.00', 'rating_text': 'Rating: ⭐ Invalid Rating / 5'},
+    {'title': 'Zero Price', 'price': '$0.00', 'rating_text': 'Rating: ⭐ 4.0 / 5'},
+    {'title': 'Unavailable', 'price': 'Price Unavailable', 'rating_text': 'Rating: ⭐ 4.0 / 5'},
+    {'title': 'Bad Colors', 'price': '$10.00', 'rating_text': 'Rating: ⭐ 4.0 / 5', 'colors_text': 'Many Colors'},
+    {'title': 'Defaults', 'price': '$10.00', 'rating_text': 'Rating: ⭐ 4.0 / 5', 'timestamp': '2025-06-04T09:51:23'},
+]
+
+def test_transform_filters_and_deduplicates():
+    result = transform_product_data(EDGE_CASE_DATA)
+    assert [(p['Title'], p['Size']) for p in result] == [('Kept', 'M'), ('Kept', 'L'), ('Defaults', 'NA')]
+    assert result[0]['Price'] == 1250.5
+    assert result[0]['Gender'] == 'Men'
+    assert result[1]['Gender'] == 'Unisex'
+    assert result[2]['Colors'] == 0
+
+def test_transform_matches_rowwise_implementation():
+    result = transform_product_data(EDGE_CASE_DATA)
+    expected = transform_product_data_rowwise(EDGE_CASE_DATA)
+    assert result == expected
+    assert [type(v) for v in result[0].values()] == [type(v) for v in expected[0].values()]
+
+def test_transform_empty_input():
+    assert transform_product_data([]) == []
+
+def test_transform_product_batches_deduplicates_across_batches():
+    batches = [EDGE_CASE_DATA[:1], EDGE_CASE_DATA[1:3], EDGE_CASE_DATA[3:]]
+    streamed = [product for batch in transform_product_batches(batches) for product in batch]
+    assert streamed == transform_product_data(EDGE_CASE_DATA)
+
+def test_transform_product_batch_matches_records():
+    batch = transform_product_batch(EDGE_CASE_DATA)
+    assert isinstance(batch, ProductBatch)
+    assert batch.to_records() == transform_product_data(EDGE_CASE_DATA)
+    assert batch.df["Size"].dtype == "category"
+    assert batch.df["Colors"].dtype == "int64"
+
+def test_transform_product_batch_empty_input():
+    batch = transform_product_batch([])
+    assert len(batch) == 0
+    assert batch.columns == ["Title", "Price", "Rating", "Colors", "Size", "Gender", "Timestamp"]
+
+def fused_rows(raw_data):
+    return [row for row in (clean_product_row(item, item.get('timestamp')) for item in raw_data) if row]
+
+def test_fused_rows_match_vectorized_transform():
+    data = EDGE_CASE_DATA + [{'title': 'NaN Price', 'price': '$nan', 'rating_text': 'Rating: ⭐ 4.0 / 5'}]
+    batch = rows_to_batch(fused_rows(data))
+    assert batch.to_records() == transform_product_data(data)
+    assert batch.df.dtypes.equals(transform_product_batch(data).df.dtypes)
+
+def test_clean_product_row_drops_invalid_cards():
+    assert clean_product_row({'price': '$10.00', 'rating_text': 'Rating: Not Rated'}, None) is None
+    assert clean_product_row({'price': 'Price Unavailable', 'rating_text': 'Rating: ⭐ 4.0 / 5'}, None) is None
+    assert clean_product_row({'price': '$1.00', 'rating_text': 'Rating: ⭐ 4.0 / 5'}, 't') == (
+        'Unknown Product', 1.0, 4.0, 0, 'NA', 'Unisex', 't')
+
+def test_transform_row_batches_deduplicates_across_batches():
+    rows = fused_rows(EDGE_CASE_DATA)
+    streamed = [product for batch in transform_row_batches([rows[:1], rows[1:3], [], rows[3:]]) for product in batch]
+    assert streamed == transform_product_data(EDGE_CASE_DATA)
+
+def test_rows_to_batch_empty_input():
+    batch = rows_to_batch([])
+    assert len(batch) == 0
+    assert batch.columns == ["Title", "Price", "Rating", "Colors", "Size", "Gender", "Timestamp"]
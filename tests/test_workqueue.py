@@ -0,0 +1,147 @@
+# tests/test_workqueue.py
+
+import json
+import multiprocessing
+import time
+import main
+from benchmarks.server import LocalFashionServer
+from benchmarks.synthetic import render_page
+from utils.extract import run_crawl_worker, scrape_all_pages
+from utils.transform import transform_product_data
+from utils.workqueue import VOLATILE_FIELDS, ShardWriter, WorkQueue, merge_shards
+
+BASE_URL = "https://example.test"
+
+def stable(products):
+    return [{k: v for k, v in product.items() if k not in VOLATILE_FIELDS} for product in products]
+
+def test_lease_is_exclusive_and_ordered(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    assert queue.enqueue(BASE_URL, range(1, 6)) == 5
+    assert queue.enqueue(BASE_URL, range(1, 8)) == 2
+    assert queue.lease(BASE_URL, "a", limit=3) == [1, 2, 3]
+    # Koneksi lain ke file yang sama (seperti proses worker lain)
+    other = WorkQueue(tmp_path / "queue.db")
+    assert other.lease(BASE_URL, "b", limit=10) == [4, 5, 6, 7]
+    assert other.lease(BASE_URL, "b") == []
+    assert queue.complete(BASE_URL, 1, "a") is True
+    assert queue.complete(BASE_URL, 4, "a") is False  # bukan lease milik a
+    assert queue.counts(BASE_URL) == {"done": 1, "leased": 6}
+    queue.close()
+    other.close()
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", lease_seconds=0.05)
+    queue.enqueue(BASE_URL, [1])
+    assert queue.lease(BASE_URL, "dead-worker") == [1]
+    assert queue.lease(BASE_URL, "b") == []
+    time.sleep(0.1)
+    assert queue.lease(BASE_URL, "b") == [1]
+    # Worker lama yang ternyata masih hidup tidak bisa lagi menyelesaikannya
+    assert queue.complete(BASE_URL, 1, "dead-worker") is False
+    assert queue.complete(BASE_URL, 1, "b") is True
+
+def test_failed_pages_return_until_max_attempts(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db", max_attempts=2)
+    queue.enqueue(BASE_URL, [1])
+    assert queue.lease(BASE_URL, "a") == [1]
+    assert queue.fail(BASE_URL, 1, "a") is True
+    assert queue.counts(BASE_URL) == {"pending": 1}
+    assert queue.lease(BASE_URL, "b") == [1]
+    queue.fail(BASE_URL, 1, "b")
+    assert queue.counts(BASE_URL) == {"failed": 1}
+    assert queue.lease(BASE_URL, "c") == []
+    assert queue.next_expiry(BASE_URL) is None
+
+def test_merge_shards_dedups_pages_and_cards(tmp_path):
+    card = {"title": "A", "price": "$1.00", "extracted_at": "t1", "timestamp": "t1"}
+    with ShardWriter(tmp_path, "w1") as shard:
+        shard.write_page(2, [{"title": "B", "price": "$2.00", "timestamp": "t1"}])
+        shard.write_page(1, [card])
+    with ShardWriter(tmp_path, "w2") as shard:
+        # Halaman 1 diambil ulang setelah lease kedaluwarsa, dan card yang sama muncul di halaman 3
+        shard.write_page(1, [dict(card, timestamp="t2")])
+        shard.write_page(3, [dict(card, extracted_at="t3", timestamp="t3"), {"title": "C", "timestamp": "t3"}])
+    with open(tmp_path / "w2.jsonl", "a", encoding="utf-8") as file:
+        file.write('{"page": 4, "products": [')  # worker mati saat menulis
+    merged = merge_shards(tmp_path)
+    assert [product["title"] for product in merged] == ["A", "B", "C"]
+
+def crawl_worker(queue_path, url, shard_dir, worker_id):
+    queue = WorkQueue(queue_path)
+    run_crawl_worker(url, queue, shard_dir, worker_id=worker_id, max_pages=50, concurrency=2)
+    queue.close()
+
+def test_workers_share_the_queue_and_merge_matches_single_process(tmp_path):
+    total_pages = 12
+    site = lambda page_number: render_page(page_number, total_pages=total_pages, cards_per_page=3)
+    queue_path = str(tmp_path / "queue.db")
+    shard_dir = str(tmp_path / "shards")
+    with LocalFashionServer(site, latency=0.01) as server:
+        # Antrean diisi sekali (discover_pages), lalu tiga proses worker mengambil halaman bersamaan
+        queue = WorkQueue(queue_path)
+        queue.enqueue(server.url, range(1, total_pages + 1))
+        context = multiprocessing.get_context("spawn")
+        workers = [context.Process(target=crawl_worker, args=(queue_path, server.url, shard_dir, f"w{n}"))
+                   for n in range(3)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(timeout=60)
+        assert [worker.exitcode for worker in workers] == [0, 0, 0]
+        assert queue.counts(server.url) == {"done": total_pages}
+        expected = scrape_all_pages(server.url, delay=0, max_pages=total_pages)
+
+    pages_per_shard = []
+    for n in range(3):
+        with open(tmp_path / "shards" / f"w{n}.jsonl", encoding="utf-8") as file:
+            pages_per_shard.append([json.loads(line)["page"] for line in file])
+    assert sorted(page for pages in pages_per_shard for page in pages) == list(range(1, total_pages + 1))
+    merged = merge_shards(shard_dir)
+    assert stable(merged) == stable(expected)
+    assert len(transform_product_data(merged)) == len(transform_product_data(expected))
+
+def test_worker_fills_an_empty_queue_and_stops_when_done(tmp_path):
+    site = lambda page_number: render_page(page_number, total_pages=5, cards_per_page=2)
+    queue = WorkQueue(tmp_path / "queue.db")
+    with LocalFashionServer(site) as server:
+        assert run_crawl_worker(server.url, queue, tmp_path / "shards", worker_id="solo", concurrency=3) == 5
+        # Antrean sudah selesai: worker berikutnya tidak mengambil apa pun
+        assert run_crawl_worker(server.url, queue, tmp_path / "shards", worker_id="late") == 0
+        requests = server.request_count
+    assert len(merge_shards(tmp_path / "shards")) == 10
+    assert requests <= 5 + 3
+
+def test_merge_uses_only_the_queued_crawl_and_newest_copy(tmp_path):
+    queue = WorkQueue(tmp_path / "queue.db")
+    queue.enqueue(BASE_URL, [1, 2])
+    crawl_id = queue.crawl_id(BASE_URL)
+    assert crawl_id and queue.enqueue(BASE_URL, [3]) == 1 and queue.crawl_id(BASE_URL) == crawl_id
+    # Shard "a-1" berisi crawl lama (dan nama file-nya diurutkan lebih dulu)
+    with ShardWriter(tmp_path / "shards", "a-1", "old-crawl") as shard:
+        shard.write_page(1, [{"title": "stale"}])
+        shard.write_page(4, [{"title": "removed page"}])
+    # Lease halaman 1 kedaluwarsa di worker "a-3" lalu diambil ulang oleh "b-2"
+    with ShardWriter(tmp_path / "shards", "a-3", crawl_id) as shard:
+        shard.write_page(1, [{"title": "first copy"}])
+    with ShardWriter(tmp_path / "shards", "b-2", crawl_id) as shard:
+        shard.write_page(1, [{"title": "A"}])
+        shard.write_page(2, [{"title": "B"}])
+
+    merged = merge_shards(tmp_path / "shards", crawl_id)
+    assert [product["title"] for product in merged] == ["A", "B"]
+
+def test_merge_shards_refuses_incomplete_crawl(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, 'BASE_URL', BASE_URL)
+    queue_path = str(tmp_path / "queue.db")
+    queue = WorkQueue(queue_path)
+    queue.enqueue(BASE_URL, [1, 2])
+    queue.lease(BASE_URL, "a")
+    queue.complete(BASE_URL, 1, "a")
+    argv = ['--merge-shards', '--queue', queue_path, '--shard-dir', str(tmp_path / "shards"), '--sinks', 'csv']
+    assert main.main(argv) == 1
+    assert main.finished_crawl_id(str(tmp_path / "empty.db")) is None
+    queue.lease(BASE_URL, "a")
+    queue.complete(BASE_URL, 2, "a")
+    assert main.finished_crawl_id(queue_path) == queue.crawl_id(BASE_URL)
+    queue.close()
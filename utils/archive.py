@@ -0,0 +1,120 @@
+# utils/archive.py
+
+import mmap
+import os
+import struct
+import threading
+import time
+import zlib
+
+# Entri index berukuran tetap: run_id, page_number, offset, panjang, waktu fetch
+INDEX_ENTRY = struct.Struct("<IIQQd")
+
+class PageArchive:
+    """Arsip HTML mentah yang append-only dan terkompresi.
+
+    Setiap halaman dikompresi (zlib) dan ditambahkan ke file data; lokasinya
+    dicatat di file index `<path>.idx` berisi entri berukuran tetap yang
+    dibaca lewat mmap. Setiap pembukaan untuk menulis memulai run baru
+    sehingga beberapa crawl bisa disimpan dalam satu arsip.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.index_path = f"{path}.idx"
+        self._lock = threading.Lock()
+        self._data_file = None
+        self._index_file = None
+        self._data_map = None
+        self.run_id = None
+
+    # ----- Menulis -----
+    def open_run(self):
+        """Membuka arsip untuk menulis dan memulai run baru; mengembalikan run_id."""
+        with self._lock:
+            return self._open_run()
+
+    def _open_run(self):
+        # Entri terakhir yang terpotong (crash saat menulis) dibuang agar entri baru tetap sejajar
+        if os.path.exists(self.index_path):
+            size = os.path.getsize(self.index_path)
+            if size % INDEX_ENTRY.size:
+                with open(self.index_path, "r+b") as f:
+                    f.truncate(size - size % INDEX_ENTRY.size)
+        runs = self.runs()
+        self.run_id = (max(runs) + 1) if runs else 1
+        self._data_file = open(self.path, "ab")
+        self._index_file = open(self.index_path, "ab")
+        return self.run_id
+
+    def append(self, page_number, content):
+        """Menambahkan body halaman ke arsip (aman dipanggil dari banyak thread)."""
+        blob = zlib.compress(content)
+        with self._lock:
+            if self._data_file is None:
+                self._open_run()
+            offset = self._data_file.seek(0, os.SEEK_END)
+            self._data_file.write(blob)
+            self._data_file.flush()
+            # Index ditulis setelah data agar entri tidak pernah menunjuk data yang belum ada
+            self._index_file.write(INDEX_ENTRY.pack(self.run_id, page_number, offset, len(blob), time.time()))
+            self._index_file.flush()
+
+    def close(self):
+        with self._lock:
+            for f in (self._data_file, self._index_file, self._data_map):
+                if f is not None:
+                    f.close()
+            self._data_file = self._index_file = self._data_map = None
+
+    # ----- Membaca -----
+    def _entries(self):
+        """Membaca semua entri index lewat mmap (entri terakhir yang terpotong diabaikan)."""
+        if not os.path.exists(self.index_path) or os.path.getsize(self.index_path) < INDEX_ENTRY.size:
+            return []
+        with open(self.index_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as index:
+            usable = len(index) - len(index) % INDEX_ENTRY.size
+            return list(INDEX_ENTRY.iter_unpack(index[:usable]))
+
+    def runs(self):
+        """Daftar run_id yang ada di arsip, urut naik."""
+        return sorted({entry[0] for entry in self._entries()})
+
+    def page_index(self, run_id=None):
+        """Memetakan page_number -> (offset, panjang) untuk satu run (default: run terakhir).
+
+        Jika satu halaman tersimpan lebih dari sekali dalam run, versi terakhir dipakai.
+        """
+        return {page_number: (offset, length)
+                for page_number, (offset, length, _) in self.page_entries(run_id).items()}
+
+    def page_entries(self, run_id=None):
+        """Seperti page_index, tetapi nilainya (offset, panjang, waktu fetch epoch)."""
+        entries = self._entries()
+        if not entries:
+            return {}
+        if run_id is None:
+            run_id = max(entry[0] for entry in entries)
+        index = {}
+        for entry_run, page_number, offset, length, fetched_at in entries:
+            if entry_run == run_id:
+                index[page_number] = (offset, length, fetched_at)
+        return index
+
+    def read(self, offset, length):
+        """Membaca dan mendekompresi satu body dari file data lewat mmap."""
+        with self._lock:
+            if self._data_map is None or offset + length > len(self._data_map):
+                # Map ulang jika file data sudah bertambah sejak mmap dibuat
+                if self._data_map is not None:
+                    self._data_map.close()
+                with open(self.path, "rb") as f:
+                    self._data_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            blob = self._data_map[offset:offset + length]
+        return zlib.decompress(blob)
+
+    def iter_pages(self, run_id=None):
+        """Generator (page_number, content) untuk satu run, urut nomor halaman."""
+        index = self.page_index(run_id)
+        for page_number in sorted(index):
+            yield page_number, self.read(*index[page_number])
@@ -0,0 +1,68 @@
+# utils/batch.py
+
+import pandas as pd
+
+# pandas >= 3 punya dtype string bawaan ("str"); versi lama memakai object
+# karena astype(str) di sana mengubah None menjadi teks "None"
+STRING_DTYPE = "str" if int(pd.__version__.split(".")[0]) >= 3 else object
+
+# Dtype kolom batch produk; Size dan Gender disimpan sebagai kategori
+BATCH_DTYPES = {
+    "Title": STRING_DTYPE,
+    "Price": "float64",
+    "Rating": "float64",
+    "Colors": "int64",
+    "Size": "category",
+    "Gender": "category",
+    "Timestamp": STRING_DTYPE,
+}
+
+class ProductBatch:
+    """Batch produk kolumnar bertipe yang dibagikan ke semua loader.
+
+    Transform membuat batch ini sekali; loader memakai DataFrame di
+    dalamnya langsung (tanpa salinan) lewat as_dataframe(), sehingga data
+    tidak lagi bolak-balik dikonversi antara list of dict dan DataFrame.
+    """
+
+    def __init__(self, df):
+        self.df = df
+
+    @classmethod
+    def from_frame(cls, df):
+        """Membuat batch dari DataFrame transform dengan dtype BATCH_DTYPES."""
+        df = df.astype(BATCH_DTYPES)
+        return cls(df.reset_index(drop=True))
+
+    @classmethod
+    def from_records(cls, records):
+        return cls.from_frame(pd.DataFrame(records, columns=list(BATCH_DTYPES)))
+
+    @property
+    def columns(self):
+        return list(self.df.columns)
+
+    def __len__(self):
+        return len(self.df)
+
+    def __iter__(self):
+        return iter(self.to_records())
+
+    def to_records(self):
+        """List of dict dengan tipe Python native (setara output transform_product_data)."""
+        columns = [self.df[column].astype(object).tolist() if isinstance(self.df[column].dtype, pd.CategoricalDtype)
+                   else self.df[column].tolist() for column in self.df.columns]
+        return [dict(zip(self.df.columns, row)) for row in zip(*columns)]
+
+    def memory_usage(self):
+        """Total memori kolom batch dalam byte (termasuk isi string)."""
+        return int(self.df.memory_usage(deep=True, index=False).sum())
+
+    def __repr__(self):
+        return f"ProductBatch({len(self)} rows, {self.memory_usage() / 1024:.1f} KiB)"
+
+def as_dataframe(data, columns=None):
+    """DataFrame dari ProductBatch (tanpa salinan) atau dari list of dict."""
+    if isinstance(data, ProductBatch):
+        return data.df
+    return pd.DataFrame(data, columns=columns)
@@ -0,0 +1,164 @@
+# utils/cache.py
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+import requests
+
+class PageCache:
+    """Cache HTTP di disk (SQLite) per URL untuk conditional GET.
+
+    Menyimpan ETag, Last-Modified, hash body, body terkompresi dan data
+    mentah produk hasil parsing halaman. Jika server membalas 304 atau body
+    sama dengan sebelumnya, data mentah lama dipakai ulang tanpa parsing.
+    Total ukuran dibatasi max_bytes dengan eviction least-recently-used.
+    """
+
+    def __init__(self, path, max_bytes=100 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, etag TEXT, last_modified TEXT, body_hash TEXT,"
+            " body BLOB, products TEXT, size INTEGER, last_access REAL)"
+        )
+        self._conn.commit()
+        # Validator respons yang menunggu hasil parsing sebelum disimpan
+        self._pending = {}
+        self.stats = {"revalidated": 0, "unchanged": 0, "misses": 0, "evictions": 0, "errors": 0}
+
+    def _lookup(self, url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, body_hash, products FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _touch(self, url, etag=None, last_modified=None):
+        with self._lock:
+            self._conn.execute(
+                "UPDATE pages SET last_access = ?, etag = COALESCE(?, etag),"
+                " last_modified = COALESCE(?, last_modified) WHERE url = ?",
+                (time.time(), etag, last_modified, url),
+            )
+            self._conn.commit()
+
+    def _count(self, key):
+        with self._lock:
+            self.stats[key] += 1
+
+    def fetch(self, url, session):
+        """Mengambil URL dengan conditional GET.
+
+        Mengembalikan (content, products): products tidak None jika halaman
+        tidak berubah sehingga data mentah lama bisa dipakai; selain itu
+        content berisi body baru yang perlu di-parse lalu disimpan via store().
+        """
+        row = self._lookup(url)
+        headers = {}
+        if row and row[3] is not None:
+            etag, last_modified = row[0], row[1]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        try:
+            response = session.get(url, headers=headers, timeout=10)
+            if response.status_code == 304 and row:
+                self._count("revalidated")
+                self._touch(url)
+                return None, json.loads(row[3])
+            response.raise_for_status()
+        # Error Handling
+        except requests.exceptions.RequestException as e:
+            self._count("errors")
+            print(f"Terjadi kesalahan ketika melakukan requests terhadap {url}: {e}")
+            return None, None
+
+        content = response.content
+        body_hash = hashlib.sha256(content).hexdigest()
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if row and row[2] == body_hash and row[3] is not None:
+            self._count("unchanged")
+            self._touch(url, etag, last_modified)
+            return None, json.loads(row[3])
+
+        self._count("misses")
+        with self._lock:
+            self._pending[url] = (etag, last_modified, body_hash, content)
+        return content, None
+
+    def body(self, url):
+        """Body halaman yang tersimpan untuk URL, atau None jika tidak ada di cache."""
+        with self._lock:
+            row = self._conn.execute("SELECT body FROM pages WHERE url = ?", (url,)).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return zlib.decompress(row[0])
+
+    def store(self, url, products):
+        """Menyimpan body dan data mentah hasil parsing untuk URL yang baru diambil."""
+        with self._lock:
+            pending = self._pending.pop(url, None)
+        if pending is None:
+            return
+        etag, last_modified, body_hash, content = pending
+        body = zlib.compress(content)
+        products_json = json.dumps(products, ensure_ascii=False)
+        size = len(body) + len(products_json)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, etag, last_modified, body_hash, body, products_json, size, time.time()),
+            )
+            self._conn.commit()
+        self._evict()
+
+    def _evict(self):
+        """Menghapus entri yang paling lama tidak diakses sampai ukuran <= max_bytes."""
+        with self._lock:
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute("SELECT url, size FROM pages ORDER BY last_access").fetchall()
+            for url, size in rows:
+                if total <= self.max_bytes:
+                    break
+                self._conn.execute("DELETE FROM pages WHERE url = ?", (url,))
+                total -= size
+                self.stats["evictions"] += 1
+            self._conn.commit()
+
+    def size_bytes(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM pages").fetchone()[0]
+
+    def report(self):
+        """Ringkasan hit/miss cache untuk run ini."""
+        hits = self.stats["revalidated"] + self.stats["unchanged"]
+        lookups = hits + self.stats["misses"]
+        return {
+            **self.stats,
+            "hits": hits,
+            "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+            "size_bytes": self.size_bytes(),
+        }
+
+    def print_report(self):
+        report = self.report()
+        print(
+            f"Page cache: {report['hits']} hits ({report['revalidated']} revalidated 304, "
+            f"{report['unchanged']} unchanged body), {report['misses']} misses, "
+            f"{report['evictions']} evictions, hit ratio {report['hit_ratio']:.0%}, "
+            f"{report['size_bytes'] / 1024:.1f} KiB on disk"
+        )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
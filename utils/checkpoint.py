@@ -0,0 +1,99 @@
+# utils/checkpoint.py
+
+import json
+import sqlite3
+import threading
+import time
+
+class CrawlCheckpoint:
+    """Checkpoint crawl di SQLite agar crawl yang terhenti bisa dilanjutkan.
+
+    Setiap halaman yang selesai disimpan bersama data mentah produknya dan
+    di-commit segera, sehingga crash atau kill tidak menghilangkan halaman
+    yang sudah diambil. Halaman yang gagal dicatat beserta jumlah
+    percobaannya. Crawl ditandai selesai (finish) hanya jika tidak ada
+    halaman yang gagal; run berikutnya pada crawl yang sudah selesai dimulai
+    dari awal, sedangkan crawl yang belum selesai dilanjutkan.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawls ("
+            " base_url TEXT PRIMARY KEY, started_at REAL, finished_at REAL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " base_url TEXT, page_number INTEGER, status TEXT, products TEXT,"
+            " attempts INTEGER, updated_at REAL, PRIMARY KEY (base_url, page_number))"
+        )
+        self._conn.commit()
+
+    def resume(self, base_url):
+        """Memulai atau melanjutkan crawl base_url.
+
+        Mengembalikan dict page_number -> products untuk halaman yang sudah
+        selesai pada crawl yang belum selesai; dict kosong jika crawl baru.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT finished_at FROM crawls WHERE base_url = ?", (base_url,)
+            ).fetchone()
+            if row is None or row[0] is not None:
+                # Crawl sebelumnya sudah selesai (atau belum pernah ada): mulai dari awal
+                self._conn.execute("DELETE FROM pages WHERE base_url = ?", (base_url,))
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO crawls (base_url, started_at, finished_at) VALUES (?, ?, NULL)",
+                    (base_url, time.time()),
+                )
+                self._conn.commit()
+                return {}
+            rows = self._conn.execute(
+                "SELECT page_number, products FROM pages WHERE base_url = ? AND status = 'done'", (base_url,)
+            ).fetchall()
+        return {page_number: json.loads(products) for page_number, products in rows}
+
+    def mark_done(self, base_url, page_number, products):
+        """Menyimpan data mentah produk halaman yang selesai."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pages (base_url, page_number, status, products, attempts, updated_at)"
+                " VALUES (?, ?, 'done', ?, 1, ?)"
+                " ON CONFLICT (base_url, page_number) DO UPDATE SET status = 'done',"
+                " products = excluded.products, attempts = attempts + 1, updated_at = excluded.updated_at",
+                (base_url, page_number, json.dumps(products), time.time()),
+            )
+            self._conn.commit()
+
+    def mark_failed(self, base_url, page_number):
+        """Mencatat halaman yang gagal diambil."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO pages (base_url, page_number, status, products, attempts, updated_at)"
+                " VALUES (?, ?, 'failed', NULL, 1, ?)"
+                " ON CONFLICT (base_url, page_number) DO UPDATE SET status = 'failed',"
+                " attempts = attempts + 1, updated_at = excluded.updated_at",
+                (base_url, page_number, time.time()),
+            )
+            self._conn.commit()
+
+    def failed_pages(self, base_url):
+        """Daftar (page_number, attempts) halaman yang masih gagal."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT page_number, attempts FROM pages WHERE base_url = ? AND status = 'failed'"
+                " ORDER BY page_number", (base_url,)
+            ).fetchall()
+
+    def finish(self, base_url):
+        """Menandai crawl selesai sehingga run berikutnya dimulai dari awal."""
+        with self._lock:
+            self._conn.execute("UPDATE crawls SET finished_at = ? WHERE base_url = ?", (time.time(), base_url))
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
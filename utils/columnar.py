@@ -0,0 +1,115 @@
+# utils/columnar.py
+
+import os
+import uuid
+import pandas as pd
+from utils.batch import as_dataframe
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow opsional, hanya dibutuhkan oleh sink kolumnar
+    pa = pq = None
+
+FORMATS = ("parquet", "arrow")
+PARTITION_COLUMN = "extraction_date"
+
+def product_schema():
+    """Skema Arrow eksplisit untuk data produk hasil transform."""
+    return pa.schema([
+        pa.field("Title", pa.string()),
+        pa.field("Price", pa.float64()),
+        pa.field("Rating", pa.float64()),
+        pa.field("Colors", pa.int64()),
+        pa.field("Size", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("Gender", pa.dictionary(pa.int8(), pa.string())),
+        pa.field("Timestamp", pa.timestamp("us")),
+    ])
+
+def to_arrow_table(data):
+    """Mengubah list of dict atau ProductBatch menjadi pyarrow.Table dengan product_schema()."""
+    df = as_dataframe(data, columns=product_schema().names)
+    # assign() membuat frame baru sehingga DataFrame milik ProductBatch tidak diubah
+    df = df.assign(
+        Timestamp=pd.to_datetime(df["Timestamp"], format="ISO8601"),
+        Colors=df["Colors"].astype("int64"),
+    )
+    return pa.Table.from_pandas(df, schema=product_schema(), preserve_index=False)
+
+class ColumnarSink:
+    """Menulis batch produk ke Parquet atau Arrow IPC secara incremental.
+
+    Tanpa partisi, semua batch ditulis ke satu file `path` lewat writer yang
+    tetap terbuka. Dengan partition_by_date=True, `path` adalah direktori
+    bergaya Hive (`extraction_date=YYYY-MM-DD/part-*.parquet`) dan setiap
+    batch menjadi file part baru di partisi tanggal ekstraksinya.
+    """
+
+    def __init__(self, path, file_format="parquet", partition_by_date=False, compression="zstd"):
+        if pa is None:
+            raise ImportError("pyarrow is required for the Parquet/Arrow sink (pip install pyarrow)")
+        if file_format not in FORMATS:
+            raise ValueError(f"Unknown columnar format '{file_format}', expected one of {FORMATS}")
+        self.path = path
+        self.file_format = file_format
+        self.partition_by_date = partition_by_date
+        self.compression = compression
+        self.schema = product_schema()
+        self.rows_written = 0
+        self._writer = None
+        self._run_id = uuid.uuid4().hex[:12]
+        self._part = 0
+
+    def _open_writer(self, path):
+        if self.file_format == "parquet":
+            return pq.ParquetWriter(path, self.schema, compression=self.compression)
+        return pa.ipc.new_file(path, self.schema, options=pa.ipc.IpcWriteOptions(compression=self.compression))
+
+    def write_batch(self, data):
+        """Menulis satu batch produk; mengembalikan jumlah baris yang ditulis."""
+        if not data:
+            return 0
+        table = to_arrow_table(data)
+        if self.partition_by_date:
+            self._write_partitioned(table)
+        else:
+            if self._writer is None:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                self._writer = self._open_writer(self.path)
+            self._writer.write_table(table)
+        self.rows_written += table.num_rows
+        return table.num_rows
+
+    def _write_partitioned(self, table):
+        dates = pd.Series(table.column("Timestamp").to_pandas()).dt.strftime("%Y-%m-%d").fillna("unknown")
+        extension = "parquet" if self.file_format == "parquet" else "arrow"
+        for date in dates.unique():
+            part = table.filter(pa.array((dates == date).to_numpy()))
+            directory = os.path.join(self.path, f"{PARTITION_COLUMN}={date}")
+            os.makedirs(directory, exist_ok=True)
+            file_path = os.path.join(directory, f"part-{self._run_id}-{self._part:05d}.{extension}")
+            self._part += 1
+            writer = self._open_writer(file_path)
+            writer.write_table(part)
+            writer.close()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def read_columnar(path, file_format="parquet"):
+    """Membaca kembali hasil ColumnarSink (file tunggal atau direktori partisi) sebagai DataFrame."""
+    # pyarrow.dataset cukup berat dan hanya dibutuhkan saat membaca ulang
+    import pyarrow.dataset as ds
+    dataset_format = "parquet" if file_format == "parquet" else "ipc"
+    partitioning = "hive" if os.path.isdir(path) else None
+    return ds.dataset(path, format=dataset_format, partitioning=partitioning).to_table().to_pandas()
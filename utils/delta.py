@@ -0,0 +1,67 @@
+# utils/delta.py
+
+import pandas as pd
+from utils.transform import DEDUP_KEY
+
+# Kolom isi yang dibandingkan antar run (Timestamp berubah setiap run sehingga tidak ikut)
+CONTENT_COLUMNS = ["Rating", "Colors", "Gender"]
+HASH_COLUMN = "row_hash"
+
+def compute_row_hashes(df):
+    """Menghitung hash isi setiap baris (hex 16 karakter) dari CONTENT_COLUMNS."""
+    content = pd.DataFrame({
+        "Rating": df["Rating"].astype(float),
+        "Colors": df["Colors"].astype("int64"),
+        "Gender": df["Gender"].astype(str).astype(object),
+    })
+    hashes = pd.util.hash_pandas_object(content, index=False)
+    return hashes.map("{:016x}".format)
+
+def compute_delta(new_df, stored):
+    """Membandingkan data baru dengan data tersimpan berdasarkan DEDUP_KEY.
+
+    stored minimal berisi kolom DEDUP_KEY dan HASH_COLUMN. Mengembalikan
+    (inserted, updated, deleted_keys, report) dengan inserted/updated berupa
+    baris dari new_df (termasuk HASH_COLUMN) dan report berisi jumlah baris
+    unchanged, inserted, updated dan deleted.
+    """
+    new_df = new_df.copy()
+    # Kolom kategori (ProductBatch) dibandingkan sebagai object agar merge tidak bergantung pada kategori
+    for column in new_df.columns:
+        if isinstance(new_df[column].dtype, pd.CategoricalDtype):
+            new_df[column] = new_df[column].astype(object)
+    new_df[HASH_COLUMN] = compute_row_hashes(new_df) if len(new_df) else pd.Series(dtype=object)
+    if stored.empty:
+        report = {"unchanged": 0, "inserted": len(new_df), "updated": 0, "deleted": 0}
+        return new_df, new_df.iloc[0:0], pd.DataFrame(columns=DEDUP_KEY), report
+    stored = stored.astype({column: new_df[column].dtype for column in DEDUP_KEY})
+
+    merged = new_df.merge(
+        stored[DEDUP_KEY + [HASH_COLUMN]], on=DEDUP_KEY, how="outer",
+        suffixes=("", "_stored"), indicator=True,
+    )
+    stored_hash = f"{HASH_COLUMN}_stored"
+    inserted = merged["_merge"] == "left_only"
+    deleted = merged["_merge"] == "right_only"
+    both = merged["_merge"] == "both"
+    updated = both & (merged[HASH_COLUMN] != merged[stored_hash])
+
+    report = {
+        "unchanged": int((both & ~updated).sum()),
+        "inserted": int(inserted.sum()),
+        "updated": int(updated.sum()),
+        "deleted": int(deleted.sum()),
+    }
+    # Outer merge mengubah dtype (misalnya int -> float), kembalikan ke dtype asal
+    dtypes = new_df.dtypes.to_dict()
+    columns = list(new_df.columns)
+    return (
+        merged.loc[inserted, columns].astype(dtypes).reset_index(drop=True),
+        merged.loc[updated, columns].astype(dtypes).reset_index(drop=True),
+        merged.loc[deleted, DEDUP_KEY].reset_index(drop=True),
+        report,
+    )
+
+def format_delta_report(report):
+    """Format ringkas laporan delta untuk dicetak."""
+    return ", ".join(f"{key}={report[key]}" for key in ("unchanged", "inserted", "updated", "deleted"))
@@ -1,7 +1,15 @@
+import multiprocessing
 import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
 from datetime import datetime
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry, make_headers
+from bs4 import BeautifulSoup, SoupStrainer
+from utils.transform import clean_product_row
+from utils.workqueue import ShardWriter, default_worker_id
 
 HEADERS = {
     "User-Agent": (
@@ -14,9 +22,56 @@ def get_current_timestamp():
     """Mengembalikan timestamp saat ini dalam format ISO 8601."""
     return datetime.now().isoformat()
 
-def fetching_content(url):
-    """Mengambil konten HTML dari URL yang diberikan."""
+# Proses parse worker dibuat lewat forkserver (atau spawn), bukan fork: pool
+# dibuat saat thread I/O sedang di tengah request, dan fork dari proses
+# multi-thread bisa deadlock pada lock yang sedang dipegang thread lain
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+# Status yang layak dicoba ulang (throttling dan error sementara di server)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# Dengan AdaptiveScheduler, 429 dan 503 dikembalikan ke scheduler agar
+# Retry-After menahan semua worker, bukan hanya thread yang menerimanya
+SCHEDULER_RETRY_STATUSES = (500, 502, 504)
+
+def create_session(pool_size=10, max_retries=3, backoff_factor=0.5, backoff_max=30,
+                   retry_statuses=RETRY_STATUSES, respect_retry_after=True):
+    """Membuat requests.Session dengan connection pool keep-alive dan retry.
+
+    Retry memakai exponential backoff yang dibatasi backoff_max dan mengikuti
+    header Retry-After. Accept-Encoding otomatis menyertakan brotli (br) jika
+    paket brotli terpasang, selain gzip/deflate. retry_statuses menentukan
+    status HTTP yang dicoba ulang oleh urllib3; respect_retry_after=False
+    membuat 429/503 dengan Retry-After dikembalikan ke pemanggil.
+    """
     session = requests.Session()
+    retry = Retry(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        backoff_max=backoff_max,
+        status_forcelist=retry_statuses,
+        allowed_methods=frozenset(["GET", "HEAD"]),
+        respect_retry_after_header=respect_retry_after,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(HEADERS)
+    session.headers.update(make_headers(accept_encoding=True))
+    return session
+
+def fetching_content(url, session=None):
+    """Mengambil konten HTML dari URL yang diberikan.
+
+    Jika session tidak diberikan, dibuat session baru khusus untuk request ini
+    dan ditutup kembali setelahnya.
+    """
+    own_session = session is None
+    if own_session:
+        session = create_session()
     try:
         response = session.get(url, headers=HEADERS, timeout=10)
         response.raise_for_status()
@@ -25,6 +80,9 @@ def fetching_content(url):
     except requests.exceptions.RequestException as e:
         print(f"Terjadi kesalahan ketika melakukan requests terhadap {url}: {e}")
         return None
+    finally:
+        if own_session:
+            session.close()
 
 def extract_raw_product_data(product_card):
     """Mengambil data mentah produk dari elemen product card."""
@@ -44,32 +102,677 @@ def extract_raw_product_data(product_card):
         print(f"Error extracting raw product data: {e}")
         return None
 
-def scrape_all_pages(base_url, delay=1, max_pages=50):
-    """Fungsi utama untuk mengambil semua data mentah dari website."""
-    data = []
-    page_number = 1
-    
-    while page_number <= max_pages:
-        url = f"{base_url}/page{page_number}" if page_number > 1 else base_url
+# Penanda teks pada elemen <p> dan key data mentah yang diisinya
+TEXT_FIELD_MARKERS = (
+    ("rating_text", "Rating"),
+    ("colors_text", "Colors"),
+    ("size_text", "Size:"),
+    ("gender_text", "Gender:"),
+)
+RAW_FIELDS = ("title", "price") + tuple(key for key, _ in TEXT_FIELD_MARKERS)
+
+# Hanya div collection-card yang di-parse, sisa halaman dilewati
+PRODUCT_CARD_STRAINER = SoupStrainer('div', class_='collection-card')
+
+def extract_raw_product_data_single_pass(product_card):
+    """Mengambil data mentah produk dengan sekali jalan atas elemen product card.
+
+    Hasilnya sama dengan extract_raw_product_data: setiap field diambil dari
+    elemen pertama yang cocok, tetapi card hanya ditelusuri satu kali.
+    """
+    try:
+        data = _card_fields(product_card)
+        data['extracted_at'] = get_current_timestamp()
+        return data
+    # Error Handling
+    except Exception as e:
+        print(f"Error extracting raw product data: {e}")
+        return None
+
+def _card_fields(product_card):
+    """Field mentah card (title, price, rating_text, ...) dalam sekali jalan, tanpa timestamp."""
+    found = {}
+    for tag in product_card.find_all(('h3', 'span', 'p')):
+        if tag.name == 'p':
+            text = tag.string
+            if text is None:
+                continue
+            for key, marker in TEXT_FIELD_MARKERS:
+                if key not in found and marker in text:
+                    found[key] = tag.get_text(strip=True)
+        elif tag.name == 'h3':
+            if 'title' not in found and 'product-title' in tag.get('class', ()):
+                found['title'] = tag.get_text(strip=True)
+        elif 'price' not in found and 'price' in tag.get('class', ()):
+            found['price'] = tag.get_text(strip=True)
+    return {key: found[key] for key in RAW_FIELDS if key in found}
+
+def find_product_cards(content, parser="html.parser", use_strainer=True):
+    """Mem-parsing HTML dan mengembalikan semua elemen collection-card.
+
+    parser dapat diganti dengan backend yang lebih cepat seperti "lxml".
+    """
+    parse_only = PRODUCT_CARD_STRAINER if use_strainer else None
+    soup = BeautifulSoup(content, parser, parse_only=parse_only)
+    return soup.find_all('div', class_='collection-card')
+
+class RateLimiter:
+    """Membatasi jumlah request per detik secara global untuk semua worker."""
+
+    def __init__(self, requests_per_second=None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Menunggu sampai slot request berikutnya tersedia."""
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_slot, now)
+            self._next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+def build_page_url(base_url, page_number):
+    """Membentuk URL halaman berdasarkan nomor halaman."""
+    return f"{base_url}/page{page_number}" if page_number > 1 else base_url
+
+def _probe_page(session, url, parser="html.parser"):
+    """Memeriksa satu halaman untuk discover_page_count.
+
+    Mengembalikan (state, content) dengan state "more" (ada produk dan
+    halaman berikutnya), "last" (tombol li.next disabled), "missing" (404
+    atau tanpa produk), atau None jika request gagal karena hal lain.
+    """
+    try:
+        response = session.get(url, headers=HEADERS, timeout=10)
+    # Error Handling
+    except requests.exceptions.RequestException as e:
+        print(f"Terjadi kesalahan ketika melakukan requests terhadap {url}: {e}")
+        return None, None
+    if response.status_code == 404:
+        return "missing", None
+    if not response.ok:
+        print(f"Unexpected status {response.status_code} while probing {url}")
+        return None, None
+
+    content = response.content
+    soup = BeautifulSoup(content, parser)
+    if soup.find('div', class_='collection-card') is None:
+        return "missing", None
+    # Tanpa markup pagination sama sekali, akhir halaman ditentukan oleh probe berikutnya
+    next_button = soup.find('li', class_='next')
+    if next_button is not None and 'disabled' in next_button.get('class', []):
+        return "last", content
+    return "more", content
+
+def discover_page_count(base_url, session, max_pages=50, parser="html.parser", rate_limiter=None, scheduler=None):
+    """Mencari jumlah halaman katalog dengan probe eksponensial lalu binary search.
+
+    Halaman 1, 2, 4, 8, ... diperiksa sampai ditemukan halaman terakhir
+    (tombol next disabled) atau halaman yang tidak ada, lalu batas akhirnya
+    dipersempit dengan binary search. Butuh sekitar 2*log2(N) request.
+    Mengembalikan (page_count, contents): contents berisi body halaman yang
+    sudah diambil saat probe agar tidak diunduh ulang. page_count None jika
+    probe gagal (misalnya error server) sehingga pemanggil perlu fallback.
+    Probe melewati rate_limiter dan scheduler yang sama dengan fetch halaman;
+    probe yang dibalas 429/503 dicoba ulang hingga scheduler.max_attempts kali.
+    """
+    contents = {}
+
+    def probe(page_number):
+        url = build_page_url(base_url, page_number)
+        if rate_limiter is not None:
+            rate_limiter.wait()
+        if scheduler is None:
+            state, content = _probe_page(session, url, parser)
+        else:
+            for _ in range(scheduler.max_attempts):
+                scheduler.acquire()
+                start = time.perf_counter()
+                try:
+                    state, content = _probe_page(session, url, parser)
+                finally:
+                    retry = scheduler.release(time.perf_counter() - start)
+                if state is not None or not retry:
+                    break
+        if content:
+            contents[page_number] = content
+        return state
+
+    state = probe(1)
+    if state != "more":
+        return {"last": 1, "missing": 0}.get(state), contents
+    if max_pages <= 1:
+        return 1, contents
+
+    # low: halaman yang ada dan masih punya halaman berikutnya; high: halaman pertama yang tidak ada
+    low, high, page_number = 1, None, 2
+    while high is None:
+        page_number = min(page_number, max_pages)
+        state = probe(page_number)
+        if state is None:
+            return None, contents
+        if state == "last":
+            return page_number, contents
+        if state == "missing":
+            high = page_number
+        elif page_number >= max_pages:
+            return max_pages, contents
+        else:
+            low, page_number = page_number, page_number * 2
+
+    while high - low > 1:
+        middle = (low + high) // 2
+        state = probe(middle)
+        if state is None:
+            return None, contents
+        if state == "last":
+            return middle, contents
+        if state == "missing":
+            high = middle
+        else:
+            low = middle
+    return low, contents
+
+def extract_page_products(content, parser="html.parser", single_pass=True):
+    """Mengambil semua data mentah produk dari konten HTML satu halaman.
+
+    single_pass=False memakai parser lama (seluruh halaman + extract_raw_product_data).
+    """
+    products = []
+    product_cards = find_product_cards(content, parser, use_strainer=single_pass)
+    extract_card = extract_raw_product_data_single_pass if single_pass else extract_raw_product_data
+
+    for card in product_cards:
+        product_data = extract_card(card)
+        if product_data and product_data.get('title'):
+            product_data['timestamp'] = datetime.now().isoformat()
+            products.append(product_data)
+    return products
+
+def extract_page_rows(content, parser="html.parser"):
+    """Mode fused: baris produk bersih bertipe langsung dari konten HTML satu halaman.
+
+    Setiap card dibersihkan dengan utils.transform.clean_product_row menjadi
+    tuple sesuai OUTPUT_COLUMNS, tanpa dict mentah perantara; card yang akan
+    dibuang transform tidak pernah disimpan. Semua baris satu halaman
+    berbagi satu Timestamp. Dedup (Title, Price, Size) dilakukan saat
+    baris digabung dengan utils.transform.rows_to_batch.
+    """
+    timestamp = get_current_timestamp()
+    rows = []
+    for card in find_product_cards(content, parser):
+        try:
+            fields = _card_fields(card)
+        # Error Handling
+        except Exception as e:
+            print(f"Error extracting product data: {e}")
+            continue
+        if not fields.get('title'):
+            continue
+        row = clean_product_row(fields, timestamp)
+        if row is not None:
+            rows.append(row)
+    return rows
+
+def scrape_all_pages(base_url, delay=1, max_pages=50, concurrency=1, requests_per_second=None,
+                     session=None, parser="html.parser", parse_workers=None, cache=None, archive=None,
+                     metrics=None, checkpoint=None, retry_failed=1, discover_pages=False, scheduler=None,
+                     fused=False):
+    """Fungsi utama untuk mengambil semua data mentah dari website.
+
+    Dengan concurrency > 1 atau requests_per_second diisi, halaman diambil
+    secara paralel oleh thread pool dan jeda per halaman (delay) diganti oleh
+    batas request per detik global. Urutan hasil tetap mengikuti nomor halaman,
+    termasuk halaman dari checkpoint dan halaman gagal yang berhasil diulang.
+    Satu session (connection pool) dipakai bersama untuk seluruh crawl.
+    parser menentukan backend BeautifulSoup ("html.parser" atau "lxml").
+    parse_workers > 0 memindahkan parsing HTML ke ProcessPoolExecutor sehingga
+    fetch (thread I/O) dan parsing (proses) berjalan bersamaan di banyak core.
+    cache (utils.cache.PageCache) mengaktifkan conditional GET; halaman yang
+    tidak berubah memakai ulang data mentah hasil parsing sebelumnya.
+    archive (utils.archive.PageArchive) menyimpan setiap body yang diunduh
+    untuk diproses ulang nanti dengan replay_all_pages.
+    metrics (utils.metrics.RunMetrics) mencatat status HTTP, byte, latensi
+    fetch, waktu parsing serta jumlah halaman dan card.
+    checkpoint (utils.checkpoint.CrawlCheckpoint) menyimpan setiap halaman
+    yang selesai sehingga crawl yang terhenti dilanjutkan dari halaman yang
+    belum selesai. Halaman yang gagal diambil ulang di akhir crawl sebanyak
+    retry_failed putaran. discover_pages=True mencari jumlah halaman lebih
+    dulu (discover_page_count, dibatasi max_pages) lalu hanya menjadwalkan
+    halaman yang ada; body hasil probe dipakai ulang.
+    scheduler (utils.scheduler.AdaptiveScheduler) menggantikan delay,
+    concurrency dan requests_per_second dengan laju dan concurrency adaptif:
+    naik selama latensi di bawah target, turun setengah saat server
+    membalas 429/5xx, dan menunggu Retry-After sebelum mencoba ulang.
+    fused=True mengembalikan baris bersih bertipe (extract_page_rows) alih-alih
+    data mentah; gabungkan dengan utils.transform.rows_to_batch. Cache dan
+    checkpoint kemudian menyimpan baris tersebut, jadi jangan dipakai
+    bergantian dengan mode biasa pada file yang sama.
+    """
+    # Halaman dari checkpoint dan halaman yang berhasil diulang datang di luar urutan
+    pages = {}
+    page_iter = iter_product_pages(base_url, delay, max_pages, concurrency, requests_per_second, session, parser,
+                                   parse_workers, cache, archive, metrics, checkpoint, retry_failed,
+                                   discover_pages, scheduler, fused)
+    for page_number, products in page_iter:
+        if products:
+            pages[page_number] = products
+    return [product for page_number in sorted(pages) for product in pages[page_number]]
+
+def iter_product_pages(base_url, delay=1, max_pages=50, concurrency=1, requests_per_second=None,
+                       session=None, parser="html.parser", parse_workers=None, cache=None, archive=None,
+                       metrics=None, checkpoint=None, retry_failed=1, discover_pages=False, scheduler=None,
+                       fused=False):
+    """Generator (page_number, products) per halaman sesuai urutan halaman.
+
+    Parameter sama dengan scrape_all_pages. Halaman dari checkpoint
+    dihasilkan lebih dulu, lalu halaman lain sesuai urutan; halaman yang
+    gagal diambil ulang di akhir dan baru dihasilkan dengan products None
+    jika tetap gagal. Pada mode paralel jumlah halaman yang sedang diproses
+    dibatasi sehingga memori tidak bergantung pada jumlah halaman.
+    """
+    owns_session = session is None
+    session = _prepare_session(session, concurrency, metrics, scheduler)
+    parallel = scheduler is None and (concurrency > 1 or requests_per_second or parse_workers)
+    # Probe discover_pages dan fetch halaman berbagi pembatas laju yang sama;
+    # pada mode sekuensial probe diberi jeda delay seperti antar halaman
+    if scheduler is not None:
+        rate_limiter = None
+    elif parallel:
+        rate_limiter = RateLimiter(requests_per_second)
+    else:
+        rate_limiter = RateLimiter(1.0 / delay if delay else None)
+    page_numbers = range(1, max_pages + 1)
+    prefetched = None
+    if discover_pages:
+        page_count, prefetched = discover_page_count(base_url, session, max_pages, parser, rate_limiter, scheduler)
+        if page_count is None:
+            print(f"Could not discover the page count, crawling up to {max_pages} pages")
+        else:
+            print(f"Discovered {page_count} pages")
+            page_numbers = range(1, page_count + 1)
+            if metrics is not None:
+                metrics.increment("pages_discovered", page_count)
+        if cache is not None:
+            # Cache butuh validator dari conditional GET-nya sendiri, jadi body probe tidak dipakai
+            prefetched = None
+
+    def on_parsed(page_number, products, parse_seconds):
+        if cache is not None:
+            cache.store(build_page_url(base_url, page_number), products)
+        if metrics is not None:
+            metrics.add_time("parse", parse_seconds)
+
+    if scheduler is not None:
+        fetch = _make_page_fetcher(base_url, session, None, cache, archive, prefetched, scheduler)
+
+        def fetch_pages(numbers):
+            # Pool selebar max_concurrency; jumlah request aktif dibatasi scheduler
+            return _iter_pages_concurrently(fetch, numbers, scheduler.max_concurrency, parser,
+                                            parse_workers, on_parsed, fused)
+    elif parallel:
+        fetch = _make_page_fetcher(base_url, session, rate_limiter, cache, archive, prefetched)
+
+        def fetch_pages(numbers):
+            return _iter_pages_concurrently(fetch, numbers, concurrency, parser, parse_workers, on_parsed, fused)
+    else:
+        fetch = _make_page_fetcher(base_url, session, cache=cache, archive=archive, prefetched=prefetched)
+
+        def fetch_pages(numbers):
+            return _iter_pages_sequentially(fetch, numbers, delay, parser, on_parsed, fused)
+
+    try:
+        pages = _iter_pages_with_recovery(base_url, fetch_pages, page_numbers, checkpoint, retry_failed, metrics)
+        yield from _count_pages(pages, metrics)
+    finally:
+        if owns_session:
+            session.close()
+
+def _prepare_session(session, concurrency, metrics, scheduler):
+    """Membuat session crawl jika belum ada dan memasang hook metrics/scheduler."""
+    if session is None:
+        if scheduler is not None:
+            session = create_session(pool_size=max(10, scheduler.max_concurrency),
+                                     retry_statuses=SCHEDULER_RETRY_STATUSES, respect_retry_after=False)
+        else:
+            session = create_session(pool_size=max(10, concurrency))
+    if metrics is not None:
+        metrics.attach_session(session)
+    if scheduler is not None:
+        scheduler.attach_session(session)
+    return session
+
+def run_crawl_worker(base_url, queue, shard_dir, worker_id=None, max_pages=50, concurrency=1,
+                     requests_per_second=None, session=None, parser="html.parser", metrics=None,
+                     scheduler=None, discover_pages=True, poll_interval=1.0):
+    """Menjalankan satu worker crawl terdistribusi sampai antrean habis.
+
+    Halaman diambil (lease) dari queue (utils.workqueue.WorkQueue) per
+    `concurrency` halaman, diunduh dan di-parse, lalu data mentahnya ditulis
+    ke shard milik worker ini di shard_dir sebelum task ditandai selesai.
+    Worker pertama yang menemukan antrean kosong mengisinya (discover_pages
+    mencari jumlah halaman lebih dulu). Jika semua sisa halaman sedang
+    di-lease worker lain, worker menunggu sampai halaman itu selesai atau
+    lease-nya kedaluwarsa. Gabungkan hasilnya dengan
+    utils.workqueue.merge_shards. Mengembalikan jumlah halaman yang
+    diselesaikan worker ini.
+    """
+    worker_id = worker_id or default_worker_id()
+    owns_session = session is None
+    session = _prepare_session(session, concurrency, metrics, scheduler)
+    width = scheduler.max_concurrency if scheduler is not None else max(1, concurrency)
+
+    def on_parsed(page_number, products, parse_seconds):
+        if metrics is not None:
+            metrics.add_time("parse", parse_seconds)
+
+    completed = 0
+    rate_limiter = RateLimiter(requests_per_second) if scheduler is None else None
+    try:
+        prefetched = None
+        if not queue.has_tasks(base_url):
+            page_numbers = range(1, max_pages + 1)
+            if discover_pages:
+                page_count, prefetched = discover_page_count(base_url, session, max_pages, parser,
+                                                             rate_limiter, scheduler)
+                if page_count is not None:
+                    page_numbers = range(1, page_count + 1)
+            print(f"Queued {queue.enqueue(base_url, page_numbers)} pages for {base_url}")
+        # Body hasil probe dipakai jika halamannya di-lease oleh worker ini
+        fetch = _make_page_fetcher(base_url, session, rate_limiter, prefetched=prefetched, scheduler=scheduler)
+
+        with ShardWriter(shard_dir, worker_id, queue.crawl_id(base_url)) as shard:
+            while True:
+                leased = queue.lease(base_url, worker_id, limit=width)
+                if not leased:
+                    expires = queue.next_expiry(base_url)
+                    if expires is None:
+                        break
+                    # Sisa halaman dipegang worker lain: tunggu selesai atau lease kedaluwarsa
+                    time.sleep(min(poll_interval, max(0.0, expires - time.time()) + 0.01))
+                    continue
+                pages = _iter_pages_concurrently(fetch, leased, width, parser, None, on_parsed)
+                for page_number, products in _count_pages(pages, metrics):
+                    if products is None:
+                        queue.fail(base_url, page_number, worker_id)
+                        continue
+                    shard.write_page(page_number, products)
+                    if queue.complete(base_url, page_number, worker_id):
+                        completed += 1
+    finally:
+        if owns_session:
+            session.close()
+    print(f"Worker {worker_id} completed {completed} pages; queue status {queue.counts(base_url)}")
+    return completed
+
+def iter_raw_product_batches(base_url, pages_per_batch=1, **scrape_options):
+    """Generator list data mentah produk, satu batch untuk setiap pages_per_batch halaman."""
+    return batch_product_pages(iter_product_pages(base_url, **scrape_options), pages_per_batch)
+
+def _iter_pages_with_recovery(base_url, fetch_pages, page_numbers, checkpoint, retry_failed, metrics):
+    """Melanjutkan dari checkpoint dan mengulang halaman gagal di akhir crawl.
+
+    fetch_pages(page_numbers) menghasilkan (page_number, products) seperti
+    _iter_pages_sequentially / _iter_pages_concurrently.
+    """
+    completed = checkpoint.resume(base_url) if checkpoint is not None else {}
+    completed = {page: products for page, products in completed.items() if page in page_numbers}
+    if completed:
+        print(f"Resuming crawl from checkpoint: {len(completed)} pages already done")
+        if metrics is not None:
+            metrics.increment("pages_resumed", len(completed))
+    for page_number in sorted(completed):
+        yield page_number, completed[page_number]
+
+    remaining = [page for page in page_numbers if page not in completed]
+    for attempt in range(retry_failed + 1):
+        failed = []
+        for page_number, products in fetch_pages(remaining):
+            if products is None:
+                failed.append(page_number)
+                if checkpoint is not None:
+                    checkpoint.mark_failed(base_url, page_number)
+                continue
+            if checkpoint is not None:
+                checkpoint.mark_done(base_url, page_number, products)
+            yield page_number, products
+        if not failed or attempt == retry_failed:
+            break
+        # Error Handling
+        print(f"Retrying {len(failed)} failed pages: {failed}")
+        if metrics is not None:
+            metrics.increment("pages_retried", len(failed))
+        remaining = failed
+
+    for page_number in failed:
+        yield page_number, None
+    if checkpoint is not None and not failed:
+        checkpoint.finish(base_url)
+
+def _count_pages(pages, metrics):
+    """Meneruskan (page_number, products) sambil menghitung halaman dan card di metrics."""
+    if metrics is None:
+        yield from pages
+        return
+    for page_number, products in pages:
+        if products is None:
+            metrics.increment("pages_failed")
+        else:
+            metrics.increment("pages")
+            metrics.increment("cards", len(products))
+        yield page_number, products
+
+def batch_product_pages(pages, pages_per_batch=1):
+    """Mengelompokkan (page_number, products) menjadi batch data mentah produk."""
+    batch = []
+    pages_in_batch = 0
+    for _, products in pages:
+        batch.extend(products or [])
+        pages_in_batch += 1
+        if pages_in_batch >= pages_per_batch:
+            if batch:
+                yield batch
+            batch = []
+            pages_in_batch = 0
+    if batch:
+        yield batch
+
+def _make_page_fetcher(base_url, session, rate_limiter=None, cache=None, archive=None, prefetched=None,
+                       scheduler=None):
+    """Membuat fungsi fetch(page_number) -> (content, cached_products).
+
+    cached_products tidak None jika cache menyatakan halaman tidak berubah,
+    sehingga parsing bisa dilewati; timestamp-nya diganti dengan waktu fetch
+    ini agar run ulang tidak membawa waktu ekstraksi run pertama. Setiap
+    halaman ditambahkan ke archive jika diberikan (untuk halaman dari cache,
+    body yang tersimpan di cache). prefetched ({page_number: body}) berisi
+    body yang sudah diunduh sebelumnya (misalnya saat probe) dan dipakai sekali.
+    Dengan scheduler, setiap request menunggu izin scheduler dan halaman
+    yang dibalas 429/503 dicoba ulang hingga scheduler.max_attempts kali.
+    """
+    prefetched = dict(prefetched or {})
+
+    def download(url):
+        if cache is not None:
+            return cache.fetch(url, session)
+        return fetching_content(url, session), None
+
+    def fetch(page_number):
+        content = prefetched.pop(page_number, None)
+        if content is not None:
+            print(f"Extracting page {page_number} (already fetched)...")
+            if archive is not None:
+                archive.append(page_number, content)
+            return content, None
+        if rate_limiter is not None:
+            rate_limiter.wait()
         print(f"Extracting page {page_number}...")
-        
-        content = fetching_content(url)
+        url = build_page_url(base_url, page_number)
+        if scheduler is None:
+            content, products = download(url)
+        else:
+            for _ in range(scheduler.max_attempts):
+                scheduler.acquire()
+                start = time.perf_counter()
+                try:
+                    content, products = download(url)
+                finally:
+                    retry = scheduler.release(time.perf_counter() - start)
+                if content or products is not None or not retry:
+                    break
+        if archive is not None:
+            # Halaman yang tidak berubah tetap diarsipkan (body tersimpan di cache)
+            # agar run arsip ini lengkap untuk replay
+            body = content if products is None else cache.body(url)
+            if body:
+                archive.append(page_number, body)
+        if products is not None:
+            products = _with_timestamp(products, get_current_timestamp())
+        return content, products
+    return fetch
+
+def iter_replayed_pages(archive, parser="html.parser", parse_workers=None, run_id=None, metrics=None,
+                        fused=False):
+    """Generator (page_number, products) dari arsip HTML tanpa akses jaringan.
+
+    archive adalah utils.archive.PageArchive; run_id default ke crawl terakhir.
+    Tidak ada rate limit maupun jeda, sehingga kecepatannya setara parser.
+    Timestamp produk diisi waktu fetch yang tercatat di arsip, bukan waktu replay.
+    """
+    index = archive.page_entries(run_id)
+
+    def fetch(page_number):
+        offset, length, _ = index[page_number]
+        content = archive.read(offset, length)
+        if metrics is not None:
+            metrics.increment("bytes_fetched", len(content))
+        return content, None
+
+    def on_parsed(page_number, products, parse_seconds):
+        if metrics is not None:
+            metrics.add_time("parse", parse_seconds)
+
+    page_numbers = sorted(index)
+    if parse_workers:
+        pages = _iter_pages_concurrently(fetch, page_numbers, 1, parser, parse_workers, on_parsed, fused)
+    else:
+        pages = _iter_pages_sequentially(fetch, page_numbers, 0, parser, on_parsed, fused)
+    for page_number, products in _count_pages(pages, metrics):
+        if products:
+            fetched_at = datetime.fromtimestamp(index[page_number][2]).isoformat()
+            products = _with_timestamp(products, fetched_at, fused)
+        yield page_number, products
+
+def _with_timestamp(products, timestamp, fused=False):
+    """Mengganti waktu ekstraksi produk (dict mentah atau baris fused) dengan timestamp."""
+    if fused:
+        return [row[:-1] + (timestamp,) for row in products]
+    for product in products:
+        product['timestamp'] = timestamp
+        if 'extracted_at' in product:
+            product['extracted_at'] = timestamp
+    return products
+
+def replay_all_pages(archive, parser="html.parser", parse_workers=None, run_id=None, metrics=None,
+                     fused=False):
+    """Seperti scrape_all_pages, tetapi halaman dibaca dari arsip HTML."""
+    data = []
+    for _, products in iter_replayed_pages(archive, parser, parse_workers, run_id, metrics, fused):
+        if products:
+            data.extend(products)
+    return data
+
+def _iter_pages_sequentially(fetch, page_numbers, delay, parser, on_parsed, fused=False):
+    """Mengambil halaman satu per satu dengan jeda delay detik."""
+    for page_number in page_numbers:
+        content, products = fetch(page_number)
+        if products is None:
+            if not content:
+                # Error Handling
+                print(f"Failed to fetch page {page_number}")
+                yield page_number, None
+                continue
+            products, parse_seconds = _parse_page(content, parser, fused)
+            on_parsed(page_number, products, parse_seconds)
+
+        yield page_number, products
+        time.sleep(delay)
+
+def _parse_page(content, parser, fused=False):
+    """extract_page_products (atau extract_page_rows jika fused) beserta durasinya.
+
+    Dijalankan juga di proses parse worker.
+    """
+    start = time.perf_counter()
+    products = extract_page_rows(content, parser) if fused else extract_page_products(content, parser)
+    return products, time.perf_counter() - start
+
+def _completed_future(result):
+    """Membungkus hasil yang sudah ada menjadi Future yang selesai."""
+    future = Future()
+    future.set_result(result)
+    return future
+
+def _iter_pages_concurrently(fetch, page_numbers, concurrency, parser, parse_workers, on_parsed, fused=False):
+    """Mengambil halaman secara paralel dan menghasilkan hasil parsing sesuai urutan halaman.
+
+    Halaman di-parse segera setelah selesai diambil; jika parse_workers diisi,
+    parsing dikirim ke proses worker yang hanya mengembalikan dict mentah produk.
+    Paling banyak `window` halaman berada di antrean sekaligus.
+    """
+    pages = iter(page_numbers)
+    window = max(1, concurrency) * 2 + (parse_workers or 0)
+    # Setiap entri: [page_number, future fetch, future parse, hasil parsing baru?]
+    pending = deque()
+    io_pool = ThreadPoolExecutor(max_workers=max(1, concurrency))
+    parse_pool = None
+    if parse_workers:
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers,
+                                         mp_context=multiprocessing.get_context(PARSE_START_METHOD))
+
+    def start_parse(entry):
+        content, products = entry[1].result()
+        if products is not None:
+            return _completed_future((products, 0.0))
         if not content:
             # Error Handling
-            print(f"Failed to fetch page {page_number}")
-            page_number += 1
-            continue
-            
-        soup = BeautifulSoup(content, "html.parser")
-        product_cards = soup.find_all('div', class_='collection-card')
-        
-        for card in product_cards:
-            product_data = extract_raw_product_data(card)
-            if product_data and product_data.get('title'):
-                product_data['timestamp'] = datetime.now().isoformat()
-                data.append(product_data)
-        
-        page_number += 1
-        time.sleep(delay)
-    
-    return data
\ No newline at end of file
+            print(f"Failed to fetch page {entry[0]}")
+            return _completed_future((None, 0.0))
+        entry[3] = True
+        if parse_pool:
+            return parse_pool.submit(_parse_page, content, parser, fused)
+        return _completed_future(_parse_page(content, parser, fused))
+
+    try:
+        while True:
+            while len(pending) < window:
+                page_number = next(pages, None)
+                if page_number is None:
+                    break
+                pending.append([page_number, io_pool.submit(fetch, page_number), None, False])
+            if not pending:
+                break
+
+            # Serahkan setiap halaman yang sudah selesai diambil ke tahap parsing
+            for entry in pending:
+                if entry[2] is None and entry[1].done():
+                    entry[2] = start_parse(entry)
+
+            page_number, _, parse, fresh = pending[0]
+            if parse is None:
+                # Tunggu fetch mana pun selesai agar parsing bisa segera dimulai
+                wait([entry[1] for entry in pending if entry[2] is None], return_when=FIRST_COMPLETED)
+                continue
+            pending.popleft()
+            products, parse_seconds = parse.result()
+            if fresh:
+                on_parsed(page_number, products, parse_seconds)
+            yield page_number, products
+    finally:
+        io_pool.shutdown(wait=True, cancel_futures=True)
+        if parse_pool:
+            parse_pool.shutdown(cancel_futures=True)
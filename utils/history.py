@@ -0,0 +1,248 @@
+# utils/history.py
+
+import os
+import time
+import pandas as pd
+from sqlalchemy import (
+    MetaData, Table, Column, Float, Integer, Text, Index, PrimaryKeyConstraint, func, select,
+)
+from sqlalchemy.dialects import postgresql, sqlite
+from utils.batch import as_dataframe
+from utils.load import _copy_dataframe, get_engine, load_environment
+from utils.transform import DEDUP_KEY, OUTPUT_COLUMNS
+
+# Identitas produk antar run; harga ikut DEDUP_KEY sehingga tidak bisa dipakai untuk melacak perubahan harga
+PRODUCT_KEY = ["Title", "Size"]
+LATEST_COLUMNS = ["Price", "Rating", "Colors", "Gender", "Timestamp"]
+UPSERT_CHUNK_ROWS = 5000
+
+class HistoryStore:
+    """Riwayat harga/rating produk per run ekstraksi di PostgreSQL (atau SQLite).
+
+    Tabel yang dikelola (prefix default "product"):
+      - <prefix>_runs: satu baris per run (run_id, started_at, finished_at, row_count)
+      - <prefix>_history: append-only, semua baris setiap run; index (Title, Size) dan Timestamp
+      - <prefix>_latest: tabel materialized satu baris per (Title, Size) berisi nilai
+        terakhir beserta previous_price/previous_rating dari run sebelumnya
+      - <prefix>_run_aggregates: rata-rata/min/max harga dan rata-rata rating per
+        (run_id, Gender, Size), dihitung sekali saat run selesai
+
+    Tabel latest diperbarui dengan upsert setiap kali batch ditambahkan,
+    sehingga "perubahan harga sejak run terakhir" cukup membaca baris run
+    terakhir lewat index run_id, tanpa memindai seluruh riwayat. Jika satu
+    run punya beberapa baris dengan (Title, Size) sama, baris pertama yang
+    dipakai untuk latest (sama seperti dedup keep-first di transform).
+    """
+
+    def __init__(self, db_url, prefix="product"):
+        self.engine = get_engine(db_url)
+        self.dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(self.engine.dialect.name)
+        if self.dialect is None:
+            raise ValueError(f"History store is not supported for dialect '{self.engine.dialect.name}'")
+
+        self.metadata = MetaData()
+        self.runs = Table(
+            f"{prefix}_runs", self.metadata,
+            Column("run_id", Integer, primary_key=True, autoincrement=True),
+            Column("started_at", Text, nullable=False),
+            Column("finished_at", Text),
+            Column("row_count", Integer),
+        )
+        self.history = Table(
+            f"{prefix}_history", self.metadata,
+            Column("run_id", Integer, nullable=False),
+            Column("Title", Text, nullable=False),
+            Column("Price", Float, nullable=False),
+            Column("Rating", Float),
+            Column("Colors", Integer),
+            Column("Size", Text, nullable=False),
+            Column("Gender", Text),
+            Column("Timestamp", Text),
+            PrimaryKeyConstraint("run_id", *DEDUP_KEY),
+        )
+        Index(f"{prefix}_history_product", self.history.c.Title, self.history.c.Size, self.history.c.run_id)
+        Index(f"{prefix}_history_timestamp", self.history.c.Timestamp)
+        self.latest = Table(
+            f"{prefix}_latest", self.metadata,
+            Column("Title", Text, nullable=False),
+            Column("Size", Text, nullable=False),
+            Column("Price", Float, nullable=False),
+            Column("Rating", Float),
+            Column("Colors", Integer),
+            Column("Gender", Text),
+            Column("Timestamp", Text),
+            Column("run_id", Integer, nullable=False),
+            Column("previous_price", Float),
+            Column("previous_rating", Float),
+            Column("previous_run_id", Integer),
+            PrimaryKeyConstraint(*PRODUCT_KEY),
+        )
+        Index(f"{prefix}_latest_run", self.latest.c.run_id)
+        self.aggregates = Table(
+            f"{prefix}_run_aggregates", self.metadata,
+            Column("run_id", Integer, nullable=False),
+            Column("Gender", Text, nullable=False),
+            Column("Size", Text, nullable=False),
+            Column("product_count", Integer),
+            Column("avg_price", Float),
+            Column("min_price", Float),
+            Column("max_price", Float),
+            Column("avg_rating", Float),
+            PrimaryKeyConstraint("run_id", "Gender", "Size"),
+        )
+        # create_all melewati tabel dan index yang sudah ada
+        self.metadata.create_all(self.engine)
+
+    def start_run(self):
+        """Mencatat run baru dan mengembalikan run_id-nya."""
+        with self.engine.begin() as connection:
+            return self._start_run(connection)
+
+    def _start_run(self, connection):
+        result = connection.execute(self.runs.insert().values(started_at=_now()))
+        return result.inserted_primary_key[0]
+
+    def append(self, run_id, data):
+        """Menambahkan baris run_id ke riwayat dan memperbarui tabel latest; jumlah baris yang ditulis."""
+        df = _history_frame(data)
+        with self.engine.begin() as connection:
+            self._append(connection, run_id, df)
+        return len(df)
+
+    def _append(self, connection, run_id, df):
+        if df.empty:
+            return
+        df.insert(0, "run_id", run_id)
+        _copy_dataframe(connection, df, self.history.name)
+
+        latest = df.drop_duplicates(subset=PRODUCT_KEY)
+        statement = self.dialect.insert(self.latest)
+        statement = statement.on_conflict_do_update(
+            index_elements=PRODUCT_KEY,
+            set_={
+                **{column: statement.excluded[column] for column in LATEST_COLUMNS + ["run_id"]},
+                # Di SET, kolom tabel masih bernilai lama (baris dari run sebelumnya)
+                "previous_price": self.latest.c.Price,
+                "previous_rating": self.latest.c.Rating,
+                "previous_run_id": self.latest.c.run_id,
+            },
+            # Baris berikutnya dari run yang sama (batch streaming lain) tidak menimpa baris pertama
+            where=self.latest.c.run_id != statement.excluded.run_id,
+        )
+        records = latest[["run_id"] + PRODUCT_KEY + LATEST_COLUMNS].to_dict(orient="records")
+        for start in range(0, len(records), UPSERT_CHUNK_ROWS):
+            connection.execute(statement, records[start:start + UPSERT_CHUNK_ROWS])
+
+    def finish_run(self, run_id):
+        """Menghitung agregat per (Gender, Size) dan menandai run selesai; jumlah baris run."""
+        with self.engine.begin() as connection:
+            return self._finish_run(connection, run_id)
+
+    def _finish_run(self, connection, run_id):
+        history = self.history.c
+        connection.execute(self.aggregates.delete().where(self.aggregates.c.run_id == run_id))
+        grouped = (
+            select(history.run_id, history.Gender, history.Size, func.count(),
+                   func.avg(history.Price), func.min(history.Price), func.max(history.Price),
+                   func.avg(history.Rating))
+            .where(history.run_id == run_id)
+            .group_by(history.run_id, history.Gender, history.Size)
+        )
+        connection.execute(self.aggregates.insert().from_select(
+            ["run_id", "Gender", "Size", "product_count", "avg_price", "min_price", "max_price", "avg_rating"],
+            grouped,
+        ))
+        row_count = connection.execute(
+            select(func.count()).select_from(self.history).where(history.run_id == run_id)
+        ).scalar_one()
+        connection.execute(self.runs.update().where(self.runs.c.run_id == run_id)
+                           .values(finished_at=_now(), row_count=row_count))
+        return row_count
+
+    def record_run(self, data):
+        """Menyimpan satu run lengkap dalam satu transaksi; mengembalikan run_id."""
+        df = _history_frame(data)
+        with self.engine.begin() as connection:
+            run_id = self._start_run(connection)
+            self._append(connection, run_id, df)
+            self._finish_run(connection, run_id)
+        return run_id
+
+    def latest_run_id(self):
+        """run_id run terakhir yang sudah selesai, atau None."""
+        with self.engine.connect() as connection:
+            return connection.execute(
+                select(func.max(self.runs.c.run_id)).where(self.runs.c.finished_at.is_not(None))
+            ).scalar_one()
+
+    def price_changes(self, run_id=None):
+        """Produk di run_id (default run terakhir) yang harganya berbeda dari run sebelumnya.
+
+        Kolom change = Price - previous_price. Hanya membaca baris tabel
+        latest milik run tersebut (index run_id).
+        """
+        run_id = self.latest_run_id() if run_id is None else run_id
+        latest = self.latest.c
+        query = (
+            select(latest.Title, latest.Size, latest.previous_price, latest.Price,
+                   (latest.Price - latest.previous_price).label("change"),
+                   latest.previous_rating, latest.Rating, latest.previous_run_id, latest.run_id)
+            .where(latest.run_id == run_id, latest.previous_run_id.is_not(None),
+                   latest.Price != latest.previous_price)
+            .order_by(latest.Title, latest.Size)
+        )
+        with self.engine.connect() as connection:
+            return pd.read_sql(query, connection)
+
+    def run_aggregates(self, run_id=None):
+        """Agregat harga dan rating per (Gender, Size) untuk run_id (default run terakhir)."""
+        run_id = self.latest_run_id() if run_id is None else run_id
+        query = (self.aggregates.select().where(self.aggregates.c.run_id == run_id)
+                 .order_by(self.aggregates.c.Gender, self.aggregates.c.Size))
+        with self.engine.connect() as connection:
+            return pd.read_sql(query, connection)
+
+    def product_history(self, title, size=None):
+        """Riwayat harga/rating satu produk, urut per run (index (Title, Size))."""
+        query = self.history.select().where(self.history.c.Title == title)
+        if size is not None:
+            query = query.where(self.history.c.Size == size)
+        with self.engine.connect() as connection:
+            return pd.read_sql(query.order_by(self.history.c.Size, self.history.c.run_id), connection)
+
+def _history_frame(data):
+    """DataFrame OUTPUT_COLUMNS dengan kolom kategori dan Timestamp sebagai teks biasa."""
+    df = as_dataframe(data, columns=OUTPUT_COLUMNS)[OUTPUT_COLUMNS].copy()
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(object)
+    df["Timestamp"] = df["Timestamp"].astype(object).where(df["Timestamp"].notna(), None)
+    df["Timestamp"] = df["Timestamp"].map(lambda value: value if value is None else str(value))
+    return df
+
+def _now():
+    return time.strftime("%Y-%m-%dT%H:%M:%S")
+
+def record_price_history(data, db_url=None):
+    """Menambahkan data sebagai satu run baru ke riwayat harga/rating.
+
+    Mengembalikan laporan run_id, jumlah baris dan jumlah produk yang
+    harganya berubah sejak run sebelumnya, atau None jika gagal.
+    """
+    if db_url is None:
+        load_environment()
+        db_url = os.getenv('POSTGRES_DB_URL')
+        if db_url is None:
+            raise ValueError("History database URL not provided and not found in environment variables.")
+
+    try:
+        store = HistoryStore(db_url)
+        run_id = store.record_run(data)
+        report = {"run_id": run_id, "rows": len(as_dataframe(data, columns=OUTPUT_COLUMNS)),
+                  "price_changes": len(store.price_changes(run_id))}
+        print(f"Price history run {run_id}: {report['rows']} rows, {report['price_changes']} price changes")
+        return report
+    # Error Handling
+    except Exception as e:
+        print(f"Error saving price history: {e}")
+        return None
@@ -1,22 +1,39 @@
 # utils/load.py
 
 import pandas as pd
-from google.oauth2.service_account import Credentials
-from googleapiclient.discovery import build
-from sqlalchemy import create_engine
-from dotenv import load_dotenv 
+from utils.batch import as_dataframe
+from utils.delta import compute_delta, compute_row_hashes, format_delta_report, HASH_COLUMN
+from utils.transform import DEDUP_KEY, OUTPUT_COLUMNS
 import os 
+import io
+import threading
 
-# --- Load environment variables from .env file ---
-# Pastikan ini dipanggil di awal skrip atau modul yang membutuhkan variabel ini
-load_dotenv()
+# Google API client, SQLAlchemy, pyarrow dan python-dotenv baru di-import saat
+# sink yang membutuhkannya dipanggil, sehingga run CSV saja (dan test) tidak
+# ikut membayar waktu import-nya. Lihat utils.sinks untuk pemilihan sink.
+_ENV_LOADED = False
+
+def load_environment():
+    """Memuat variabel lingkungan dari .env (sekali, saat sink pertama membutuhkannya)."""
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
 
 # ===== Fungsi menyimpan ke CSV =====
-def save_to_csv(data, filename):
-    """Menyimpan data ke file CSV."""
+def save_to_csv(data, filename, append=False):
+    """Menyimpan data ke file CSV.
+
+    append=True menambahkan baris ke file yang sudah ada (header hanya ditulis
+    jika file belum ada), dipakai oleh mode streaming per batch.
+    """
     try:
-        df = pd.DataFrame(data)
-        df.to_csv(filename, index=False)
+        df = as_dataframe(data)
+        if append and os.path.exists(filename) and os.path.getsize(filename) > 0:
+            df.to_csv(filename, mode='a', header=False, index=False)
+        else:
+            df.to_csv(filename, index=False)
         print(f"Data successfully saved to {filename}")
         return True
     # Error Handling
@@ -24,49 +41,117 @@ def save_to_csv(data, filename):
         print(f"Error saving to CSV: {e}")
         return False
 
+def save_to_csv_incremental(data, filename):
+    """Memperbarui file CSV hanya jika ada baris yang berubah.
+
+    Baris dibandingkan dengan isi CSV sebelumnya berdasarkan kunci
+    (Title, Price, Size) dan hash isi. Baris yang tidak berubah mempertahankan
+    nilai lamanya (termasuk Timestamp); file tidak ditulis ulang jika tidak
+    ada perubahan. Mengembalikan laporan delta, atau None jika gagal.
+    """
+    try:
+        new_df = as_dataframe(data, columns=OUTPUT_COLUMNS)
+        if os.path.exists(filename) and os.path.getsize(filename) > 0:
+            # keep_default_na=False: Size "NA" (card tanpa ukuran) tetap teks, bukan NaN
+            stored = pd.read_csv(filename, float_precision='round_trip', keep_default_na=False,
+                                 dtype={"Title": str, "Size": str, "Gender": str})
+        else:
+            stored = pd.DataFrame(columns=OUTPUT_COLUMNS)
+        stored_hashes = stored[DEDUP_KEY].copy()
+        stored_hashes[HASH_COLUMN] = compute_row_hashes(stored) if not stored.empty else None
+
+        inserted, updated, deleted, report = compute_delta(new_df, stored_hashes)
+        if report["inserted"] or report["updated"] or report["deleted"]:
+            # Baris lama yang masih ada dan tidak berubah dipertahankan apa adanya
+            changed_keys = pd.concat([updated[DEDUP_KEY], deleted[DEDUP_KEY]])
+            kept = stored.merge(changed_keys, on=DEDUP_KEY, how="left", indicator=True)
+            kept = kept[kept["_merge"] == "left_only"][OUTPUT_COLUMNS]
+            result = pd.concat([kept, updated[OUTPUT_COLUMNS], inserted[OUTPUT_COLUMNS]], ignore_index=True)
+            result.to_csv(filename, index=False)
+        print(f"CSV {filename} incremental update: {format_delta_report(report)}")
+        return report
+    # Error Handling
+    except Exception as e:
+        print(f"Error saving to CSV: {e}")
+        return None
+
+# ===== Fungsi menyimpan ke Parquet / Arrow IPC =====
+def save_to_columnar(data, path, file_format='parquet', partition_by_date=False):
+    """Menyimpan data ke Parquet atau Arrow IPC dengan skema eksplisit.
+
+    Lihat utils.columnar.ColumnarSink; untuk mode streaming pakai sink
+    tersebut langsung dan panggil write_batch per batch.
+    """
+    from utils.columnar import ColumnarSink
+    try:
+        with ColumnarSink(path, file_format, partition_by_date) as sink:
+            sink.write_batch(data)
+        print(f"Data successfully saved to {path} ({file_format})")
+        return True
+    # Error Handling
+    except Exception as e:
+        print(f"Error saving to {file_format}: {e}")
+        return False
+
 # ===== Fungsi menampilkan sample data =====
 def display_sample(data, num_samples=5):
     """Menampilkan sample data tanpa kolom No."""
     if not data:
         print("No data to display")
         return
-    df = pd.DataFrame(data)
+    df = as_dataframe(data)
     print(f"\nSample of {num_samples} records:")
     print(df.head(num_samples))
 
 # ===== Fungsi menyimpan ke Google Sheets =====
-# Ambil nilai dari variabel lingkungan yang dimuat dari .env
-SERVICE_ACCOUNT_FILE = os.getenv('SERVICE_ACCOUNT_FILE')
 SCOPES = ['https://www.googleapis.com/auth/spreadsheets']
-SPREADSHEET_ID = os.getenv('SPREADSHEET_ID')
-RANGE_NAME = os.getenv('RANGE_NAME')
 
-def load_to_gsheet(data):
-    """Mengirim data ke Google Sheets."""
+def create_sheets_service(service_account_file):
+    """Membuat client Google Sheets v4 dari file service account."""
+    from google.oauth2.service_account import Credentials
+    from googleapiclient.discovery import build
+    credentials = Credentials.from_service_account_file(service_account_file, scopes=SCOPES)
+    return build('sheets', 'v4', credentials=credentials)
+
+def load_to_gsheet(data, append=False, snapshot_path=None, service=None, diff=True, spreadsheet_id=None,
+                   range_name=None):
+    """Mengirim data ke Google Sheets.
+
+    Baris dikirim dalam potongan batchUpdate dengan retry saat kena quota
+    (HTTP 429) atau error server. append=True menambahkan baris setelah data
+    yang sudah ada di RANGE_NAME. snapshot_path adalah salinan lokal isi
+    sheet yang diperbarui setiap write penuh (dan dihapus saat append);
+    dengan diff=True hanya baris yang berubah sejak snapshot tersebut yang
+    dikirim. service dapat diisi
+    dengan client Sheets lain (misalnya fake lokal untuk pengujian);
+    spreadsheet_id dan range_name menggantikan SPREADSHEET_ID dan RANGE_NAME
+    dari variabel lingkungan.
+    """
     try:
+        # Variabel lingkungan dibaca saat dipanggil; .env dimuat pada pemanggilan pertama
+        load_environment()
+        service_account_file = os.getenv('SERVICE_ACCOUNT_FILE')
+        spreadsheet_id = spreadsheet_id or os.getenv('SPREADSHEET_ID')
+        range_name = range_name or os.getenv('RANGE_NAME')
+
         # Periksa apakah variabel lingkungan berhasil dimuat
-        if not SERVICE_ACCOUNT_FILE or not SPREADSHEET_ID or not RANGE_NAME:
+        if not (service_account_file or service) or not spreadsheet_id or not range_name:
             raise ValueError("Google Sheets credentials (SERVICE_ACCOUNT_FILE, SPREADSHEET_ID, or RANGE_NAME) not found in environment variables.")
 
-        df = pd.DataFrame(data)
+        df = as_dataframe(data)
         values = df.values.tolist()
 
-        credentials = Credentials.from_service_account_file(
-            SERVICE_ACCOUNT_FILE,
-            scopes=SCOPES
-        )
-        service = build('sheets', 'v4', credentials=credentials)
-        sheet = service.spreadsheets()
-
-        body = {'values': values}
-        result = sheet.values().update(
-            spreadsheetId=SPREADSHEET_ID,
-            range=RANGE_NAME,
-            valueInputOption='RAW',
-            body=body
-        ).execute()
-
-        print(f"{result.get('updatedCells')} cells updated in Google Sheets.")
+        from utils.sheets import SheetsWriter
+        if service is None:
+            service = create_sheets_service(service_account_file)
+
+        writer = SheetsWriter(service, spreadsheet_id, range_name, snapshot_path=snapshot_path, diff=diff)
+        if append:
+            updated_cells = writer.append(values)
+        else:
+            updated_cells = writer.write(values)
+
+        print(f"{updated_cells} cells updated in Google Sheets ({writer.requests_sent} requests, {writer.retries} retries).")
         return True
     # Error Handling
     except Exception as e:
@@ -74,22 +159,187 @@ def load_to_gsheet(data):
         return False
 
 # ===== Fungsi menyimpan ke PostgreSQL =====
+# Engine di-cache per URL sehingga connection pool dipakai ulang antar pemanggilan
+_ENGINES = {}
+_ENGINES_LOCK = threading.Lock()
+COPY_CHUNK_ROWS = 50_000
+
+def get_engine(db_url, pool_size=5):
+    """Mengembalikan engine SQLAlchemy (dengan connection pool) yang dipakai bersama per URL."""
+    from sqlalchemy import create_engine
+    with _ENGINES_LOCK:
+        engine = _ENGINES.get(db_url)
+        if engine is None:
+            if db_url.startswith('sqlite'):
+                engine = create_engine(db_url)
+            else:
+                engine = create_engine(db_url, pool_size=pool_size, pool_pre_ping=True)
+            _ENGINES[db_url] = engine
+        return engine
+
+def _copy_dataframe(connection, df, table_name):
+    """Mengalirkan baris DataFrame ke tabel dengan COPY FROM STDIN (PostgreSQL).
+
+    Untuk database lain (misalnya SQLite sebagai pengganti lokal) dipakai
+    insert batch biasa melalui executemany.
+    """
+    if connection.dialect.name != 'postgresql':
+        df.to_sql(table_name, connection, index=False, if_exists='append', chunksize=COPY_CHUNK_ROWS)
+        return
+
+    quote = connection.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(column) for column in df.columns)
+    copy_sql = f"COPY {quote(table_name)} ({columns}) FROM STDIN WITH (FORMAT csv)"
+    cursor = connection.connection.dbapi_connection.cursor()
+    try:
+        if hasattr(cursor, 'copy_expert'):
+            # psycopg2: COPY per potongan baris agar buffer CSV tetap kecil
+            for start in range(0, len(df), COPY_CHUNK_ROWS):
+                buffer = io.StringIO()
+                df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(buffer, header=False, index=False)
+                buffer.seek(0)
+                cursor.copy_expert(copy_sql, buffer)
+        else:
+            # psycopg 3
+            with cursor.copy(copy_sql) as copy:
+                for start in range(0, len(df), COPY_CHUNK_ROWS):
+                    copy.write(df.iloc[start:start + COPY_CHUNK_ROWS].to_csv(header=False, index=False))
+    finally:
+        cursor.close()
+
+def bulk_load_dataframe(df, engine, table_name, if_exists='replace'):
+    """Memuat DataFrame secara bulk dalam satu transaksi.
+
+    if_exists='replace' mengisi tabel staging lalu menukarnya dengan tabel
+    tujuan secara atomik (DROP + RENAME dalam transaksi yang sama), sehingga
+    pembaca tidak pernah melihat tabel kosong atau setengah terisi.
+    if_exists='append' menambahkan baris langsung ke tabel tujuan.
+    """
+    from sqlalchemy import inspect, text
+    with engine.begin() as connection:
+        if if_exists == 'append' and inspect(connection).has_table(table_name):
+            _copy_dataframe(connection, df, table_name)
+            return
+
+        quote = connection.dialect.identifier_preparer.quote
+        staging_table = f"{table_name}_staging"
+        df.head(0).to_sql(staging_table, connection, index=False, if_exists='replace')
+        _copy_dataframe(connection, df, staging_table)
+        connection.execute(text(f"DROP TABLE IF EXISTS {quote(table_name)}"))
+        connection.execute(text(f"ALTER TABLE {quote(staging_table)} RENAME TO {quote(table_name)}"))
+
 # db_url sekarang opsional, akan diambil dari .env jika tidak disediakan
-def load_to_postgres(data, db_url=None, table_name='products'):
-    """Menyimpan data ke PostgreSQL database."""
+def load_to_postgres(data, db_url=None, table_name='products', if_exists='replace', bulk=True):
+    """Menyimpan data ke PostgreSQL database.
+
+    if_exists='append' menambahkan baris ke tabel yang sudah ada (mode streaming).
+    bulk=True memakai COPY + tabel staging (lihat bulk_load_dataframe);
+    bulk=False memakai df.to_sql seperti sebelumnya.
+    """
     # Jika db_url tidak diberikan secara eksplisit, coba ambil dari variabel lingkungan
     if db_url is None:
+        load_environment()
         db_url = os.getenv('POSTGRES_DB_URL')
         if db_url is None:
             raise ValueError("PostgreSQL database URL not provided and not found in environment variables.")
 
     try:
-        df = pd.DataFrame(data)
-        engine = create_engine(db_url)
-        df.to_sql(table_name, engine, index=False, if_exists='replace')
+        df = as_dataframe(data)
+        engine = get_engine(db_url)
+        if bulk:
+            bulk_load_dataframe(df, engine, table_name, if_exists)
+        else:
+            df.to_sql(table_name, engine, index=False, if_exists=if_exists)
         print(f"Data successfully saved to PostgreSQL table '{table_name}'")
         return True
     # Error Handling
     except Exception as e:
         print(f"Error saving to PostgreSQL: {e}")
-        return False
\ No newline at end of file
+        return False
+
+def _keyed_products_table(table_name):
+    """Definisi tabel produk dengan primary key (Title, Price, Size) dan kolom hash isi."""
+    from sqlalchemy import MetaData, Table, Column, Float, Integer, Text, PrimaryKeyConstraint
+    return Table(
+        table_name, MetaData(),
+        Column("Title", Text, nullable=False),
+        Column("Price", Float, nullable=False),
+        Column("Rating", Float),
+        Column("Colors", Integer),
+        Column("Size", Text, nullable=False),
+        Column("Gender", Text),
+        Column("Timestamp", Text),
+        Column(HASH_COLUMN, Text),
+        PrimaryKeyConstraint(*DEDUP_KEY),
+    )
+
+def _ensure_keyed_table(connection, table):
+    """Membuat tabel ber-key jika belum ada; tabel lama tanpa row_hash dibuat ulang."""
+    from sqlalchemy import inspect
+    inspector = inspect(connection)
+    if inspector.has_table(table.name):
+        columns = {column["name"] for column in inspector.get_columns(table.name)}
+        if HASH_COLUMN in columns:
+            return
+        print(f"Table '{table.name}' has no {HASH_COLUMN} column, rebuilding it for incremental loads")
+        table.drop(connection)
+    table.create(connection)
+
+def upsert_to_postgres(data, db_url=None, table_name='products', chunk_size=5000):
+    """Memuat data secara incremental (delta) ke PostgreSQL.
+
+    Hanya baris baru dan berubah yang ditulis dengan INSERT ... ON CONFLICT
+    (Title, Price, Size) DO UPDATE, dan baris yang sudah tidak ada dihapus.
+    Mengembalikan laporan jumlah baris unchanged/inserted/updated/deleted,
+    atau None jika gagal.
+    """
+    if db_url is None:
+        load_environment()
+        db_url = os.getenv('POSTGRES_DB_URL')
+        if db_url is None:
+            raise ValueError("PostgreSQL database URL not provided and not found in environment variables.")
+
+    from sqlalchemy import and_, bindparam
+    from sqlalchemy.dialects import postgresql, sqlite
+    try:
+        new_df = as_dataframe(data, columns=OUTPUT_COLUMNS)
+        engine = get_engine(db_url)
+        table = _keyed_products_table(table_name)
+        dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(engine.dialect.name)
+        if dialect is None:
+            raise ValueError(f"Incremental load is not supported for dialect '{engine.dialect.name}'")
+
+        with engine.begin() as connection:
+            _ensure_keyed_table(connection, table)
+            key_columns = [table.c[column] for column in DEDUP_KEY]
+            stored = pd.read_sql(
+                table.select().with_only_columns(*key_columns, table.c[HASH_COLUMN]), connection
+            )
+            inserted, updated, deleted, report = compute_delta(new_df, stored)
+
+            changed = pd.concat([inserted, updated], ignore_index=True)
+            if not changed.empty:
+                statement = dialect.insert(table)
+                statement = statement.on_conflict_do_update(
+                    index_elements=DEDUP_KEY,
+                    set_={column: statement.excluded[column]
+                          for column in OUTPUT_COLUMNS + [HASH_COLUMN] if column not in DEDUP_KEY},
+                )
+                records = changed.astype(object).where(changed.notna(), None).to_dict(orient="records")
+                for start in range(0, len(records), chunk_size):
+                    connection.execute(statement, records[start:start + chunk_size])
+
+            if not deleted.empty:
+                statement = table.delete().where(and_(
+                    *(table.c[column] == bindparam(f"key_{column}") for column in DEDUP_KEY)
+                ))
+                keys = [{f"key_{column}": row[column] for column in DEDUP_KEY}
+                        for row in deleted.to_dict(orient="records")]
+                connection.execute(statement, keys)
+
+        print(f"PostgreSQL table '{table_name}' incremental load: {format_delta_report(report)}")
+        return report
+    # Error Handling
+    except Exception as e:
+        print(f"Error saving to PostgreSQL: {e}")
+        return None
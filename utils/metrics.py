@@ -0,0 +1,269 @@
+# utils/metrics.py
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+
+# resource hanya tersedia di Unix; tanpa modul ini peak memory dilaporkan None
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None
+
+METRIC_PREFIX = "etl"
+# Jumlah baris pada laporan delta sink incremental (utils.delta.compute_delta)
+DELTA_COUNTS = ("unchanged", "inserted", "updated", "deleted")
+
+def peak_memory_bytes():
+    """Peak resident memory proses ini dalam byte, atau None jika tidak didukung."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan kilobyte, macOS byte
+    return peak if sys.platform == "darwin" else peak * 1024
+
+class RunMetrics:
+    """Mengumpulkan metrik satu run ETL: waktu per tahap, counter dan status HTTP.
+
+    Tahap diukur dengan stage() (wall dan CPU time proses) atau add_time()
+    untuk durasi yang diukur di tempat lain (misalnya latensi request atau
+    parsing di proses worker). Tahap yang bersarang di dalam stage() lain
+    tidak ikut dihitung pada tahap luarnya (waktu eksklusif). Semua method
+    aman dipanggil dari banyak thread. CPU time adalah milik proses utama;
+    CPU proses parse worker tidak ikut. profiler (utils.profiling.StageProfiler)
+    ikut memprofil setiap stage(); tanpa profiler tidak ada biaya tambahan.
+    """
+
+    def __init__(self, profiler=None):
+        self.profiler = profiler
+        self.started_at = datetime.now().isoformat()
+        self._started = time.perf_counter()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stages = {}
+        self.counters = Counter()
+        self.http_status = Counter()
+        self.gauges = {}
+        self.sinks = {}
+
+    def _stage(self, name):
+        return self.stages.setdefault(name, {"wall_seconds": 0.0, "cpu_seconds": 0.0, "calls": 0})
+
+    def add_time(self, name, wall_seconds, cpu_seconds=0.0):
+        """Menambahkan durasi ke tahap name."""
+        with self._lock:
+            stage = self._stage(name)
+            stage["wall_seconds"] += wall_seconds
+            stage["cpu_seconds"] += cpu_seconds
+            stage["calls"] += 1
+
+    @contextmanager
+    def stage(self, name):
+        """Context manager yang mengukur wall dan CPU time blok sebagai tahap name."""
+        # Setiap entri stack: [wall, cpu] milik tahap anak yang harus dikurangkan
+        stack = self._local.__dict__.setdefault("stack", [])
+        children = [0.0, 0.0]
+        stack.append(children)
+        profile = self.profiler.profile(name) if self.profiler is not None else nullcontext()
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            with profile:
+                yield self
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            stack.pop()
+            if stack:
+                stack[-1][0] += wall
+                stack[-1][1] += cpu
+            self.add_time(name, wall - children[0], cpu - children[1])
+
+    def timed_iter(self, name, iterable):
+        """Generator pembungkus yang menghitung waktu menunggu next() sebagai tahap name.
+
+        Dipakai pada mode streaming, di mana extract dan transform berjalan
+        bergantian per batch sehingga tidak bisa dibungkus satu blok.
+        """
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                item = next(iterator, StopIteration)
+            if item is StopIteration:
+                return
+            yield item
+
+    def increment(self, name, amount=1):
+        with self._lock:
+            self.counters[name] += amount
+
+    def set_gauge(self, name, value):
+        """Menyimpan nilai terakhir name, misalnya concurrency scheduler."""
+        with self._lock:
+            self.gauges[name] = value
+
+    def record_response(self, response, *args, **kwargs):
+        """Hook response requests: status HTTP, byte yang diterima dan latensi fetch."""
+        with self._lock:
+            self.http_status[response.status_code] += 1
+            self.counters["bytes_fetched"] += len(response.content or b"")
+        self.add_time("fetch", response.elapsed.total_seconds())
+
+    def attach_session(self, session):
+        """Memasang record_response pada session requests (sekali per session)."""
+        hooks = session.hooks.setdefault("response", [])
+        if self.record_response not in hooks:
+            hooks.append(self.record_response)
+        return session
+
+    def record_sinks(self, results):
+        """Mengakumulasi hasil LoadOrchestrator.run per sink.
+
+        Jika value sink berupa laporan delta (load incremental), jumlah baris
+        DELTA_COUNTS ikut diakumulasi sebagai delta sink tersebut.
+        """
+        with self._lock:
+            for result in results:
+                sink = self.sinks.setdefault(result["sink"], {"seconds": 0.0, "runs": 0, "statuses": Counter(),
+                                                              "delta": Counter()})
+                sink["seconds"] += result["seconds"]
+                sink["runs"] += 1
+                sink["statuses"][result["status"]] += 1
+                value = result.get("value")
+                if isinstance(value, dict):
+                    sink["delta"].update({key: value[key] for key in DELTA_COUNTS if key in value})
+
+    def incomplete_sinks(self):
+        """Sink yang tidak berstatus ok di semua load-nya (gagal, timeout atau skipped di suatu batch).
+
+        Pada mode streaming tujuan sink tersebut hanya berisi sebagian data.
+        """
+        with self._lock:
+            return self._incomplete_sinks()
+
+    def _incomplete_sinks(self):
+        return {name: {status: count for status, count in sink["statuses"].items() if status != "ok"}
+                for name, sink in self.sinks.items() if set(sink["statuses"]) - {"ok"}}
+
+    def _rate(self, counter, stage):
+        seconds = self.stages.get(stage, {}).get("wall_seconds", 0.0)
+        return self.counters[counter] / seconds if seconds > 0 else None
+
+    def report(self):
+        """Laporan run sebagai dict yang siap ditulis ke JSON."""
+        with self._lock:
+            return {
+                "started_at": self.started_at,
+                "wall_seconds": time.perf_counter() - self._started,
+                "stages": {name: dict(stage) for name, stage in self.stages.items()},
+                "counters": dict(self.counters),
+                "rates": {
+                    "pages_per_second": self._rate("pages", "extract"),
+                    "cards_per_second": self._rate("cards", "extract"),
+                    "rows_per_second": self._rate("rows_transformed", "transform"),
+                },
+                "http_status": {str(status): count for status, count in sorted(self.http_status.items())},
+                "gauges": dict(self.gauges),
+                "sinks": {
+                    name: {"seconds": sink["seconds"], "runs": sink["runs"], "statuses": dict(sink["statuses"]),
+                           **({"delta": dict(sink["delta"])} if sink["delta"] else {})}
+                    for name, sink in self.sinks.items()
+                },
+                "incomplete_sinks": self._incomplete_sinks(),
+                "peak_memory_bytes": peak_memory_bytes(),
+            }
+
+    def write_json(self, path):
+        """Menulis report() ke file JSON."""
+        _write_atomic(path, json.dumps(self.report(), indent=2))
+
+    def write_prometheus(self, path):
+        """Menulis metrik dalam format teks Prometheus untuk textfile collector node exporter.
+
+        File ditulis ke file sementara lalu di-rename agar collector tidak
+        pernah membaca file setengah jadi.
+        """
+        _write_atomic(path, format_prometheus(self.report()))
+
+    def format_summary(self):
+        """Ringkasan singkat untuk dicetak di akhir run."""
+        report = self.report()
+        lines = ["Run metrics:"]
+        for name, stage in report["stages"].items():
+            lines.append(f"  {name:<10} wall {stage['wall_seconds']:8.2f}s  cpu {stage['cpu_seconds']:8.2f}s  "
+                         f"calls {stage['calls']}")
+        for name, rate in report["rates"].items():
+            if rate is not None:
+                lines.append(f"  {name:<18} {rate:,.1f}")
+        if report["http_status"]:
+            lines.append(f"  http_status        {report['http_status']}")
+        lines.append(f"  bytes_fetched      {report['counters'].get('bytes_fetched', 0):,}")
+        for name, value in report["gauges"].items():
+            lines.append(f"  {name:<18} {value:,.2f}")
+        for name, sink in report["sinks"].items():
+            if "delta" in sink:
+                delta = ", ".join(f"{key}={sink['delta'].get(key, 0)}" for key in DELTA_COUNTS)
+                lines.append(f"  delta sink         {name} {delta}")
+        for name, statuses in report["incomplete_sinks"].items():
+            lines.append(f"  INCOMPLETE sink    {name} {statuses}")
+        if report["peak_memory_bytes"] is not None:
+            lines.append(f"  peak_memory        {report['peak_memory_bytes'] / 2**20:,.1f} MiB")
+        return "\n".join(lines)
+
+def _write_atomic(path, text):
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as file:
+        file.write(text)
+    os.replace(temporary, path)
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def format_prometheus(report):
+    """Mengubah report() menjadi teks format eksposisi Prometheus."""
+    samples = []
+
+    def metric(name, help_text, values):
+        full_name = f"{METRIC_PREFIX}_{name}"
+        samples.append(f"# HELP {full_name} {help_text}")
+        samples.append(f"# TYPE {full_name} gauge")
+        for labels, value in values:
+            label_text = ",".join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            samples.append(f"{full_name}{{{label_text}}} {float(value)!r}" if label_text
+                           else f"{full_name} {float(value)!r}")
+
+    stages = report["stages"]
+    metric("stage_wall_seconds", "Wall time per ETL stage in the last run.",
+           [({"stage": name}, stage["wall_seconds"]) for name, stage in stages.items()])
+    metric("stage_cpu_seconds", "CPU time of the main process per ETL stage in the last run.",
+           [({"stage": name}, stage["cpu_seconds"]) for name, stage in stages.items()])
+    metric("stage_calls", "Number of timed calls per ETL stage in the last run.",
+           [({"stage": name}, stage["calls"]) for name, stage in stages.items()])
+    metric("items", "Items processed in the last run by kind.",
+           [({"kind": name}, value) for name, value in sorted(report["counters"].items())])
+    metric("rate_per_second", "Throughput of the last run.",
+           [({"kind": name}, value) for name, value in report["rates"].items() if value is not None])
+    metric("http_responses", "HTTP responses received in the last run by status code.",
+           [({"code": code}, count) for code, count in report["http_status"].items()])
+    metric("gauge", "Last value of run gauges such as the adaptive scheduler state.",
+           [({"name": name}, value) for name, value in sorted(report["gauges"].items())])
+    metric("sink_seconds", "Total load time per sink in the last run.",
+           [({"sink": name}, sink["seconds"]) for name, sink in report["sinks"].items()])
+    metric("sink_loads", "Load attempts per sink and status in the last run.",
+           [({"sink": name, "status": status}, count)
+            for name, sink in report["sinks"].items() for status, count in sink["statuses"].items()])
+    metric("sink_rows", "Rows written per sink by delta kind in the last run (incremental loads).",
+           [({"sink": name, "kind": kind}, count)
+            for name, sink in report["sinks"].items() for kind, count in sink.get("delta", {}).items()])
+    metric("sink_complete", "1 if every load of the sink in the last run succeeded, 0 if its data is partial.",
+           [({"sink": name}, set(sink["statuses"]) <= {"ok"}) for name, sink in report["sinks"].items()])
+    metric("run_wall_seconds", "Total wall time of the last run.", [({}, report["wall_seconds"])])
+    if report["peak_memory_bytes"] is not None:
+        metric("peak_memory_bytes", "Peak resident memory of the last run.", [({}, report["peak_memory_bytes"])])
+    metric("last_run_timestamp_seconds", "Unix time when the last run report was written.", [({}, time.time())])
+    return "\n".join(samples) + "\n"
@@ -0,0 +1,154 @@
+# utils/orchestrator.py
+
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+# Status hasil per sink
+OK = "ok"
+FAILED = "failed"
+TIMEOUT = "timeout"
+SKIPPED = "skipped"
+
+class LoadOrchestrator:
+    """Menjalankan beberapa sink (CSV, Google Sheets, PostgreSQL, ...) secara bersamaan.
+
+    Setiap sink berjalan di thread sendiri pada batch yang sama, sehingga
+    total waktu load mendekati sink paling lambat, bukan jumlah semuanya.
+    Sink yang gagal (exception atau mengembalikan False/None) tidak
+    menghentikan sink lain. Sink yang melewati timeout dilaporkan sebagai
+    timeout; thread-nya tidak bisa dihentikan paksa, jadi sink tersebut
+    dilewati (skipped) pada batch berikutnya selama masih berjalan dan
+    ditinggalkan saat close. Thread sink adalah daemon thread sehingga sink
+    yang macet tidak menahan proses keluar. sequential=True menjalankan sink
+    satu per satu di thread pemanggil (dipakai --profile agar cProfile melihat
+    kode sink); timeout tidak berlaku pada mode ini.
+    """
+
+    def __init__(self, timeouts=None, default_timeout=None, sequential=False):
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = default_timeout
+        self.sequential = sequential
+        self._running = {}
+        # Sink yang timeout dan pemanggilannya belum selesai
+        self._timed_out = set()
+
+    def timeout_for(self, name):
+        return self.timeouts.get(name, self.default_timeout)
+
+    def run(self, sinks):
+        """Menjalankan sinks ({nama: callable tanpa argumen}) dan menunggu hasilnya.
+
+        Mengembalikan list dict per sink berisi sink, status, seconds, error
+        dan value (nilai kembalian sink yang berhasil, misalnya laporan delta
+        unchanged/inserted/updated/deleted), dengan urutan sama seperti sinks.
+        """
+        if self.sequential:
+            return [self._run_inline(name, load) for name, load in sinks.items()]
+
+        started = time.monotonic()
+        futures = {}
+        results = {}
+        for name, load in sinks.items():
+            previous = self._running.get(name)
+            if previous is not None and not previous.done():
+                results[name] = _result(name, SKIPPED, 0.0, "previous load still running")
+                continue
+            self._timed_out.discard(name)
+            futures[name] = self._running[name] = _start_thread(name, load)
+
+        for name, future in futures.items():
+            timeout = self.timeout_for(name)
+            remaining = None if timeout is None else max(0.0, started + timeout - time.monotonic())
+            try:
+                seconds, value = future.result(timeout=remaining)
+            # Error Handling
+            except FutureTimeoutError:
+                self._timed_out.add(name)
+                results[name] = _result(name, TIMEOUT, time.monotonic() - started,
+                                        f"no result after {timeout}s")
+                print(f"Sink '{name}' timed out after {timeout}s")
+                continue
+            except Exception as e:
+                results[name] = _failed(name, e)
+                continue
+            results[name] = _finished(name, seconds, value)
+
+        return [results[name] for name in sinks]
+
+    def _run_inline(self, name, load):
+        """Menjalankan satu sink di thread pemanggil dan mengembalikan hasilnya."""
+        try:
+            seconds, value = _timed_call(load)
+        # Error Handling
+        except Exception as e:
+            return _failed(name, e)
+        return _finished(name, seconds, value)
+
+    def abandoned(self):
+        """Nama sink yang timeout dan masih berjalan (tidak ditunggu oleh close)."""
+        return {name for name in self._timed_out if not self._running[name].done()}
+
+    def close(self, wait=True):
+        """Menunggu sink yang masih berjalan jika wait; sink yang timeout selalu ditinggalkan."""
+        if not wait:
+            return
+        for name, future in self._running.items():
+            if name not in self._timed_out:
+                # Error Handling: kegagalan sudah dilaporkan oleh run
+                future.exception()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(wait=False)
+
+def _start_thread(name, load):
+    """Menjalankan _timed_call(load) di daemon thread dan mengembalikan Future hasilnya."""
+    future = Future()
+
+    def target():
+        try:
+            future.set_result(_timed_call(load))
+        except Exception as e:
+            future.set_exception(e)
+    threading.Thread(target=target, name=f"sink-{name}", daemon=True).start()
+    return future
+
+def _timed_call(load):
+    """Memanggil sink dan mengembalikan (durasi detik, nilai kembalian)."""
+    start = time.perf_counter()
+    try:
+        value = load()
+    except Exception as e:
+        e.seconds = time.perf_counter() - start
+        raise
+    return time.perf_counter() - start, value
+
+def _failed(name, error):
+    print(f"Sink '{name}' failed: {error}")
+    return _result(name, FAILED, getattr(error, "seconds", 0.0), str(error))
+
+def _finished(name, seconds, value):
+    """Hasil sink yang selesai; False/None dari sink berarti gagal."""
+    if value is False or value is None:
+        return _result(name, FAILED, seconds, "sink reported failure")
+    return _result(name, OK, seconds, value=value)
+
+def _result(name, status, seconds, error=None, value=None):
+    return {"sink": name, "status": status, "seconds": seconds, "error": error, "value": value}
+
+def format_load_summary(results):
+    """Ringkasan latensi dan status per sink dalam beberapa baris teks."""
+    lines = ["Load summary:"]
+    for result in results:
+        line = f"  {result['sink']:<10} {result['status']:<8} {result['seconds']:7.2f}s"
+        if result["error"]:
+            line += f"  ({result['error']})"
+        lines.append(line)
+    ok = sum(result["status"] == OK for result in results)
+    seconds = [result["seconds"] for result in results]
+    lines.append(f"  {ok}/{len(results)} sinks succeeded; slowest {max(seconds, default=0.0):.2f}s, "
+                 f"sequential total would be {sum(seconds):.2f}s")
+    return "\n".join(lines)
@@ -0,0 +1,103 @@
+# utils/profiling.py
+
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+TOP_ALLOCATIONS = 25
+TOP_FUNCTIONS = 40
+# Kedalaman traceback tracemalloc; 1 frame cukup untuk agregasi per baris
+TRACEMALLOC_FRAMES = 1
+
+class StageProfiler:
+    """Profil cProfile dan tracemalloc per tahap ETL (opt-in lewat --profile).
+
+    Setiap tahap mendapat satu cProfile.Profile yang diaktifkan ulang setiap
+    kali tahap berjalan, sehingga mode streaming menghasilkan satu profil
+    gabungan per tahap. Tahap bersarang menjeda profil tahap luarnya.
+    Alokasi dicatat sebagai selisih snapshot tracemalloc di awal dan akhir
+    tahap, diakumulasi per baris kode. close() menulis ke output_dir:
+    <tahap>.prof (snakeviz, flameprof, pstats), <tahap>.txt (fungsi teratas
+    menurut cumulative time) dan <tahap>.alloc.txt (alokasi teratas).
+    Hanya thread pemanggil yang terprofil; thread fetch dan proses parse
+    worker tidak ikut. Karena itu --profile menjalankan sink satu per satu
+    di thread utama, masing-masing sebagai tahap load_<nama> (lihat wrap).
+    """
+
+    def __init__(self, output_dir="profiles", trace_memory=True):
+        self.output_dir = output_dir
+        self.trace_memory = trace_memory
+        self.profiles = {}
+        self.allocations = {}
+        self._stack = []
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start(TRACEMALLOC_FRAMES)
+
+    @contextmanager
+    def profile(self, name):
+        """Context manager yang memprofil blok sebagai tahap name."""
+        profile = self.profiles.setdefault(name, cProfile.Profile())
+        if self._stack:
+            self._stack[-1].disable()
+        self._stack.append(profile)
+        before = tracemalloc.take_snapshot() if self.trace_memory else None
+        profile.enable()
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            self._stack.pop()
+            if before is not None:
+                self._add_allocations(name, tracemalloc.take_snapshot().compare_to(before, "lineno"))
+            if self._stack:
+                self._stack[-1].enable()
+
+    def wrap(self, name, func):
+        """Callable yang memanggil func() di dalam profile(name)."""
+        def profiled():
+            with self.profile(name):
+                return func()
+        return profiled
+
+    def _add_allocations(self, name, differences):
+        totals = self.allocations.setdefault(name, {})
+        for difference in differences:
+            if difference.size_diff <= 0:
+                continue
+            key = str(difference.traceback)
+            size, count = totals.get(key, (0, 0))
+            totals[key] = (size + difference.size_diff, count + difference.count_diff)
+
+    def close(self):
+        """Menulis semua profil ke output_dir; mengembalikan daftar file yang ditulis."""
+        if self.trace_memory and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        if not self.profiles:
+            return []
+        os.makedirs(self.output_dir, exist_ok=True)
+        written = []
+        for name, profile in self.profiles.items():
+            base = os.path.join(self.output_dir, name)
+            profile.dump_stats(f"{base}.prof")
+            stream = io.StringIO()
+            pstats.Stats(profile, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+            with open(f"{base}.txt", "w", encoding="utf-8") as file:
+                file.write(stream.getvalue())
+            written += [f"{base}.prof", f"{base}.txt"]
+            if name in self.allocations:
+                with open(f"{base}.alloc.txt", "w", encoding="utf-8") as file:
+                    file.write(format_allocations(self.allocations[name]))
+                written.append(f"{base}.alloc.txt")
+        print(f"Profiles written to {self.output_dir}/ (open *.prof with snakeviz or flameprof)")
+        return written
+
+def format_allocations(totals, limit=TOP_ALLOCATIONS):
+    """Tabel alokasi teratas (byte bersih yang bertambah) per baris kode."""
+    lines = [f"{'KiB':>12} {'blocks':>10}  location"]
+    top = sorted(totals.items(), key=lambda item: item[1][0], reverse=True)[:limit]
+    for location, (size, count) in top:
+        lines.append(f"{size / 1024:12,.1f} {count:10,}  {location}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,166 @@
+# utils/scheduler.py
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+# Status yang berarti server kewalahan: AIMD menurunkan laju
+THROTTLE_STATUSES = (429, 500, 502, 503, 504)
+# Status yang halamannya dicoba ulang oleh scheduler setelah menunggu
+RETRYABLE_STATUSES = (429, 503)
+# Toleransi pembulatan float saat token diisi ulang tepat satu
+TOKEN_EPSILON = 1e-9
+
+def parse_retry_after(value, now=None):
+    """Mengubah header Retry-After (detik atau HTTP-date) menjadi jumlah detik, atau None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (moment - now).total_seconds())
+
+class AdaptiveScheduler:
+    """Penjadwal request adaptif: token bucket + concurrency AIMD.
+
+    Laju request dibatasi token bucket (rate token/detik, burst satu detik)
+    dan jumlah request yang berjalan bersamaan dibatasi concurrency. Setiap
+    `concurrency` respons sukses dengan latensi di bawah target_latency,
+    concurrency naik 1 dan rate naik rate_step (additive increase). Respons
+    429/5xx (termasuk yang sudah di-retry urllib3) atau error koneksi
+    membagi dua keduanya (multiplicative decrease), paling sering sekali per
+    target_latency agar satu gelombang error tidak menurunkan berkali-kali.
+    Retry-After menahan semua worker sampai waktunya lewat. Keputusan
+    dicatat di decisions dan, jika ada, di metrics (utils.metrics.RunMetrics).
+    """
+
+    def __init__(self, rate=5.0, min_rate=0.5, max_rate=50.0, concurrency=2, max_concurrency=16,
+                 target_latency=1.0, rate_step=0.5, max_attempts=4, metrics=None,
+                 clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.concurrency = concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.rate_step = rate_step
+        self.max_attempts = max_attempts
+        self.metrics = metrics
+        self.decisions = []
+        self._clock = clock
+        self._sleep = sleep
+        self._condition = threading.Condition()
+        self._in_flight = 0
+        self._successes = 0
+        self._tokens = 1.0
+        self._refilled_at = clock()
+        self._blocked_until = 0.0
+        self._last_decrease = None
+        self._local = threading.local()
+        self._update_gauges()
+
+    def attach_session(self, session):
+        """Memasang hook agar scheduler melihat respons terakhir setiap thread."""
+        hooks = session.hooks.setdefault("response", [])
+        if self._remember_response not in hooks:
+            hooks.append(self._remember_response)
+        return session
+
+    def _remember_response(self, response, *args, **kwargs):
+        self._local.response = response
+
+    def acquire(self):
+        """Menunggu slot concurrency dan token sebelum mengirim request."""
+        with self._condition:
+            while self._in_flight >= self.concurrency:
+                self._condition.wait()
+            self._in_flight += 1
+        self._local.response = None
+        while True:
+            with self._condition:
+                now = self._clock()
+                self._tokens = min(max(1.0, self.rate), self._tokens + (now - self._refilled_at) * self.rate)
+                self._refilled_at = now
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                elif self._tokens >= 1.0 - TOKEN_EPSILON:
+                    self._tokens -= 1.0
+                    return
+                else:
+                    delay = (1.0 - self._tokens) / self.rate
+            self._sleep(delay)
+
+    def release(self, latency):
+        """Mencatat hasil request thread ini dan menyesuaikan laju.
+
+        Mengembalikan True jika server meminta request diulang (429/503),
+        setelah jeda Retry-After (jika ada) dipasang untuk semua worker.
+        """
+        response = getattr(self._local, "response", None)
+        status = response.status_code if response is not None else None
+        history = _retry_history_statuses(response)
+        with self._condition:
+            self._in_flight -= 1
+            if status is None or status in THROTTLE_STATUSES or any(s in THROTTLE_STATUSES for s in history):
+                reason = f"status {status}" if status is not None else "connection error"
+                if status not in THROTTLE_STATUSES and history:
+                    reason = f"retried status {history[-1]}"
+                self._decrease(reason)
+                retry_after = parse_retry_after(response.headers.get("Retry-After")) if response is not None else None
+                if retry_after:
+                    self._blocked_until = max(self._blocked_until, self._clock() + retry_after)
+                    self._record("retry_after", f"waiting {retry_after:.1f}s")
+            elif status < 400 and latency <= self.target_latency:
+                self._successes += 1
+                if self._successes >= self.concurrency:
+                    self._increase()
+            else:
+                # Server lambat tetapi tidak error: tahan laju sekarang
+                self._successes = 0
+            self._condition.notify_all()
+        return status in RETRYABLE_STATUSES
+
+    def _increase(self):
+        self._successes = 0
+        if self.concurrency >= self.max_concurrency and self.rate >= self.max_rate:
+            return
+        self.concurrency = min(self.max_concurrency, self.concurrency + 1)
+        self.rate = min(self.max_rate, self.rate + self.rate_step)
+        self._record("increase", "latency under target")
+
+    def _decrease(self, reason):
+        self._successes = 0
+        now = self._clock()
+        if self._last_decrease is not None and now - self._last_decrease < self.target_latency:
+            return
+        self._last_decrease = now
+        self.concurrency = max(1, self.concurrency // 2)
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._record("decrease", reason)
+        print(f"Server throttling ({reason}): concurrency -> {self.concurrency}, rate -> {self.rate:.2f} req/s")
+
+    def _record(self, action, reason):
+        self.decisions.append({
+            "time": self._clock(), "action": action, "reason": reason,
+            "concurrency": self.concurrency, "rate": self.rate,
+        })
+        if self.metrics is not None:
+            self.metrics.increment(f"scheduler_{action}")
+        self._update_gauges()
+
+    def _update_gauges(self):
+        if self.metrics is not None:
+            self.metrics.set_gauge("scheduler_concurrency", self.concurrency)
+            self.metrics.set_gauge("scheduler_rate_per_second", self.rate)
+
+def _retry_history_statuses(response):
+    """Status respons yang sudah di-retry urllib3 sebelum respons akhir."""
+    retries = getattr(getattr(response, "raw", None), "retries", None)
+    history = getattr(retries, "history", None) or ()
+    return [entry.status for entry in history if entry.status is not None]
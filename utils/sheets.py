@@ -0,0 +1,192 @@
+# utils/sheets.py
+
+import json
+import os
+import random
+import re
+import time
+from googleapiclient.errors import HttpError
+
+# Status dari Sheets API yang layak dicoba ulang (quota/throttling dan error sementara)
+RETRYABLE_STATUSES = (429, 500, 502, 503, 504)
+CELL_PATTERN = re.compile(r"^([A-Za-z]*)(\d*)")
+SINGLE_CELL = re.compile(r"[A-Za-z]{1,3}\d+(:[A-Za-z]{1,3}\d*)?")
+
+def split_range(range_name):
+    """Memecah range A1 menjadi (nama sheet, kolom awal, baris awal).
+
+    Contoh: "Sheet1!B2:H" -> ("Sheet1", "B", 2), "Sheet1" -> ("Sheet1", "A", 1).
+    """
+    sheet, _, cells = range_name.rpartition("!")
+    if not sheet and not SINGLE_CELL.fullmatch(cells):
+        # Range tanpa "!" yang bukan notasi sel dianggap nama sheet
+        sheet, cells = cells, ""
+    start = cells.split(":")[0]
+    column, row = CELL_PATTERN.match(start).groups()
+    return sheet, (column or "A").upper(), int(row or 1)
+
+def changed_row_runs(old_values, new_values):
+    """Mengembalikan list (offset awal, offset akhir eksklusif) baris yang berubah."""
+    runs = []
+    start = None
+    for offset, row in enumerate(new_values):
+        changed = offset >= len(old_values) or old_values[offset] != row
+        if changed and start is None:
+            start = offset
+        elif not changed and start is not None:
+            runs.append((start, offset))
+            start = None
+    if start is not None:
+        runs.append((start, len(new_values)))
+    return runs
+
+def column_letter(index):
+    """Mengubah indeks kolom berbasis 1 menjadi huruf kolom (1 -> A, 27 -> AA)."""
+    letters = ""
+    while index > 0:
+        index, remainder = divmod(index - 1, 26)
+        letters = chr(ord("A") + remainder) + letters
+    return letters
+
+def column_index(letters):
+    """Kebalikan column_letter (A -> 1, AA -> 27)."""
+    index = 0
+    for letter in letters.upper():
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index
+
+class SheetsWriter:
+    """Menulis baris ke Google Sheets dalam potongan batchUpdate dengan retry.
+
+    rows_per_range membatasi jumlah baris per range, ranges_per_request
+    membatasi jumlah range dalam satu panggilan batchUpdate. snapshot_path
+    adalah salinan lokal (JSON) isi sheet setelah push terakhir; setiap
+    write() memperbaruinya dan append() menghapusnya. Dengan diff=True
+    hanya baris yang berubah sejak snapshot yang dikirim, dengan
+    diff=False semua baris dikirim ulang.
+    """
+
+    def __init__(self, service, spreadsheet_id, range_name, rows_per_range=500, ranges_per_request=10,
+                 max_retries=5, backoff_factor=1.0, backoff_max=64, snapshot_path=None, diff=True,
+                 sleep=time.sleep):
+        self.values_api = service.spreadsheets().values()
+        self.spreadsheet_id = spreadsheet_id
+        self.range_name = range_name
+        self.sheet, self.start_column, self.start_row = split_range(range_name)
+        self.rows_per_range = rows_per_range
+        self.ranges_per_request = ranges_per_request
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.backoff_max = backoff_max
+        self.snapshot_path = snapshot_path
+        self.diff = diff
+        self.sleep = sleep
+        self.requests_sent = 0
+        self.retries = 0
+
+    def _cell(self, offset):
+        prefix = f"{self.sheet}!" if self.sheet else ""
+        return f"{prefix}{self.start_column}{self.start_row + offset}"
+
+    def _execute(self, request):
+        """Menjalankan request dengan exponential backoff pada 429/5xx."""
+        for attempt in range(self.max_retries + 1):
+            try:
+                self.requests_sent += 1
+                return request.execute()
+            except HttpError as e:
+                status = int(getattr(e.resp, "status", 0))
+                if status not in RETRYABLE_STATUSES or attempt == self.max_retries:
+                    raise
+                retry_after = e.resp.get("retry-after") if hasattr(e.resp, "get") else None
+                if retry_after and str(retry_after).isdigit():
+                    delay = float(retry_after)
+                else:
+                    delay = min(self.backoff_max, self.backoff_factor * (2 ** attempt))
+                    delay += random.uniform(0, delay / 2)
+                self.retries += 1
+                print(f"Google Sheets API returned {status}, retrying in {delay:.1f}s...")
+                self.sleep(delay)
+
+    def _batch_update(self, data):
+        updated_cells = 0
+        for start in range(0, len(data), self.ranges_per_request):
+            body = {"valueInputOption": "RAW", "data": data[start:start + self.ranges_per_request]}
+            result = self._execute(self.values_api.batchUpdate(spreadsheetId=self.spreadsheet_id, body=body))
+            updated_cells += result.get("totalUpdatedCells", 0)
+        return updated_cells
+
+    def _ranges_for(self, values, runs):
+        """Memecah setiap run baris menjadi range berukuran paling banyak rows_per_range."""
+        data = []
+        for run_start, run_end in runs:
+            for start in range(run_start, run_end, self.rows_per_range):
+                end = min(start + self.rows_per_range, run_end)
+                data.append({"range": self._cell(start), "values": values[start:end]})
+        return data
+
+    def load_snapshot(self):
+        """Membaca snapshot push terakhir; None jika tidak ada atau untuk sheet lain."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        with open(self.snapshot_path, encoding="utf-8") as f:
+            snapshot = json.load(f)
+        if snapshot.get("spreadsheet_id") != self.spreadsheet_id or snapshot.get("range") != self.range_name:
+            return None
+        return snapshot["values"]
+
+    def save_snapshot(self, values):
+        if not self.snapshot_path:
+            return
+        tmp_path = f"{self.snapshot_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"spreadsheet_id": self.spreadsheet_id, "range": self.range_name, "values": values}, f)
+        os.replace(tmp_path, self.snapshot_path)
+
+    def write(self, values):
+        """Menulis values mulai dari range awal; mengembalikan jumlah sel yang diperbarui."""
+        # Normalisasi lewat JSON agar sebanding dengan snapshot (tuple -> list, dst.)
+        values = json.loads(json.dumps(values))
+        previous = self.load_snapshot()
+        if previous is None or not self.diff:
+            runs = [(0, len(values))] if values else []
+        else:
+            runs = changed_row_runs(previous, values)
+        # Snapshot lama dihapus dulu: jika write gagal di tengah, run berikutnya mengirim semua baris
+        self.remove_snapshot()
+
+        updated_cells = self._batch_update(self._ranges_for(values, runs))
+
+        # Baris lama di luar data baru dikosongkan
+        if previous is not None and len(previous) > len(values):
+            width = max(len(row) for row in previous[len(values):]) or 1
+            end_column = column_letter(column_index(self.start_column) + width - 1)
+            clear_range = f"{self._cell(len(values))}:{end_column}{self.start_row + len(previous) - 1}"
+            self._execute(self.values_api.batchClear(
+                spreadsheetId=self.spreadsheet_id, body={"ranges": [clear_range]}
+            ))
+
+        self.save_snapshot(values)
+        return updated_cells
+
+    def remove_snapshot(self):
+        if self.snapshot_path and os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
+
+    def append(self, values):
+        """Menambahkan values setelah data yang ada, per potongan rows_per_range.
+
+        Snapshot lokal dihapus karena isi sheet tidak lagi sama dengannya.
+        """
+        self.remove_snapshot()
+        updated_cells = 0
+        for start in range(0, len(values), self.rows_per_range):
+            result = self._execute(self.values_api.append(
+                spreadsheetId=self.spreadsheet_id,
+                range=self.range_name,
+                valueInputOption="RAW",
+                insertDataOption="INSERT_ROWS",
+                body={"values": values[start:start + self.rows_per_range]},
+            ))
+            updated_cells += result.get("updates", {}).get("updatedCells", 0)
+        return updated_cells
@@ -0,0 +1,174 @@
+# utils/sinks.py
+
+import importlib
+
+# Registry nama sink -> kelas sink, atau "modul:Kelas" yang baru di-import saat dipilih
+SINKS = {}
+
+def register_sink(name, target=None):
+    """Mendaftarkan sink dengan nama name.
+
+    Dipakai sebagai decorator kelas (@register_sink("csv")) atau dengan
+    target berupa string "paket.modul:Kelas" agar modul sink (beserta
+    dependensinya) tidak di-import sebelum sink tersebut dipilih.
+    """
+    if target is not None:
+        SINKS[name] = target
+        return target
+
+    def decorator(cls):
+        cls.name = name
+        SINKS[name] = cls
+        return cls
+    return decorator
+
+def get_sink_class(name):
+    """Mengembalikan kelas sink terdaftar, meng-import modulnya jika perlu."""
+    target = SINKS.get(name)
+    if target is None:
+        raise ValueError(f"Unknown sink '{name}', expected one of {sorted(SINKS)}")
+    if isinstance(target, str):
+        module_name, _, class_name = target.partition(":")
+        target = getattr(importlib.import_module(module_name), class_name)
+        SINKS[name] = target
+    return target
+
+def create_sinks(names, options):
+    """Membuat instance sink untuk setiap nama, sesuai urutan names."""
+    sinks = []
+    for name in names:
+        sink = get_sink_class(name)(options)
+        # Nama registry yang dipakai, termasuk untuk kelas yang didaftarkan dengan beberapa nama
+        sink.name = name
+        sinks.append(sink)
+    return sinks
+
+class Sink:
+    """Basis sink: satu tujuan load yang dipilih lewat --sinks.
+
+    options adalah dict pengaturan bersama (nama file CSV, URL database,
+    incremental, path kolumnar, ...); setiap sink hanya membaca kunci yang
+    dibutuhkannya (gsheet_service: client Sheets yang sudah dibuat, jika
+    ada). load() memuat seluruh data sekaligus, write_batch()
+    dipakai mode streaming (first_batch menimpa data lama, batch
+    berikutnya ditambahkan). Keduanya mengembalikan hasil loader; False
+    atau None berarti gagal. Dependensi berat di-import di dalam method.
+    """
+
+    name = None
+
+    def __init__(self, options):
+        self.options = options
+
+    def load(self, data):
+        return self.write_batch(data, first_batch=True)
+
+    def write_batch(self, data, first_batch):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+@register_sink("csv")
+class CsvSink(Sink):
+    def load(self, data):
+        from utils.load import save_to_csv, save_to_csv_incremental
+        if self.options.get("incremental"):
+            return save_to_csv_incremental(data, self.options["csv_filename"])
+        return save_to_csv(data, self.options["csv_filename"])
+
+    def write_batch(self, data, first_batch):
+        from utils.load import save_to_csv
+        return save_to_csv(data, self.options["csv_filename"], append=not first_batch)
+
+@register_sink("gsheet")
+class GoogleSheetsSink(Sink):
+    def load(self, data):
+        from utils.load import load_to_gsheet
+        # Snapshot selalu diperbarui; diff terhadap snapshot hanya pada mode incremental
+        return load_to_gsheet(data, snapshot_path=self.options.get("gsheet_snapshot"),
+                              service=self.options.get("gsheet_service"),
+                              diff=bool(self.options.get("incremental")))
+
+    def write_batch(self, data, first_batch):
+        from utils.load import load_to_gsheet
+        return load_to_gsheet(data, append=not first_batch, snapshot_path=self.options.get("gsheet_snapshot"),
+                              service=self.options.get("gsheet_service"), diff=False)
+
+@register_sink("postgres")
+class PostgresSink(Sink):
+    def load(self, data):
+        from utils.load import load_to_postgres, upsert_to_postgres
+        if self.options.get("incremental"):
+            return upsert_to_postgres(data, self.options.get("database_url"))
+        return load_to_postgres(data, self.options.get("database_url"))
+
+    def write_batch(self, data, first_batch):
+        from utils.load import load_to_postgres
+        return load_to_postgres(data, self.options.get("database_url"),
+                                if_exists='replace' if first_batch else 'append')
+
+@register_sink("columnar")
+class ColumnarFileSink(Sink):
+    """Parquet/Arrow; pada mode streaming satu writer tetap terbuka untuk semua batch."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        if not options.get("columnar_path"):
+            raise ValueError("The columnar sink needs an output path (--columnar PATH)")
+        self._writer = None
+
+    def load(self, data):
+        from utils.load import save_to_columnar
+        return save_to_columnar(data, self.options["columnar_path"], self.options.get("columnar_format", "parquet"),
+                                self.options.get("partition_by_date", False))
+
+    def write_batch(self, data, first_batch):
+        if self._writer is None:
+            from utils.columnar import ColumnarSink
+            self._writer = ColumnarSink(self.options["columnar_path"], self.options.get("columnar_format", "parquet"),
+                                        self.options.get("partition_by_date", False))
+        return self._writer.write_batch(data)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+@register_sink("history")
+class PriceHistorySink(Sink):
+    """Riwayat harga/rating append-only (utils.history); mode streaming memakai satu run untuk semua batch."""
+
+    def __init__(self, options):
+        super().__init__(options)
+        self._store = None
+        self._run_id = None
+
+    def load(self, data):
+        from utils.history import record_price_history
+        return record_price_history(data, self.options.get("history_url"))
+
+    def write_batch(self, data, first_batch):
+        try:
+            if self._store is None:
+                from utils.history import HistoryStore
+                self._store = HistoryStore(self.options["history_url"])
+            if first_batch or self._run_id is None:
+                self._run_id = self._store.start_run()
+            self._store.append(self._run_id, data)
+            return True
+        # Error Handling
+        except Exception as e:
+            print(f"Error saving price history: {e}")
+            return False
+
+    def close(self):
+        # Agregat per (Gender, Size) dihitung sekali setelah batch terakhir
+        if self._run_id is not None:
+            try:
+                rows = self._store.finish_run(self._run_id)
+                print(f"Price history run {self._run_id}: {rows} rows")
+            # Error Handling
+            except Exception as e:
+                print(f"Error finishing price history run {self._run_id}: {e}")
+            self._run_id = None
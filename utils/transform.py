@@ -1,6 +1,219 @@
+import math
+import re
+from functools import lru_cache
 import pandas as pd
+from utils.batch import ProductBatch
+
+OUTPUT_COLUMNS = ["Title", "Price", "Rating", "Colors", "Size", "Gender", "Timestamp"]
+DEDUP_KEY = ["Title", "Price", "Size"]
+RAW_COLUMNS = ["title", "price", "rating_text", "colors_text", "size_text", "gender_text", "timestamp"]
+
+# Nilai default untuk field mentah yang tidak ada (sama dengan versi per-baris)
+RAW_DEFAULTS = {
+    "title": "Unknown Product",
+    "price": "$0",
+    "rating_text": "Rating: ⭐ 0.0 / 5",
+    "colors_text": "0 Colors",
+    "size_text": "Size: NA",
+    "gender_text": "Gender: Unisex",
+}
+
+# Teks setelah ⭐ terakhir sampai sebelum '/' pertama, contoh "Rating: ⭐ 4.8 / 5" -> " 4.8 "
+RATING_PATTERN = r"(?s)^(?:.*⭐)?([^/]*)"
+INTEGER_PATTERN = r"[+-]?\d+"
+PRICE_SYMBOLS = str.maketrans("", "", "$,")
+
+def _parse_unique(column, parse):
+    """Menjalankan parse hanya pada nilai unik kolom lalu memetakannya kembali.
+
+    Kolom teks seperti rating, colors, size dan gender hanya punya sedikit
+    nilai unik, sehingga operasi string cukup dilakukan sekali per nilai.
+    """
+    codes, uniques = pd.factorize(column)
+    parsed = parse(pd.Series(uniques, dtype=object))
+    return pd.Series(parsed.to_numpy()[codes], index=column.index)
+
+def _parse_rating(rating_text):
+    """'Rating: ⭐ 4.8 / 5' -> 4.8, 'Not Rated' dan 'Invalid' -> 0.0, tidak valid -> NaN."""
+    value = rating_text.str.extract(RATING_PATTERN, expand=False).str.strip()
+    value = value.where(~value.str.contains("Invalid", regex=False), "0.0")
+    rating = pd.to_numeric(value, errors="coerce")
+    return rating.where(~rating_text.str.contains("Not Rated", regex=False), 0.0)
+
+def _parse_colors(colors_text):
+    """'3 Colors' -> 3, teks yang bukan bilangan bulat -> NaN."""
+    value = colors_text.str.split("Colors", n=1, regex=False).str[0].str.strip()
+    return pd.to_numeric(value.where(value.str.fullmatch(INTEGER_PATTERN)), errors="coerce")
+
+def _parse_after(marker):
+    """Mengambil teks setelah marker terakhir, contoh 'Size: M' -> 'M'."""
+    return lambda text: text.str.rsplit(marker, n=1).str[-1].str.strip()
 
 def transform_product_data(raw_data):
+    """Membersihkan data mentah produk secara kolumnar (vectorized).
+
+    Aturan filter, kunci deduplikasi (Title, Price, Size) dan skema output
+    sama dengan transform_product_data_rowwise.
+    """
+    df = _transform_frame(raw_data)
+    if df is None:
+        return []
+
+    # Setara df.to_dict(orient="records") tetapi memakai tolist() per kolom
+    columns = [df[column].tolist() for column in OUTPUT_COLUMNS]
+    return [dict(zip(OUTPUT_COLUMNS, row)) for row in zip(*columns)]
+
+def transform_product_batch(raw_data):
+    """Seperti transform_product_data, tetapi menghasilkan satu ProductBatch bertipe.
+
+    Batch ini dipakai langsung oleh semua loader tanpa konversi ulang.
+    """
+    df = _transform_frame(raw_data)
+    if df is None:
+        return ProductBatch.from_frame(pd.DataFrame(columns=OUTPUT_COLUMNS))
+    return ProductBatch.from_frame(df)
+
+def _transform_frame(raw_data):
+    """Inti transform vectorized; mengembalikan DataFrame bersih atau None jika kosong."""
+    if not raw_data:
+        return None
+
+    raw = pd.DataFrame.from_records(raw_data, columns=RAW_COLUMNS)
+    for column, default in RAW_DEFAULTS.items():
+        raw[column] = raw[column].astype(object).where(raw[column].notna(), default)
+
+    # Transform price
+    price = pd.to_numeric(raw["price"].str.translate(PRICE_SYMBOLS), errors="coerce")
+
+    # Transform rating, colors, size dan gender per nilai unik
+    rating = _parse_unique(raw["rating_text"], _parse_rating).astype(float)
+    colors = _parse_unique(raw["colors_text"], _parse_colors).astype(float)
+    size = _parse_unique(raw["size_text"], _parse_after("Size:"))
+    gender = _parse_unique(raw["gender_text"], _parse_after("Gender:"))
+
+    timestamp = raw["timestamp"].astype(object)
+    timestamp = timestamp.where(timestamp.notna(), None)
+
+    # Baris yang gagal di-parse (NaN) atau price/rating 0 dibuang
+    valid = price.notna() & rating.notna() & colors.notna() & (price != 0) & (rating != 0)
+    if not valid.any():
+        return None
+
+    df = pd.DataFrame({
+        "Title": raw["title"][valid],
+        "Price": price[valid].astype(float),
+        "Rating": rating[valid],
+        "Colors": colors[valid].astype(int),
+        "Size": size[valid],
+        "Gender": gender[valid],
+        # Inferensi dtype sama seperti DataFrame dari list of dict pada versi per-baris
+        "Timestamp": timestamp[valid].infer_objects(),
+    }, columns=OUTPUT_COLUMNS)
+    df = df.dropna(subset=["Title", "Price", "Rating"])
+    return df.drop_duplicates(subset=DEDUP_KEY)
+
+def transform_product_batches(raw_batches):
+    """Generator ProductBatch per batch data mentah untuk mode streaming.
+
+    Deduplikasi (Title, Price, Size) tetap berlaku lintas batch: hanya kunci
+    yang sudah terlihat yang disimpan, bukan seluruh baris.
+    """
+    seen_keys = set()
+    for raw_batch in raw_batches:
+        df = _transform_frame(raw_batch)
+        if df is None:
+            continue
+        keys = list(zip(*(df[column].tolist() for column in DEDUP_KEY)))
+        keep = []
+        for key in keys:
+            keep.append(key not in seen_keys)
+            seen_keys.add(key)
+        df = df[keep]
+        if len(df):
+            yield ProductBatch.from_frame(df)
+
+# ===== Mode fused: baris bersih langsung dari card, tanpa dict mentah =====
+# Teks rating/colors/size/gender hanya punya sedikit nilai unik, jadi hasil parse di-cache
+_RATING_REGEX = re.compile(RATING_PATTERN)
+_INTEGER_REGEX = re.compile(INTEGER_PATTERN)
+
+@lru_cache(maxsize=4096)
+def _clean_rating(rating_text):
+    """Versi skalar _parse_rating; None jika tidak valid."""
+    if "Not Rated" in rating_text:
+        return 0.0
+    value = _RATING_REGEX.match(rating_text).group(1).strip()
+    if "Invalid" in value:
+        return 0.0
+    try:
+        rating = float(value)
+    except ValueError:
+        return None
+    return None if math.isnan(rating) else rating
+
+@lru_cache(maxsize=4096)
+def _clean_colors(colors_text):
+    """Versi skalar _parse_colors; None jika bukan bilangan bulat."""
+    value = colors_text.split("Colors", 1)[0].strip()
+    return int(value) if _INTEGER_REGEX.fullmatch(value) else None
+
+@lru_cache(maxsize=4096)
+def _clean_after(text, marker):
+    return text.rsplit(marker, 1)[-1].strip()
+
+def clean_product_row(fields, timestamp):
+    """Membersihkan field mentah satu card menjadi tuple sesuai OUTPUT_COLUMNS.
+
+    fields memakai nama field mentah (title, price, rating_text, ...) dan
+    aturan parse/filter sama dengan _transform_frame: mengembalikan None
+    untuk card yang akan dibuang transform (price/rating 0 atau tidak valid).
+    """
+    try:
+        price = float(fields.get("price", RAW_DEFAULTS["price"]).translate(PRICE_SYMBOLS))
+    except ValueError:
+        return None
+    rating = _clean_rating(fields.get("rating_text", RAW_DEFAULTS["rating_text"]))
+    colors = _clean_colors(fields.get("colors_text", RAW_DEFAULTS["colors_text"]))
+    if math.isnan(price) or price == 0 or rating is None or rating == 0 or colors is None:
+        return None
+    return (
+        fields.get("title", RAW_DEFAULTS["title"]),
+        price,
+        rating,
+        colors,
+        _clean_after(fields.get("size_text", RAW_DEFAULTS["size_text"]), "Size:"),
+        _clean_after(fields.get("gender_text", RAW_DEFAULTS["gender_text"]), "Gender:"),
+        timestamp,
+    )
+
+def rows_to_batch(rows, seen_keys=None):
+    """Membuat ProductBatch dari baris hasil clean_product_row dengan dedup (Title, Price, Size).
+
+    Baris pertama untuk setiap kunci dipertahankan. seen_keys (set) dipakai
+    bersama antar pemanggilan agar dedup berlaku lintas batch streaming.
+    """
+    seen_keys = set() if seen_keys is None else seen_keys
+    unique = []
+    for row in rows:
+        key = (row[0], row[1], row[4])
+        if key not in seen_keys:
+            seen_keys.add(key)
+            unique.append(row)
+    columns = list(zip(*unique)) or [()] * len(OUTPUT_COLUMNS)
+    df = pd.DataFrame({column: list(values) for column, values in zip(OUTPUT_COLUMNS, columns)},
+                      columns=OUTPUT_COLUMNS)
+    return ProductBatch.from_frame(df)
+
+def transform_row_batches(row_batches):
+    """Generator ProductBatch per batch baris fused; dedup lintas batch seperti transform_product_batches."""
+    seen_keys = set()
+    for rows in row_batches:
+        batch = rows_to_batch(rows, seen_keys)
+        if len(batch):
+            yield batch
+
+def transform_product_data_rowwise(raw_data):
+    """Membersihkan data mentah produk satu per satu (implementasi awal per-baris)."""
     transformed_data = []
 
     for item in raw_data:
@@ -53,8 +266,8 @@ def transform_product_data(raw_data):
     if not transformed_data:
         return []
 
-    df = pd.DataFrame(transformed_data, columns=["Title", "Price", "Rating", "Colors", "Size", "Gender", "Timestamp"])
+    df = pd.DataFrame(transformed_data, columns=OUTPUT_COLUMNS)
     df = df.dropna(subset=["Title", "Price", "Rating"])
-    df = df.drop_duplicates(subset=["Title", "Price", "Size"])
+    df = df.drop_duplicates(subset=DEDUP_KEY)
 
     return df.to_dict(orient="records")
@@ -0,0 +1,235 @@
+# utils/workqueue.py
+
+import glob
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+
+def default_worker_id():
+    """ID worker yang unik per host dan proses, contoh "host-a-12345"."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+class WorkQueue:
+    """Antrean halaman crawl di SQLite yang dibagi beberapa proses worker.
+
+    Setiap halaman adalah satu task. lease() mengambil task pending (atau
+    yang lease-nya sudah kedaluwarsa karena worker mati) dalam satu
+    transaksi BEGIN IMMEDIATE, sehingga dua worker tidak pernah mendapat
+    task yang sama pada saat bersamaan. Task yang gagal kembali ke pending
+    sampai max_attempts, lalu ditandai failed. File database bisa dipakai
+    banyak proses di satu host atau banyak host lewat volume bersama yang
+    mendukung file locking (misalnya volume Docker lokal; hindari NFS).
+    """
+
+    def __init__(self, path, lease_seconds=120, max_attempts=3, timeout=30):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        # isolation_level=None: transaksi diatur sendiri dengan BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tasks ("
+            " base_url TEXT, page_number INTEGER, status TEXT, worker TEXT,"
+            " lease_expires REAL, attempts INTEGER DEFAULT 0, updated_at REAL,"
+            " PRIMARY KEY (base_url, page_number))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS tasks_status ON tasks (base_url, status, lease_expires)")
+        # Satu crawl_id per base_url, dibuat saat antrean pertama kali diisi; dicatat di setiap entri shard
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawls (base_url TEXT PRIMARY KEY, crawl_id TEXT, created_at REAL)"
+        )
+
+    def _transaction(self, statements):
+        """Menjalankan fungsi statements(cursor) dalam transaksi write yang eksklusif."""
+        with self._lock:
+            cursor = self._conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                result = statements(cursor)
+                cursor.execute("COMMIT")
+                return result
+            except BaseException:
+                cursor.execute("ROLLBACK")
+                raise
+
+    def has_tasks(self, base_url):
+        with self._lock:
+            return self._conn.execute(
+                "SELECT 1 FROM tasks WHERE base_url = ? LIMIT 1", (base_url,)
+            ).fetchone() is not None
+
+    def enqueue(self, base_url, page_numbers):
+        """Menambahkan halaman ke antrean; halaman yang sudah ada diabaikan. Mengembalikan jumlah yang baru."""
+        now = time.time()
+
+        def insert(cursor):
+            cursor.execute("INSERT OR IGNORE INTO crawls VALUES (?, ?, ?)", (base_url, uuid.uuid4().hex, now))
+            before = self._conn.total_changes
+            cursor.executemany(
+                "INSERT OR IGNORE INTO tasks (base_url, page_number, status, attempts, updated_at)"
+                " VALUES (?, ?, 'pending', 0, ?)",
+                [(base_url, page_number, now) for page_number in page_numbers],
+            )
+            return self._conn.total_changes - before
+        return self._transaction(insert)
+
+    def crawl_id(self, base_url):
+        """ID crawl yang sedang diantrekan untuk base_url, atau None jika antrean belum diisi."""
+        with self._lock:
+            row = self._conn.execute("SELECT crawl_id FROM crawls WHERE base_url = ?", (base_url,)).fetchone()
+        return row[0] if row else None
+
+    def lease(self, base_url, worker_id, limit=1):
+        """Mengambil hingga limit halaman untuk worker_id; daftar nomor halaman (urut)."""
+        now = time.time()
+
+        def claim(cursor):
+            # Lease kedaluwarsa yang sudah mencapai max_attempts tidak diambil lagi
+            cursor.execute(
+                "UPDATE tasks SET status = 'failed', updated_at = ? WHERE base_url = ? AND"
+                " status = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, base_url, now, self.max_attempts),
+            )
+            rows = cursor.execute(
+                "SELECT page_number FROM tasks WHERE base_url = ? AND"
+                " (status = 'pending' OR (status = 'leased' AND lease_expires < ?))"
+                " ORDER BY page_number LIMIT ?",
+                (base_url, now, limit),
+            ).fetchall()
+            pages = [row[0] for row in rows]
+            cursor.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_expires = ?,"
+                " attempts = attempts + 1, updated_at = ? WHERE base_url = ? AND page_number = ?",
+                [(worker_id, now + self.lease_seconds, now, base_url, page) for page in pages],
+            )
+            return pages
+        return self._transaction(claim)
+
+    def complete(self, base_url, page_number, worker_id):
+        """Menandai halaman selesai. False jika lease sudah diambil alih worker lain."""
+        def finish(cursor):
+            cursor.execute(
+                "UPDATE tasks SET status = 'done', lease_expires = NULL, updated_at = ?"
+                " WHERE base_url = ? AND page_number = ? AND status = 'leased' AND worker = ?",
+                (time.time(), base_url, page_number, worker_id),
+            )
+            return cursor.rowcount == 1
+        return self._transaction(finish)
+
+    def fail(self, base_url, page_number, worker_id):
+        """Mengembalikan halaman ke antrean, atau menandainya failed setelah max_attempts."""
+        def release(cursor):
+            cursor.execute(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,"
+                " lease_expires = NULL, updated_at = ?"
+                " WHERE base_url = ? AND page_number = ? AND status = 'leased' AND worker = ?",
+                (self.max_attempts, time.time(), base_url, page_number, worker_id),
+            )
+            return cursor.rowcount == 1
+        return self._transaction(release)
+
+    def counts(self, base_url):
+        """Jumlah halaman per status, contoh {"pending": 3, "leased": 2, "done": 45}."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT status, COUNT(*) FROM tasks WHERE base_url = ? GROUP BY status", (base_url,)
+            ).fetchall()
+        return dict(rows)
+
+    def next_expiry(self, base_url):
+        """Waktu (epoch) lease aktif paling awal berakhir, atau None jika tidak ada."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MIN(lease_expires) FROM tasks WHERE base_url = ? AND status = 'leased'", (base_url,)
+            ).fetchone()
+        return row[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+class ShardWriter:
+    """Menulis data mentah produk milik satu worker ke <shard_dir>/<worker_id>.jsonl.
+
+    Setiap halaman menjadi satu baris JSON {"page": n, "crawl": crawl_id,
+    "fetched_at": epoch, "products": [...]} yang di-flush dan di-fsync
+    sebelum task ditandai selesai, sehingga halaman yang tercatat done
+    selalu ada di shard. File shard ditambahkan (append) antar crawl;
+    merge_shards memilih entri crawl_id yang diminta.
+    """
+
+    def __init__(self, shard_dir, worker_id, crawl_id=None):
+        os.makedirs(shard_dir, exist_ok=True)
+        self.path = os.path.join(shard_dir, f"{worker_id}.jsonl")
+        self.crawl_id = crawl_id
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def write_page(self, page_number, products):
+        entry = {"page": page_number, "crawl": self.crawl_id, "fetched_at": time.time(), "products": products}
+        line = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Field yang berbeda setiap kali card diambil ulang, tidak ikut menentukan duplikat
+VOLATILE_FIELDS = ("extracted_at", "timestamp")
+
+def merge_shards(shard_dir, crawl_id=None):
+    """Menggabungkan semua shard menjadi satu list data mentah produk, urut per halaman.
+
+    Jika crawl_id diberikan (WorkQueue.crawl_id), hanya entri crawl tersebut
+    yang dipakai; entri crawl lama di shard yang sama dilewati. Halaman yang
+    diambil lebih dari sekali (lease kedaluwarsa lalu diambil worker lain)
+    hanya dipakai sekali, yaitu salinan terbaru (fetched_at), dan card yang
+    identik (di luar VOLATILE_FIELDS) dibuang sebelum data dikirim ke
+    transform. Baris terakhir shard yang terpotong (worker mati saat
+    menulis) dilewati.
+    """
+    pages = {}
+    stale = 0
+    for path in sorted(glob.glob(os.path.join(shard_dir, "*.jsonl"))):
+        with open(path, encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                # Error Handling
+                except json.JSONDecodeError:
+                    print(f"Skipping truncated line in shard {path}")
+                    continue
+                if crawl_id is not None and entry.get("crawl") != crawl_id:
+                    stale += 1
+                    continue
+                fetched_at = entry.get("fetched_at", 0.0)
+                if entry["page"] not in pages or fetched_at > pages[entry["page"]][0]:
+                    pages[entry["page"]] = (fetched_at, entry["products"])
+    if stale:
+        print(f"Skipped {stale} shard pages from other crawls")
+
+    products = []
+    seen = set()
+    for page_number in sorted(pages):
+        for product in pages[page_number][1]:
+            key = tuple(sorted((k, v) for k, v in product.items() if k not in VOLATILE_FIELDS))
+            if key in seen:
+                continue
+            seen.add(key)
+            products.append(product)
+    print(f"Merged {len(pages)} pages ({len(products)} products) from {shard_dir}")
+    return products